@@ -0,0 +1,151 @@
+"""
+Data path benchmarks - times the loaders, aggregations and chart builders behind the pages
+
+Every target is measured per dataset and year in two modes:
+- cold: in-memory artefacts dropped before each run (files are re-parsed, aggregates recomputed)
+- warm: artefacts already cached, as on a rerun of an open session
+Chart building is not cached below create_chart, so create_smart_chart is measured as 'build'.
+
+Usage (from the project root):
+    python benchmarks/bench_data_paths.py
+    python benchmarks/bench_data_paths.py --datasets orignaldata scaled:50 --repeat 20 --output after.json
+"""
+import argparse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import bench_utils  # puts streamlit/ on sys.path
+import data_cache
+import data_loader
+
+# Representative chart fields of each page: (question, field)
+FIELD_CASES = [
+    ('Q6', 'Funding source (Options: regular budget or extrabudgetary)'),
+    ('Q6', 'Type of publication (Options: Evaluation, or Guidance/tools, or Technical Report, or Working paper, or Data/Database) '),
+    ('Q7', 'Country or Region'),
+    ('Q10', 'In person or online or both'),
+    ('Q11', 'Type of partnership\n(Options: UN interagency initiative; or multistakeholder initiative; or bilateral partnership; or event; or campaign; or challenge)'),
+    ('Q11', 'Specify name of the Region/country'),
+]
+DEFAULT_DATASETS = ['orignaldata', 'fake', 'scaled:10']
+STAT_COLUMNS = ['year', 'runs', 'p50_ms', 'p90_ms', 'max_ms', 'peak_kb']
+
+
+def _processor(year: str):
+    from st_q6q7q10q11_dashboard import Q6Q7Q10Q11DataProcessor
+    return Q6Q7Q10Q11DataProcessor(selected_year=year)
+
+
+def _cold_processor(year: str):
+    """Setup for processor methods: frames loaded, aggregates not yet cached"""
+    data_cache.clear_memory_cache()
+    return _processor(year)
+
+
+def _field_distributions(processor) -> None:
+    for question, field in FIELD_CASES:
+        processor.get_field_distribution(question, field)
+
+
+def _time_series_distributions(processor) -> None:
+    for question, field in FIELD_CASES:
+        processor.get_time_series_distribution(question, field)
+
+
+def _chart_inputs(year: str) -> List[Tuple[Any, str]]:
+    """Chart data the pages feed create_smart_chart: 1D pies and bars, 2D stacked bars and lines"""
+    processor = _processor(year)
+    inputs = []
+    for question, field in FIELD_CASES:
+        inputs.append((processor.get_field_distribution(question, field), 'pie'))
+        inputs.append((processor.get_field_distribution(question, field), 'bar'))
+        inputs.append((processor.get_time_series_distribution(question, field), 'pie'))
+        inputs.append((processor.get_time_series_distribution(question, field), 'line'))
+    return [(data, chart_type) for data, chart_type in inputs if data]
+
+
+def _build_charts(inputs: List[Tuple[Any, str]]) -> None:
+    from st_styles import style_manager
+    for data, chart_type in inputs:
+        style_manager.create_smart_chart(data, chart_type, 'Benchmark')
+
+
+def targets(year: str) -> Dict[str, Dict[str, Tuple[Optional[Callable], Callable]]]:
+    """target -> mode -> (setup, run(state)) for one year"""
+    from st_landing_dashboard import get_q2_data, get_q345_data
+
+    def processor_method(method: Callable) -> Dict[str, Tuple[Optional[Callable], Callable]]:
+        return {
+            'cold': (lambda: _cold_processor(year), method),
+            'warm': (lambda: _processor(year), method),
+        }
+
+    return {
+        'get_q2_data': {
+            'cold': (data_cache.clear_memory_cache, lambda _: get_q2_data(year)),
+            'warm': (None, lambda _: get_q2_data(year)),
+        },
+        'get_q345_data': {
+            'cold': (data_cache.clear_memory_cache, lambda _: get_q345_data(year)),
+            'warm': (None, lambda _: get_q345_data(year)),
+        },
+        'processor_init': {
+            'cold': (data_cache.clear_memory_cache, lambda _: _processor(year)),
+            'warm': (None, lambda _: _processor(year)),
+        },
+        'get_field_distribution': processor_method(_field_distributions),
+        'get_time_series_distribution': processor_method(_time_series_distributions),
+        'get_all_years_theme_counts': processor_method(lambda processor: processor.get_all_years_theme_counts()),
+        'create_smart_chart': {
+            'build': (lambda: _chart_inputs(year), _build_charts),
+        },
+    }
+
+
+def default_years() -> List[str]:
+    """'All' plus the latest reporting year of the current data directory"""
+    # Year options are sorted newest first
+    years = [y for y in data_loader.get_year_options() if y != 'All']
+    return ['All'] + years[:1]
+
+
+def run_benchmarks(datasets: List[str], years: Optional[List[str]] = None, repeat: int = 10, warmup: int = 1,
+                   only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Measure every target for every dataset / year, returns one result row per target and mode"""
+    results = []
+    for dataset in datasets:
+        bench_utils.use_data_dir(bench_utils.resolve_dataset(dataset))
+        for year in years or default_years():
+            for target, modes in targets(year).items():
+                if only and target not in only:
+                    continue
+                for mode, (setup, run) in modes.items():
+                    stats = bench_utils.time_call(run, setup, repeat=repeat, warmup=warmup)
+                    results.append({'dataset': dataset, 'target': target, 'mode': mode, 'year': year, **stats})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--datasets', nargs='+', default=DEFAULT_DATASETS,
+                        help="orignaldata, fake, scaled:N, synthetic:years=Y,units=U,rows=R or a data directory "
+                             "(default: %(default)s)")
+    parser.add_argument('--years', nargs='+', help="Years to select (default: All and the latest year)")
+    parser.add_argument('--targets', nargs='+', help="Only run these targets")
+    parser.add_argument('--repeat', type=int, default=10, help="Timed runs per target (default: %(default)s)")
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed runs per target (default: %(default)s)")
+    parser.add_argument('--disk-cache', action='store_true',
+                        help="Keep the on-disk artefact cache (cold runs then read .yeap_cache instead of the CSVs)")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    bench_utils.quiet_streamlit()
+    data_cache.DISK_CACHE_ENABLED = args.disk_cache
+    results = run_benchmarks(args.datasets, args.years, args.repeat, args.warmup, args.targets)
+    bench_utils.print_table(results, STAT_COLUMNS)
+    bench_utils.write_results(results, args.output, datasets=args.datasets, years=args.years,
+                              repeat=args.repeat, warmup=args.warmup, disk_cache=args.disk_cache)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
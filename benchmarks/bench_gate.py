@@ -0,0 +1,241 @@
+"""
+Benchmark regression gate - compares the data path timings against baselines stored in the repo
+
+Runs the gated targets of bench_data_paths.py (get_q345_data, get_field_distribution, the
+processor build and chart generation) on generated synthetic data at each scale in SCALES,
+and compares every best-of-N time (min_ms, the least noisy statistic on a shared machine)
+with baselines/data_paths.json:
+- a result is a regression when it is slower than the baseline by more than --tolerance
+  AND by more than --min-delta-ms (sub-millisecond warm paths are otherwise all noise)
+- a regression is measured a second time before it fails the gate (best of both runs)
+- a result at most --stale-ratio of its baseline (and faster by more than --min-delta-ms) is
+  reported as stale: the baseline predates an optimization and would let a later regression
+  back to the old timing pass, so the gate warns to re-record it with --update (it still passes)
+- baselines recorded on another machine (CPU model and count, Python, pandas) are scaled by
+  a fixed pandas calibration workload timed in both runs (best time over rounds before each
+  scale and at the end), so they still compare approximately like for like; on the machine
+  that recorded them they are used as is (--calibrate forces the scaling)
+
+Usage (from the project root):
+    python benchmarks/bench_gate.py                 # compare, exit 1 on a regression
+    python benchmarks/bench_gate.py --update        # record new baselines (commit the JSON)
+    python benchmarks/bench_gate.py --scales small --tolerance 0.5
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import bench_utils  # puts streamlit/ on sys.path
+import data_cache
+from bench_data_paths import run_benchmarks
+
+# Dataset scales the gate runs on (synthetic_data.py, fixed seed)
+SCALES = {
+    'small': 'synthetic:years=3,units=17,rows=1000',
+    'medium': 'synthetic:years=5,units=100,rows=10000',
+}
+GATE_TARGETS = ['get_q345_data', 'get_field_distribution', 'processor_init', 'create_smart_chart']
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'data_paths.json')
+METRIC = 'min_ms'
+
+
+def calibration_ms(repeat: int = 9) -> float:
+    """Best time of a fixed pandas workload (CSV round trip, string cleaning, group counts)"""
+    rng = np.random.default_rng(0)
+    words = np.array(['Yes', 'No', 'Regular Budget', 'Extrabudgetary', 'Africa', 'Europe', ' n/a ', ''])
+    df = pd.DataFrame({
+        'UserId': [f"USR-{i:06d}" for i in range(50000)],
+        'answer': rng.choice(words, size=50000),
+        'year': rng.integers(2024, 2030, size=50000),
+    })
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False)
+        buffer.seek(0)
+        parsed = pd.read_csv(buffer)
+        cleaned = parsed['answer'].fillna('').astype(str).str.strip().str.lower()
+        cleaned.groupby(parsed['year']).value_counts()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def machine() -> str:
+    """What the timings depend on: CPU model and count, Python and pandas versions"""
+    model = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo') as f:
+            model = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), model)
+    except OSError:
+        pass
+    return f"{model} x{os.cpu_count()} / Python {platform.python_version()} / pandas {pd.__version__}"
+
+
+def scale_factor(baseline: Dict[str, Any], calibration: float, calibrate: bool = False) -> float:
+    """Factor applied to the baselines: calibration ratio for another machine, 1.0 on the recording one"""
+    if not baseline.get('calibration_ms') or (baseline.get('machine') == machine() and not calibrate):
+        return 1.0
+    return calibration / baseline['calibration_ms']
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return f"{result['scale']} / {result['target']} / {result['mode']} / {result['year']}"
+
+
+def measure(data_dirs: Dict[str, str], repeat: int, warmup: int) -> Tuple[List[Dict[str, Any]], float]:
+    """Gated targets on every scale (one result per target / mode / year) and the calibration time"""
+    results, calibrations = [], []
+    for scale, data_dir in data_dirs.items():
+        calibrations.append(calibration_ms())
+        for result in run_benchmarks([data_dir], repeat=repeat, warmup=warmup, only=GATE_TARGETS):
+            results.append({**result, 'scale': scale, 'dataset': SCALES[scale]})
+    calibrations.append(calibration_ms())
+    return results, min(calibrations)
+
+
+def confirm(results: List[Dict[str, Any]], keys: List[str], data_dirs: Dict[str, str], repeat: int,
+            warmup: int) -> List[Dict[str, Any]]:
+    """Measure the given results again, keeping the better of both runs"""
+    by_key = {result_key(r): r for r in results}
+    for key in keys:
+        scale, target, mode, year = key.split(' / ')
+        for again in run_benchmarks([data_dirs[scale]], [year], repeat=repeat, warmup=warmup, only=[target]):
+            if again['mode'] == mode and again[METRIC] < by_key[key][METRIC]:
+                by_key[key].update({k: v for k, v in again.items() if k != 'dataset'})
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], factor: float,
+            tolerance: float, min_delta_ms: float, stale_ratio: float = 0.5) -> List[Dict[str, Any]]:
+    """One row per result: baseline (scaled by factor), current value, change and verdict"""
+    rows = []
+    for result in results:
+        key = result_key(result)
+        stored = baseline['results'].get(key)
+        row = {'key': key, 'now_ms': result[METRIC], 'baseline_ms': None, 'change': None, 'verdict': 'new'}
+        if stored is not None:
+            expected = stored[METRIC] * factor
+            delta = result[METRIC] - expected
+            row.update(baseline_ms=round(expected, 3), change=delta / expected if expected else 0.0)
+            if delta > expected * tolerance and delta > min_delta_ms:
+                row['verdict'] = 'slower'
+            elif -delta > min_delta_ms and result[METRIC] <= expected * stale_ratio:
+                row['verdict'] = 'stale'
+            elif -delta > expected * tolerance and -delta > min_delta_ms:
+                row['verdict'] = 'faster'
+            else:
+                row['verdict'] = 'ok'
+        rows.append(row)
+    measured = {row['key'] for row in rows}
+    for key, stored in baseline['results'].items():
+        if key.split(' / ')[0] in {r['scale'] for r in results} and key not in measured:
+            rows.append({'key': key, 'now_ms': None, 'baseline_ms': stored[METRIC], 'change': None,
+                         'verdict': 'missing'})
+    return rows
+
+
+def print_diff(rows: List[Dict[str, Any]], factor: float, tolerance: float, min_delta_ms: float) -> None:
+    """Readable comparison on stderr, regressions first"""
+    marks = {'slower': '❌', 'stale': '⚠️', 'faster': '🚀', 'ok': '  ', 'new': '🆕', 'missing': '❔'}
+    order = {'slower': 0, 'stale': 1, 'missing': 2, 'new': 3, 'faster': 4, 'ok': 5}
+    scaling = f"scaled by {factor:.2f} (calibration, other machine)" if factor != 1.0 else "from this machine"
+    print(f"Baselines {scaling}; regression = slower by more than "
+          f"{tolerance:.0%} and {min_delta_ms:g} ms ({METRIC})", file=sys.stderr)
+    width = max(len(row['key']) for row in rows) if rows else 0
+    for row in sorted(rows, key=lambda r: (order[r['verdict']], r['key'])):
+        base = f"{row['baseline_ms']:10.2f}" if row['baseline_ms'] is not None else f"{'-':>10}"
+        now = f"{row['now_ms']:10.2f}" if row['now_ms'] is not None else f"{'-':>10}"
+        change = f"{row['change']:+7.0%}" if row['change'] is not None else f"{'':>7}"
+        print(f"{marks[row['verdict']]} {row['key'].ljust(width)}  {base} ms -> {now} ms  {change}  {row['verdict']}",
+              file=sys.stderr)
+
+
+def save_baseline(results: List[Dict[str, Any]], calibration: float, path: str, **options) -> None:
+    """Write the baselines (kept results of other scales are preserved)"""
+    baseline = load_baseline(path) or {'results': {}}
+    baseline.update(environment=bench_utils.environment(), machine=machine(), calibration_ms=round(calibration, 3),
+                    options=options)
+    for result in results:
+        baseline['results'][result_key(result)] = {k: result[k] for k in ('runs', 'min_ms', 'p50_ms', 'max_ms')}
+    baseline['results'] = dict(sorted(baseline['results'].items()))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n')
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES),
+                        help="Synthetic dataset scales (default: %(default)s)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file (default: benchmarks/baselines/data_paths.json)")
+    parser.add_argument('--update', action='store_true', help="Record the results as the new baselines")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="Allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help="Slowdowns below this many ms never fail (default: %(default)s)")
+    parser.add_argument('--stale-ratio', type=float, default=0.5,
+                        help="Warn that a baseline is stale when a result takes at most this fraction of it "
+                             "(default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per target (default: %(default)s)")
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed runs per target (default: %(default)s)")
+    parser.add_argument('--calibrate', action='store_true',
+                        help="Scale the baselines by the calibration workload even on the machine that recorded them")
+    parser.add_argument('--output', help="Also write the comparison as JSON here")
+    args = parser.parse_args(argv)
+
+    bench_utils.quiet_streamlit()
+    data_cache.DISK_CACHE_ENABLED = False
+    data_dirs = {scale: bench_utils.resolve_dataset(SCALES[scale]) for scale in args.scales}
+    results, calibration = measure(data_dirs, args.repeat, args.warmup)
+
+    if args.update:
+        save_baseline(results, calibration, args.baseline, repeat=args.repeat, warmup=args.warmup)
+        print(f"✅ {len(results)} baselines written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"❌ No baseline at {args.baseline}; record one with --update", file=sys.stderr)
+        return 1
+    factor = scale_factor(baseline, calibration, args.calibrate)
+    rows = compare(results, baseline, factor, args.tolerance, args.min_delta_ms, args.stale_ratio)
+    suspects = [row['key'] for row in rows if row['verdict'] == 'slower']
+    if suspects:
+        print(f"⏱️  Measuring {len(suspects)} slower result(s) again...", file=sys.stderr)
+        results = confirm(results, suspects, data_dirs, args.repeat, args.warmup)
+        rows = compare(results, baseline, factor, args.tolerance, args.min_delta_ms, args.stale_ratio)
+    print_diff(rows, factor, args.tolerance, args.min_delta_ms)
+    if args.output:
+        bench_utils.write_results(rows, args.output, calibration_ms=calibration, scale_factor=factor, scales=args.scales,
+                                  tolerance=args.tolerance, min_delta_ms=args.min_delta_ms,
+                                  stale_ratio=args.stale_ratio, repeat=args.repeat)
+    stale = [row for row in rows if row['verdict'] == 'stale']
+    if stale:
+        print(f"⚠️  {len(stale)} baseline(s) stale (result at most {args.stale_ratio:.0%} of the baseline): "
+              f"re-record them with --update so they guard the faster timings", file=sys.stderr)
+    regressions = [row for row in rows if row['verdict'] == 'slower']
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    print("✅ No performance regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
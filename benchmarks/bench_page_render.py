@@ -0,0 +1,159 @@
+"""
+End-to-end page render benchmark - full script reruns as a user triggers them, no browser
+
+Drives streamlit_app.py in-process (streamlit AppTest) through every page in PAGES for each
+year and organizational unit selection, and records per script run:
+- wall time of the run (ms), CSV files parsed (pandas.read_csv calls) and figures rendered
+- parses / cache_loads: dataset reads accounted by the data layer (perf_monitor.record_read)
+- run: 'first' for the run that switched page / year / unit, 'rerun' for repeats with no change
+
+After each dataset the artefact cache size per artefact name and the process RSS are reported (memory_monitor).
+--max-rerun-parses 0 turns the run into a budget check: it fails if an unchanged rerun parses a CSV.
+
+Usage (from the project root):
+    python benchmarks/bench_page_render.py
+    python benchmarks/bench_page_render.py --datasets fake --years 2024 All --units 3 --output pages.json
+    python benchmarks/bench_page_render.py --max-rerun-parses 0
+"""
+import sys
+import time
+import argparse
+from typing import Any, Dict, List, Optional
+
+import bench_utils  # puts streamlit/ on sys.path
+import data_cache
+import perf_monitor
+import memory_monitor
+from cache_warmup import APP_SCRIPT, PAGE_WIDGET_KEY, YEAR_WIDGET_KEY
+
+# Organizational unit selectbox shown on the specialized pages (streamlit_app.py)
+REGION_WIDGET_KEY = 'selected_region'
+STAT_COLUMNS = ['runs', 'p50_ms', 'p90_ms', 'max_ms', 'csv_reads', 'parses', 'cache_loads', 'figures']
+
+
+def _timed_run(app, record: Dict[str, Any], counter: bench_utils.CsvReadCounter) -> Dict[str, Any]:
+    """Run the script once, returns the record completed with time, CSV reads, figures and errors"""
+    counter.take()
+    reads_before = perf_monitor.process_reads()
+    start = time.perf_counter()
+    app.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    reads_after = perf_monitor.process_reads()
+    return {
+        **record,
+        'ms': round(elapsed, 3),
+        'csv_reads': counter.take(),
+        'parses': reads_after[perf_monitor.READ_PARSE] - reads_before[perf_monitor.READ_PARSE],
+        'cache_loads': reads_after[perf_monitor.READ_CACHE] - reads_before[perf_monitor.READ_CACHE],
+        'figures': len(app.get('plotly_chart')),
+        'errors': [str(exc.value) for exc in app.exception],
+    }
+
+
+def _unit_options(app, units: int) -> List[str]:
+    """'All' plus `units` organizational units spread evenly over the selectbox options"""
+    try:
+        options = [opt.replace('\u200b', '') for opt in app.selectbox(key=REGION_WIDGET_KEY).options]
+    except KeyError:
+        return ['All']
+    choices = options[1:]
+    if units <= 0 or not choices:
+        return ['All']
+    step = max(1, len(choices) // units)
+    return ['All'] + choices[::step][:units]
+
+
+def render_dataset(dataset: str, years: Optional[List[str]], units: int, repeat: int,
+                   timeout: int) -> List[Dict[str, Any]]:
+    """Every page x year x unit of one dataset, returns one record per script run"""
+    from streamlit.testing.v1 import AppTest
+
+    bench_utils.use_data_dir(bench_utils.resolve_dataset(dataset))
+    runs = []
+    with bench_utils.CsvReadCounter() as counter:
+        app = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        runs.append(_timed_run(app, {'dataset': dataset, 'page': 'startup', 'year': None, 'unit': 'All',
+                                     'run': 'first'}, counter))
+        pages = list(app.radio(key=PAGE_WIDGET_KEY).options)
+        for year in years or list(app.selectbox(key=YEAR_WIDGET_KEY).options):
+            for page in pages:
+                app.radio(key=PAGE_WIDGET_KEY).set_value(page)
+                app.selectbox(key=YEAR_WIDGET_KEY).set_value(year)
+                base = {'dataset': dataset, 'page': page, 'year': year}
+                runs.append(_timed_run(app, {**base, 'unit': 'All', 'run': 'first'}, counter))
+                for unit in _unit_options(app, units):
+                    if unit != 'All':
+                        app.session_state[REGION_WIDGET_KEY] = unit
+                        runs.append(_timed_run(app, {**base, 'unit': unit, 'run': 'first'}, counter))
+                    for _ in range(repeat):
+                        runs.append(_timed_run(app, {**base, 'unit': unit, 'run': 'rerun'}, counter))
+    return runs
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per dataset / page / run kind: time percentiles, mean CSV reads and figures"""
+    groups = {}
+    for run in runs:
+        groups.setdefault((run['dataset'], run['page'], run['run']), []).append(run)
+    results = []
+    for (dataset, page, kind), group in groups.items():
+        results.append({
+            'dataset': dataset, 'target': page, 'mode': kind,
+            **bench_utils.summarize([r['ms'] for r in group]),
+            'csv_reads': round(sum(r['csv_reads'] for r in group) / len(group), 2),
+            'parses': round(sum(r['parses'] for r in group) / len(group), 2),
+            'cache_loads': round(sum(r['cache_loads'] for r in group) / len(group), 2),
+            'figures': round(sum(r['figures'] for r in group) / len(group), 2),
+            'errors': sum(len(r['errors']) for r in group),
+        })
+    return results
+
+
+def over_budget(runs: List[Dict[str, Any]], max_rerun_parses: int) -> List[Dict[str, Any]]:
+    """Reruns (no page / year / unit change) that parsed more CSV files than allowed"""
+    return [r for r in runs if r['run'] == 'rerun' and max(r['parses'], r['csv_reads']) > max_rerun_parses]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--datasets', nargs='+', default=['orignaldata'],
+                        help="orignaldata, fake, scaled:N, synthetic:years=Y,units=U,rows=R or a data directory "
+                             "(default: %(default)s)")
+    parser.add_argument('--years', nargs='+', help="Year selections (default: every option, 'All' included)")
+    parser.add_argument('--units', type=int, default=2,
+                        help="Organizational units selected per specialized page besides 'All' (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=2,
+                        help="Unchanged reruns after each selection (default: %(default)s)")
+    parser.add_argument('--timeout', type=int, default=120, help="Seconds allowed per script run")
+    parser.add_argument('--disk-cache', action='store_true',
+                        help="Keep the on-disk artefact cache (first runs then read .yeap_cache instead of the CSVs)")
+    parser.add_argument('--max-rerun-parses', type=int,
+                        help="Fail if an unchanged rerun parses more CSV files than this (e.g. 0)")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    bench_utils.quiet_streamlit()
+    data_cache.DISK_CACHE_ENABLED = args.disk_cache
+    runs, memory = [], {}
+    for dataset in args.datasets:
+        runs.extend(render_dataset(dataset, args.years, args.units, args.repeat, args.timeout))
+        memory[dataset] = memory_monitor.memory_report()
+        print(f"🧠 {dataset}: artefact cache {memory[dataset]['cache_bytes'] / (1024 * 1024):.1f} MB, "
+              f"RSS {(memory[dataset]['rss_kb'] or 0) / 1024:.0f} MB", file=sys.stderr)
+    results = summarize_runs(runs)
+    bench_utils.print_table(results, STAT_COLUMNS)
+    bench_utils.write_results(results, args.output, sections={'runs': runs, 'memory': memory}, datasets=args.datasets,
+                              years=args.years, units=args.units, repeat=args.repeat, disk_cache=args.disk_cache,
+                              max_rerun_parses=args.max_rerun_parses)
+    failed = any(r['errors'] for r in runs)
+    if args.max_rerun_parses is not None:
+        for run in over_budget(runs, args.max_rerun_parses):
+            failed = True
+            print(f"❌ {run['dataset']} / {run['page']} / {run['year']} / {run['unit']}: rerun parsed "
+                  f"{max(run['parses'], run['csv_reads'])} CSV files (budget {args.max_rerun_parses})",
+                  file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,248 @@
+"""
+Shared helpers for the YEAP dashboard benchmarks
+
+- Puts the streamlit/ code directory on sys.path so the dashboard modules import as in the app
+- Resolves dataset specs (orignaldata, fake, scaled:N, synthetic:...) to a data directory
+- Times callables (percentiles) and measures their peak Python memory (tracemalloc)
+- Writes results as JSON together with the environment they were measured in
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import shutil
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from typing import Any, Callable, Dict, List, Optional
+
+# Optional: process peak RSS (not available on Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Get absolute path of project root directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_DIR = os.path.join(PROJECT_ROOT, 'streamlit')
+if CODE_DIR not in sys.path:
+    sys.path.insert(0, CODE_DIR)
+
+import data_cache
+import data_loader
+
+# Dataset spec -> data directory (relative to the project root)
+DATASET_DIRS = {
+    'orignaldata': 'orignaldata',
+    'fake': 'orignaldata_fake_data',
+}
+PERCENTILES = [50, 90, 95, 99]
+
+
+def quiet_streamlit() -> None:
+    """Silence the bare-mode warnings streamlit logs when pages run outside `streamlit run`"""
+    try:
+        import streamlit.logger
+        streamlit.logger.set_log_level('error')
+    except Exception:
+        pass
+
+
+def scaled_copy(src_dir: str, factor: int, dest_dir: Optional[str] = None) -> str:
+    """Copy a data directory with every survey file's rows repeated `factor` times, returns the copy"""
+    import pandas as pd
+
+    dest_dir = dest_dir or _temp_data_dir(f'yeap_scaled{factor}_')
+    os.makedirs(dest_dir, exist_ok=True)
+    for name in data_loader.DATA_FILES.values():
+        src = os.path.join(src_dir, name)
+        if not os.path.exists(src):
+            continue
+        df = data_loader.read_csv_with_fallback(src)
+        pd.concat([df] * factor, ignore_index=True).to_csv(os.path.join(dest_dir, name), index=False,
+                                                           encoding='utf-8-sig')
+    return dest_dir
+
+
+def _temp_data_dir(prefix: str) -> str:
+    """Temporary data directory removed when the process exits"""
+    path = tempfile.mkdtemp(prefix=prefix)
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def resolve_dataset(spec: str) -> str:
+    """
+    Data directory for a dataset spec:
+    - 'orignaldata' / 'fake': the bundled directories
+    - 'scaled:N': orignaldata with every file's rows repeated N times (temp dir, removed at exit)
+    - 'synthetic:years=Y,units=U,rows=R': generated by synthetic_data.py (temp dir, removed at exit)
+    - any other value is used as a directory path
+    """
+    if spec in DATASET_DIRS:
+        return os.path.join(PROJECT_ROOT, DATASET_DIRS[spec])
+    if spec.startswith('scaled:'):
+        return scaled_copy(os.path.join(PROJECT_ROOT, DATASET_DIRS['orignaldata']), int(spec.split(':', 1)[1]))
+    if spec.startswith('synthetic:'):
+        import synthetic_data
+        path = _temp_data_dir('yeap_synthetic_')
+        synthetic_data.generate_dataset(path, **synthetic_data.parse_spec(spec.split(':', 1)[1]))
+        return path
+    if os.path.isdir(spec):
+        return os.path.abspath(spec)
+    raise ValueError(f"Unknown dataset: {spec}")
+
+
+def use_data_dir(path: str) -> None:
+    """Point the data loader at another data directory and drop artefacts built from the previous one"""
+    data_loader.DATA_DIR = path
+    data_cache.clear_memory_cache()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Min / mean / percentiles / max of timing samples (milliseconds)"""
+    values = sorted(samples_ms)
+    stats = {
+        'runs': len(values),
+        'min_ms': round(values[0], 3),
+        'mean_ms': round(sum(values) / len(values), 3),
+    }
+    for pct in PERCENTILES:
+        stats[f'p{pct}_ms'] = round(percentile(values, pct), 3)
+    stats['max_ms'] = round(values[-1], 3)
+    return stats
+
+
+def time_call(run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+              repeat: int = 10, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time run(state) `repeat` times after `warmup` untimed runs:
+    - state = setup() is built before every call and is not timed (None without setup)
+    - One extra call under tracemalloc measures the peak Python heap (KB)
+    """
+    def _once() -> float:
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        return (time.perf_counter() - start) * 1000
+
+    for _ in range(warmup):
+        _once()
+    stats = summarize([_once() for _ in range(repeat)])
+    stats['peak_kb'] = peak_memory_kb(run, setup)
+    return stats
+
+
+def peak_memory_kb(run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None) -> float:
+    """Peak Python heap allocated while run(state) executes (tracemalloc, KB)"""
+    state = setup() if setup else None
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+class CsvReadCounter:
+    """Count pandas.read_csv calls (and the files read) while active, wherever they come from"""
+
+    def __init__(self):
+        self.reads = 0
+        self.files = []
+        self._original = None
+
+    def __enter__(self):
+        import pandas as pd
+        self._original = pd.read_csv
+
+        def _counting_read_csv(filepath_or_buffer, *args, **kwargs):
+            self.reads += 1
+            self.files.append(os.path.basename(str(filepath_or_buffer)))
+            return self._original(filepath_or_buffer, *args, **kwargs)
+
+        pd.read_csv = _counting_read_csv
+        return self
+
+    def __exit__(self, *exc_info):
+        import pandas as pd
+        pd.read_csv = self._original
+        return False
+
+    def take(self) -> int:
+        """Reads since the previous take()"""
+        reads, self.reads, self.files = self.reads, 0, []
+        return reads
+
+
+def max_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process so far (KB, None where unsupported)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def git_revision() -> Optional[str]:
+    """Short commit hash of the working tree (None outside a git checkout)"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Where and with what the results were measured"""
+    import pandas as pd
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(results: List[Dict[str, Any]], output: Optional[str],
+                  sections: Optional[Dict[str, Any]] = None, **options) -> Dict[str, Any]:
+    """Write {'environment', 'options', 'results', 'max_rss_kb', **sections} to output (stdout if None)"""
+    report = {
+        'environment': environment(),
+        'options': options,
+        'results': results,
+        'max_rss_kb': max_rss_kb(),
+        **(sections or {}),
+    }
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+    return report
+
+
+def print_table(results: List[Dict[str, Any]], columns: List[str]) -> None:
+    """Readable summary of results on stderr (stdout may carry the JSON)"""
+    header = ['dataset', 'target', 'mode'] + columns
+    rows = [[str(r.get(c, '')) for c in header] for r in results]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(header)]
+    for row in [header] + rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)), file=sys.stderr)
@@ -0,0 +1,238 @@
+"""
+Synthetic survey data - schema-faithful PART1 / PART2 / PART3 files at any scale
+
+The bundled orignaldata directory is used as the template:
+- Headers are copied verbatim (including the line breaks inside quoted PART3 headers)
+- Short answer columns draw from the template's own answers and frequencies (messy variants included)
+- Free-text columns (names, links, descriptions) get generated text at the template's fill rate
+- Every unit/year keeps the survey export's blank padding rows (UserId, unit and year only)
+- Multi-select columns (headers listing options separated by ';') sometimes get '; '-joined answers
+- Files are written as UTF-8 with BOM, like the survey export
+
+Usage (from the project root):
+    python benchmarks/synthetic_data.py out_dir --years 50 --units 5000 --output-rows 1000000
+"""
+import os
+import shutil
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import bench_utils  # puts streamlit/ on sys.path
+import data_loader
+
+# Columns present in every PART2 / PART3 file
+ID_COLUMNS = ['UserId', 'Department/Region']
+YEAR_COLUMN = 'year'
+# Answer columns with at most this many distinct values are sampled from the template answers
+CATEGORICAL_MAX_VALUES = 12
+# Regions used for 'Region: ...' organizational units
+REGIONS = ['Africa', 'Americas', 'Arab States', 'Asia and the Pacific', 'Europe and Central Asia']
+# Share of organizational units that are regional offices
+REGION_UNIT_SHARE = 0.3
+DEFAULT_TEMPLATE_DIR = os.path.join(bench_utils.PROJECT_ROOT, 'orignaldata')
+
+
+def _read_template(template_dir: str, key: str) -> pd.DataFrame:
+    return data_loader.read_csv_with_fallback(os.path.join(template_dir, data_loader.DATA_FILES[key]))
+
+
+def _answer_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns if c not in ID_COLUMNS and c != YEAR_COLUMN]
+
+
+def _is_blank(frame: pd.DataFrame) -> pd.Series:
+    return frame.isna() | (frame.astype(str).apply(lambda col: col.str.strip()) == '')
+
+
+def profile_template(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Learn what to generate from a template PART2 / PART3 file:
+    - padding_rate: share of rows with every answer blank
+    - per answer column: fill rate among answered rows, and the answer pool (None for free text)
+    """
+    answers = _answer_columns(df)
+    blank = _is_blank(df[answers])
+    padding = blank.all(axis=1)
+    answered = df[~padding]
+    columns = {}
+    for col in answers:
+        values = answered[col][~blank.loc[~padding, col]]
+        counts = values.astype(str).value_counts()
+        pool = None
+        if 0 < len(counts) <= CATEGORICAL_MAX_VALUES:
+            pool = (counts.index.to_numpy(), (counts / counts.sum()).to_numpy())
+        columns[col] = {
+            'fill_rate': float(len(values)) / len(answered) if len(answered) else 0.0,
+            'pool': pool,
+            'multi_select': ';' in col,
+        }
+    return {'padding_rate': float(padding.mean()) if len(df) else 0.0, 'columns': columns}
+
+
+def make_units(units: int) -> List[str]:
+    """Organizational unit names: 'Region: ...' offices and departments"""
+    region_units = max(1, int(units * REGION_UNIT_SHARE)) if units > 1 else units
+    names = []
+    for i in range(region_units):
+        region = REGIONS[i % len(REGIONS)]
+        names.append(f"Region: {region}" if i < len(REGIONS) else f"Region: {region} - Office {i // len(REGIONS)}")
+    names.extend(f"Synthetic Department {i + 1:05d}" for i in range(units - region_units))
+    return names
+
+
+def make_users(units: List[str], users_per_unit: int, start_year: int) -> pd.DataFrame:
+    """One row per respondent: UserId (USR-YYYYMM-NNNN, as in the export) and organizational unit"""
+    unit_index = np.repeat(np.arange(len(units)), users_per_unit)
+    user_ids = [f"USR-{start_year}06-{i + 1:04d}" for i in range(len(unit_index))]
+    return pd.DataFrame({'UserId': user_ids, 'Department/Region': np.asarray(units, dtype=object)[unit_index]})
+
+
+def _answers(rng: np.random.Generator, column: str, spec: Dict[str, Any], n: int,
+             multi_select_rate: float) -> np.ndarray:
+    """Generate n answers for one column (None where the respondent left it blank)"""
+    out = np.full(n, None, dtype=object)
+    filled = rng.random(n) < spec['fill_rate']
+    count = int(filled.sum())
+    if not count:
+        return out
+    if spec['pool'] is None:
+        stem = column.split('(')[0].strip(' ?') or 'Answer'
+        ids = rng.integers(1, max(10, n), size=count)
+        out[filled] = [f"Synthetic {stem} {i}" for i in ids]
+        return out
+
+    values, weights = spec['pool']
+    picks = rng.choice(values, size=count, p=weights)
+    if spec['multi_select'] and multi_select_rate > 0 and len(values) > 1:
+        multi = rng.random(count) < multi_select_rate
+        second = rng.choice(values, size=int(multi.sum()), p=weights)
+        picks[multi] = [f"{a}; {b}" if a != b else a for a, b in zip(picks[multi], second)]
+    out[filled] = picks
+    return out
+
+
+def _with_padding(rng: np.random.Generator, frame: pd.DataFrame, padding_rate: float,
+                  columns: List[str]) -> pd.DataFrame:
+    """Add blank padding rows (identity and year only) after answered rows, keeping each user's rows together"""
+    if padding_rate <= 0 or padding_rate >= 1 or frame.empty:
+        return frame[columns]
+    n_padding = int(round(len(frame) * padding_rate / (1 - padding_rate)))
+    source = rng.integers(0, len(frame), size=n_padding)
+    padding = frame.iloc[source][ID_COLUMNS + [YEAR_COLUMN]].copy()
+    padding['_order'] = frame['_order'].to_numpy()[source] + 0.5
+    combined = pd.concat([frame, padding], ignore_index=True).sort_values('_order', kind='stable')
+    return combined.reindex(columns=columns)
+
+
+def generate_part1(rng: np.random.Generator, template: pd.DataFrame, years: List[int], respondents: int) -> pd.DataFrame:
+    """PART1 counts: every (question, option) of the template for every year"""
+    pairs = template[['question', 'option']].drop_duplicates()
+    rows = []
+    for year in years:
+        # Share of respondents choosing each option, loosely following the template
+        shares = rng.uniform(0.05, 0.9, size=len(pairs))
+        counts = rng.binomial(respondents, shares)
+        frame = pairs.copy()
+        frame['count'] = counts
+        frame['year'] = year
+        rows.append(frame)
+    return pd.concat(rows, ignore_index=True)[list(template.columns)]
+
+
+def generate_answers(rng: np.random.Generator, template: pd.DataFrame, users: pd.DataFrame, years: List[int],
+                     n_rows: Optional[int], multi_select_rate: float) -> pd.DataFrame:
+    """
+    PART2 / PART3 file:
+    - n_rows None: one answered row per user and year (PART2)
+    - otherwise n_rows answered rows spread over random users and years (PART3 outputs)
+    """
+    profile = profile_template(template)
+    if n_rows is None:
+        user_index = np.tile(np.arange(len(users)), len(years))
+        year_values = np.repeat(years, len(users))
+    else:
+        user_index = rng.integers(0, len(users), size=n_rows)
+        year_values = np.asarray(years)[rng.integers(0, len(years), size=n_rows)]
+    frame = users.iloc[user_index].reset_index(drop=True)
+    frame[YEAR_COLUMN] = year_values
+    for col, spec in profile['columns'].items():
+        frame[col] = _answers(rng, col, spec, len(frame), multi_select_rate)
+    # Group the rows as the export does: by year, then respondent
+    frame['_order'] = np.lexsort((user_index, year_values))
+    frame['_order'] = np.argsort(frame['_order'].to_numpy()).astype(float)
+    return _with_padding(rng, frame, profile['padding_rate'], list(template.columns))
+
+
+def generate_dataset(dest_dir: str, years: int = 3, units: int = 17, output_rows: int = 1000,
+                     users_per_unit: int = 2, start_year: int = 2024, seed: int = 0,
+                     multi_select_rate: float = 0.05, template_dir: str = DEFAULT_TEMPLATE_DIR) -> Dict[str, int]:
+    """
+    Write a complete synthetic data directory, returns the row count per file
+    - output_rows: answered output rows across the four PART3 files (split evenly)
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(dest_dir, exist_ok=True)
+    year_list = list(range(start_year, start_year + years))
+    users = make_users(make_units(units), users_per_unit, start_year)
+    per_part3 = max(1, output_rows // len(data_loader.PART3_KEYS))
+
+    written = {}
+    for key, name in data_loader.DATA_FILES.items():
+        template = _read_template(template_dir, key)
+        if key == 'PART1':
+            frame = generate_part1(rng, template, year_list, len(users))
+        elif key in data_loader.PART2_KEYS:
+            frame = generate_answers(rng, template, users, year_list, None, multi_select_rate)
+        else:
+            frame = generate_answers(rng, template, users, year_list, per_part3, multi_select_rate)
+        frame.to_csv(os.path.join(dest_dir, name), index=False, encoding='utf-8-sig')
+        written[name] = len(frame)
+
+    # Non-survey files the pages read from the data directory (logo, question list)
+    for name in os.listdir(template_dir):
+        if name not in data_loader.DATA_FILES.values():
+            shutil.copy2(os.path.join(template_dir, name), os.path.join(dest_dir, name))
+    return written
+
+
+def parse_spec(spec: str) -> Dict[str, int]:
+    """'years=50,units=5000,rows=1000000' -> generate_dataset keyword arguments"""
+    names = {'years': 'years', 'units': 'units', 'rows': 'output_rows', 'users': 'users_per_unit', 'seed': 'seed'}
+    kwargs = {}
+    for part in filter(None, spec.split(',')):
+        key, _, value = part.partition('=')
+        if key.strip() not in names:
+            raise ValueError(f"Unknown synthetic option: {key} (expected {', '.join(names)})")
+        kwargs[names[key.strip()]] = int(value)
+    return kwargs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('dest_dir', help="Directory to write the data files to")
+    parser.add_argument('--years', type=int, default=3, help="Number of reporting years (default: %(default)s)")
+    parser.add_argument('--start-year', type=int, default=2024, help="First reporting year (default: %(default)s)")
+    parser.add_argument('--units', type=int, default=17, help="Organizational units (default: %(default)s)")
+    parser.add_argument('--users-per-unit', type=int, default=2, help="Respondents per unit (default: %(default)s)")
+    parser.add_argument('--output-rows', type=int, default=1000,
+                        help="Answered output rows across the four PART3 files (default: %(default)s)")
+    parser.add_argument('--multi-select-rate', type=float, default=0.05,
+                        help="Share of multi-select answers with two options (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument('--template-dir', default=DEFAULT_TEMPLATE_DIR, help="Data directory to mimic")
+    args = parser.parse_args(argv)
+
+    written = generate_dataset(args.dest_dir, years=args.years, units=args.units, output_rows=args.output_rows,
+                               users_per_unit=args.users_per_unit, start_year=args.start_year, seed=args.seed,
+                               multi_select_rate=args.multi_select_rate, template_dir=args.template_dir)
+    for name, rows in written.items():
+        print(f"📄 {name}: {rows:,} rows")
+    print(f"✅ Synthetic data written to {args.dest_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
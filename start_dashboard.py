@@ -2,6 +2,9 @@
 """
 YEAP Dashboard - Quick Start Script (Python Version)
 Usage: Run this script directly in your IDE, or execute 'python start_dashboard.py' in command line
+       Add '--prewarm' (or set YEAP_PREWARM=1) to build the data and chart cache before the server starts
+       Add '--perf' (or set YEAP_PERF=1) to time every page run in a sidebar panel and .yeap_perf/runs.jsonl
+       Add '--data-source orignaldata_fake_data' (or set YEAP_DATA_SOURCE) to serve another data directory
 """
 
 import os
@@ -47,6 +50,39 @@ def check_dependencies():
         print("Please install it using: pip install streamlit")
         return False
 
+def should_prewarm():
+    """Check whether the cache pre-warm phase was requested"""
+    return "--prewarm" in sys.argv[1:] or os.environ.get("YEAP_PREWARM") == "1"
+
+def prewarm_cache():
+    """Load all datasets and render the default-year pages so the first visitor gets a warm cache"""
+    print("🔥 Pre-warming data and chart cache...")
+    try:
+        subprocess.run([sys.executable, "cache_warmup.py"], cwd="streamlit", check=True)
+        print("✅ Cache pre-warm complete")
+    except subprocess.CalledProcessError:
+        print("⚠️  Cache pre-warm incomplete, pages will build on first visit")
+    except KeyboardInterrupt:
+        print("\n⏭️  Cache pre-warm skipped")
+
+def select_data_source():
+    """Default data source from --data-source NAME (inherited by the warm-up and the server process)"""
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        if arg.startswith("--data-source="):
+            os.environ["YEAP_DATA_SOURCE"] = arg.split("=", 1)[1]
+        elif arg == "--data-source" and i + 1 < len(args):
+            os.environ["YEAP_DATA_SOURCE"] = args[i + 1]
+    if os.environ.get("YEAP_DATA_SOURCE"):
+        print(f"📁 Data source: {os.environ['YEAP_DATA_SOURCE']}")
+
+def enable_perf_monitor():
+    """Turn on the per-run stage timing (inherited by the Streamlit server process)"""
+    if "--perf" in sys.argv[1:]:
+        os.environ["YEAP_PERF"] = "1"
+    if os.environ.get("YEAP_PERF") == "1":
+        print("⏱️  Performance instrumentation enabled (sidebar panel, .yeap_perf/runs.jsonl)")
+
 def start_streamlit():
     """Start the Streamlit application"""
     try:
@@ -87,6 +123,11 @@ def main():
         input("Press Enter to exit...")
         sys.exit(1)
     
+    select_data_source()
+    if should_prewarm():
+        prewarm_cache()
+    
+    enable_perf_monitor()
     start_streamlit()
 
 if __name__ == "__main__":
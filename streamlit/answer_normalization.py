@@ -0,0 +1,126 @@
+"""
+Answer normalization - the canonical spelling of the answers to the option-style survey fields
+
+The table (answer_normalization.json, versioned) lists groups of columns, each with its
+canonical answers and the other spellings read as them. It is loaded once per process and
+applied by exact-match lookup on a field's distinct values (case and whitespace runs ignored):
+free text and the fields the table does not list are never rewritten.
+
+Values of a listed column that the table does not know are kept as they are and reported
+by the audit (unmapped_answers, `python streamlit/answer_normalization.py`), so new spellings
+can be added to the table instead of splitting a chart unnoticed.
+
+Usage (from the project root):
+    python streamlit/answer_normalization.py [SOURCE]   # unmapped answers of every data file
+"""
+import os
+import json
+import argparse
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+import data_schema
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'answer_normalization.json')
+
+_table = None
+
+
+def match_key(value: str) -> str:
+    """Lookup key of an answer: whitespace runs collapsed, lower case"""
+    return ' '.join(value.split()).lower()
+
+
+def load_table() -> Dict:
+    """
+    The normalization table, read once: its version and, by column name (whitespace collapsed),
+    the lookup of its group (match key -> canonical answer)
+    """
+    global _table
+    if _table is None:
+        with open(TABLE_PATH, encoding='utf-8') as f:
+            table = json.load(f)
+        columns = {}
+        for group in table['groups'].values():
+            lookup = {}
+            for answer, spellings in group['answers'].items():
+                for spelling in [answer] + spellings:
+                    lookup[match_key(spelling)] = answer
+            for column in group['columns']:
+                columns[data_schema.normalize_name(column)] = lookup
+        _table = {'version': table['version'], 'columns': columns}
+    return _table
+
+
+def column_lookup(column: str) -> Optional[Dict[str, str]]:
+    """Match key -> canonical answer of a column (None if the table does not list it)"""
+    return load_table()['columns'].get(data_schema.normalize_name(column))
+
+
+def canonical_answers(values: pd.Series, column: str) -> pd.Series:
+    """Values of a column with the spellings the table knows replaced by their canonical answer"""
+    lookup = column_lookup(column)
+    if not lookup:
+        return values
+    return values.map(lambda value: lookup.get(match_key(value), value) if isinstance(value, str) else value)
+
+
+def _count_unmapped(df: pd.DataFrame, columns: List[str], counts: Dict[str, Dict[str, int]]):
+    for column in columns:
+        lookup = column_lookup(column)
+        for value, n in df[column].dropna().astype(str).value_counts(sort=False).items():
+            if match_key(value) not in lookup:
+                column_counts = counts.setdefault(column, {})
+                column_counts[value] = column_counts.get(value, 0) + int(n)
+
+
+def unmapped_answers() -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Answers of the columns the table lists that it does not know, in each PART3 file of the
+    current source: file name -> column -> answer -> rows
+    """
+    import data_loader
+
+    report = {}
+    for key in data_loader.PART3_KEYS:
+        path = data_loader.data_file_path(key)
+        if not data_loader.data_file_exists(path):
+            continue
+        counts = {}
+        if data_loader.streams(path):
+            columns = [column for column in data_loader.stream_columns(path) if column_lookup(column)]
+            for chunk in data_loader.iter_year_chunks(path, 'All', columns):
+                _count_unmapped(chunk, columns, counts)
+        else:
+            df = data_loader.load_year_rows(path, 'All')
+            _count_unmapped(df, [column for column in df.columns if column_lookup(column)], counts)
+        report[data_loader.DATA_FILES[key]] = counts
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('source', nargs='?', help="Data source (folder in the project root, default: YEAP_DATA_SOURCE)")
+    args = parser.parse_args(argv)
+
+    import data_loader
+
+    if args.source:
+        data_loader.use_source(args.source)
+    print(f"Normalization table version {load_table()['version']}")
+    report = unmapped_answers()
+    for file_name, counts in report.items():
+        if not counts:
+            print(f"✅ {file_name}")
+            continue
+        print(f"⚠️ {file_name}:")
+        for column, answers in counts.items():
+            print(f"     - {data_schema.normalize_name(column)[:60]}:")
+            for answer, n in sorted(answers.items(), key=lambda item: -item[1]):
+                print(f"         {answer!r}: {n} rows")
+    return 1 if any(report.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
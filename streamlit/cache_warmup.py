@@ -0,0 +1,108 @@
+"""
+Cache warm-up - builds the persisted artefact cache before the server accepts connections
+
+Loads every survey file, builds the filter option lists, then renders each page
+headlessly (streamlit AppTest) for the default year so the aggregates and
+figures are written to data_cache.CACHE_DIR, where the server picks them up.
+Every data source a session can select (data_loader.SELECTABLE_SOURCES) is warmed
+in its own cache namespace.
+
+Usage:
+    python start_dashboard.py --prewarm        (or set YEAP_PREWARM=1)
+    python streamlit/cache_warmup.py [YEAR ...]
+"""
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import data_cache
+import data_loader
+import st_styles
+from st_styles import CHART_PAYLOAD_STATE_KEY
+
+# Main app script rendered by the warm-up
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+# Widget keys defined in streamlit_app.py
+PAGE_WIDGET_KEY = 'page_selection'
+YEAR_WIDGET_KEY = 'selected_year_widget'
+SOURCE_STATE_KEY = 'data_source'
+
+
+def load_datasets() -> List[str]:
+    """Parse every survey file once and build the filter option lists, returns the year options"""
+    for key in data_loader.DATA_FILES:
+        data_loader.load_dataset(key)
+    data_loader.get_region_options()
+    return data_loader.get_year_options()
+
+
+def render_pages(years: List[str], timeout: int = 120, payloads: Optional[Dict[str, Dict[str, int]]] = None,
+                 source: Optional[str] = None) -> List[str]:
+    """
+    Render every page for each year headlessly, returns the errors raised by pages
+    - payloads (if given) receives the chart payload bytes of each page, keyed by "year / page"
+    - source: data source of the session (default: data_loader.DEFAULT_SOURCE)
+    """
+    from streamlit.testing.v1 import AppTest
+
+    errors = []
+    # The pages run in this process: chart payloads are measured only while they are collected
+    recording = st_styles.RECORD_CHART_PAYLOADS
+    st_styles.RECORD_CHART_PAYLOADS = recording or payloads is not None
+    try:
+        app = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        if source is not None:
+            app.session_state[SOURCE_STATE_KEY] = source
+        app.run()
+        pages = list(app.radio(key=PAGE_WIDGET_KEY).options)
+
+        for year in years:
+            if app.selectbox(key=YEAR_WIDGET_KEY).value != year:
+                app.selectbox(key=YEAR_WIDGET_KEY).set_value(year).run()
+            for page in pages:
+                app.radio(key=PAGE_WIDGET_KEY).set_value(page).run()
+                errors.extend(f"{year} / {page}: {exc.value}" for exc in app.exception)
+                if payloads is not None and CHART_PAYLOAD_STATE_KEY in app.session_state:
+                    payloads[f"{year} / {page}"] = dict(app.session_state[CHART_PAYLOAD_STATE_KEY])
+    finally:
+        st_styles.RECORD_CHART_PAYLOADS = recording
+    return errors
+
+
+def warm_caches(years: Optional[List[str]] = None, verbose: bool = True) -> bool:
+    """
+    Warm the artefact cache of every selectable data source:
+    - years defaults to the dashboard's default year (of each source)
+    - Returns False if a page failed to render (the server still starts, just colder)
+    """
+    start = time.time()
+    # Artefacts written by previous code versions can never be read again
+    data_cache.prune_stale_versions()
+    payloads, errors, warmed = {}, [], []
+    for source in data_loader.SELECTABLE_SOURCES:
+        # Same cache namespace as the sessions reading this source
+        data_loader.use_source(source)
+        year_options = load_datasets()
+        source_years = [year for year in years or [data_loader.get_default_year(year_options)] if year in year_options]
+        source_payloads = {}
+        errors.extend(render_pages(source_years, payloads=source_payloads, source=source))
+        if len(data_loader.SELECTABLE_SOURCES) > 1:
+            source_payloads = {f"{source} / {page}": charts for page, charts in source_payloads.items()}
+        payloads.update(source_payloads)
+        warmed.append(f"{source}: {', '.join(source_years)}" if len(data_loader.SELECTABLE_SOURCES) > 1
+                      else ', '.join(source_years))
+
+    if verbose:
+        print(f"🔥 Cache warmed for {'; '.join(warmed)} in {time.time() - start:.1f}s ({data_cache.CACHE_DIR})")
+        for page, charts in payloads.items():
+            print(f"📦 {page}: {len(charts)} charts, {sum(charts.values()) / 1024:.1f} KB "
+                  f"(largest {max(charts.values(), default=0) / 1024:.1f} KB)")
+        for error in errors:
+            print(f"⚠️  {error}")
+    return not errors
+
+
+if __name__ == "__main__":
+    sys.exit(0 if warm_caches(sys.argv[1:]) else 1)
@@ -3,6 +3,9 @@ Color Configuration Document
 
 This document defines the complete color scheme for the dashboard
 """
+from functools import lru_cache
+
+import numpy as np
 
 # Primary Color Configuration
 PRIMARY_COLOR = "rgb(30, 45, 190)"  # Primary Color
@@ -33,6 +36,17 @@ FREQUENCY_GRADIENT_COLORS = [
 PRIMARY_COLOR_HEX = "#1E2DBE"
 SECONDARY_COLOR_HEX = "#FA3C4B"
 
+# Frequency/regional gradient stops, lightest to darkest (same order as FREQUENCY_GRADIENT_COLORS)
+FREQUENCY_GRADIENT_COLORS_HEX = [
+    '#BEDCfa',  # rgb(190, 220, 250) - lightest
+    '#82AFDC',  # rgb(130, 175, 220)
+    '#5A87CD',  # rgb(90, 135, 205)
+    '#3264C8',  # rgb(50, 100, 200)
+    '#1E2DBE',  # rgb(30, 45, 190) - ILO BLUE (main color)
+    '#151F85',  # rgb(21, 31, 133)
+    '#230050'   # rgb(35, 0, 80) - darkest
+]
+
 CHART_COLORS_HEX = [
     "#1E2DBE",  # Primary Color
     "#FA3C4B",  # Secondary Color
@@ -81,6 +95,30 @@ def get_color_hex_by_index(index):
         return CHART_COLORS_HEX[index]
     return PRIMARY_COLOR_HEX
 
-def get_frequency_gradient_colors():
+def get_frequency_gradient_colors(hex_format=False):
     """Returns the list of gradient colors for frequency analysis"""
-    return FREQUENCY_GRADIENT_COLORS
\ No newline at end of file
+    return FREQUENCY_GRADIENT_COLORS_HEX if hex_format else FREQUENCY_GRADIENT_COLORS
+
+@lru_cache(maxsize=None)
+def _palette_array(palette):
+    return np.array(palette, dtype=object)
+
+@lru_cache(maxsize=None)
+def get_gradient_colorscale(palette=tuple(FREQUENCY_GRADIENT_COLORS_HEX)):
+    """Returns a Plotly colorscale ([position, color] pairs) spreading the palette evenly over 0-1"""
+    return tuple((i / (len(palette) - 1), color) for i, color in enumerate(palette))
+
+def map_values_to_gradient(values, palette=tuple(FREQUENCY_GRADIENT_COLORS_HEX)):
+    """
+    Maps values to gradient colors in one vectorized step (larger value = darker color)
+    - Values are min-max normalized and truncated onto the palette stops
+    - Returns a list of colors, one per value
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return []
+    min_val = values.min()
+    max_val = values.max()
+    val_range = max_val - min_val if max_val != min_val else 1
+    color_idx = ((values - min_val) / val_range * (len(palette) - 1)).astype(int)
+    return _palette_array(tuple(palette))[color_idx].tolist()
\ No newline at end of file
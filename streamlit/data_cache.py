@@ -0,0 +1,386 @@
+"""
+Artefact cache shared by the dashboard pages and the start-up warm-up
+
+Artefacts (parsed frames, aggregates, option lists, figures) are kept in process
+memory and mirrored to a versioned directory under CACHE_DIR, keyed by artefact
+name, parameters and the content hash of the source files they were derived
+from. The version directory combines the cache format, the dashboard code and
+the pandas version, so a deploy with changed code never reads old artefacts.
+
+A restarted server (or one started after `python start_dashboard.py --prewarm`)
+therefore finds its artefacts on disk; frames are stored as Arrow files and
+memory-mapped when pyarrow is installed, and pickled otherwise.
+
+Artefacts of each data source live in their own namespace (set_namespace, called by
+data_loader.use_source): part of the key and a sub-directory of the version directory.
+
+The in-memory copies are bounded by MEMORY_CACHE_MB (YEAP_MEMORY_CACHE_MB, 0 for no bound):
+beyond it the least recently used artefacts are dropped, figures first, then aggregates, then
+parsed frames (the costliest to rebuild). Dropped artefacts are read back from disk when needed.
+"""
+import os
+import re
+import sys
+import glob
+import json
+import pickle
+import shutil
+import hashlib
+import threading
+import contextvars
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+# Optional: Arrow storage for DataFrames (memory-mapped reads)
+try:
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+from perf_monitor import record_read, READ_CACHE, READ_HASH
+
+# Get absolute path of project root directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# On-disk cache location (override with YEAP_CACHE_DIR, disable with YEAP_DISK_CACHE=0)
+CACHE_DIR = os.environ.get('YEAP_CACHE_DIR', os.path.join(PROJECT_ROOT, '.yeap_cache'))
+DISK_CACHE_ENABLED = os.environ.get('YEAP_DISK_CACHE', '1') != '0'
+# Bound of the in-memory artefacts in MB (deep size, see memory_monitor.deep_sizeof); 0 = unbounded
+MEMORY_CACHE_MB = float(os.environ.get('YEAP_MEMORY_CACHE_MB', '1024'))
+
+# Bump when the on-disk layout or serialisation changes
+CACHE_FORMAT_VERSION = 2
+# Names of the version directories code_version() produces (the only entries pruned from CACHE_DIR)
+_VERSION_DIR_PATTERN = re.compile(rf"^v{CACHE_FORMAT_VERSION}-[0-9a-f]{{12}}$")
+
+# In-memory artefacts, least recently used first
+_memory_cache = OrderedDict()
+# Source files and signature of each in-memory artefact (for invalidate)
+_memory_sources = {}
+# Kind and deep size in bytes of each in-memory artefact, and their total
+_memory_sizes = {}
+_memory_bytes = 0
+# Artefact kinds in eviction order: figures go first, parsed frames last
+KIND_FIGURE, KIND_ARTIFACT, KIND_FRAME = 0, 1, 2
+_file_hashes = {}
+_code_version = None
+_lock = threading.Lock()
+# Namespace of the current context (a session's script run); None is the shared default
+_namespace = contextvars.ContextVar('data_cache_namespace', default=None)
+
+
+def _hash_file(path: str, size: Optional[int] = None) -> str:
+    """SHA-1 based content hash of a file, or of its first `size` bytes"""
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        remaining = size
+        while remaining is None or remaining > 0:
+            block = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not block:
+                break
+            sha.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return sha.hexdigest()[:16]
+
+
+def file_hash(path: str):
+    """Content hash of a file, recomputed only when its mtime or size changes (None if missing)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    start = time.perf_counter()
+    value = _hash_file(path)
+    record_read(path, READ_HASH, (time.perf_counter() - start) * 1000, nbytes=stat.st_size)
+    with _lock:
+        _file_hashes[path] = (stamp, value)
+    return value
+
+
+def prefix_hash(path: str, size: int):
+    """Content hash of the first `size` bytes of a file, comparable with file_hash (None if unreadable)"""
+    start = time.perf_counter()
+    try:
+        value = _hash_file(path, size)
+    except OSError:
+        return None
+    record_read(path, READ_HASH, (time.perf_counter() - start) * 1000, nbytes=size)
+    return value
+
+
+def source_signature(paths: Iterable[str]) -> Tuple:
+    """Signature of source files: (name, content hash) per file, missing files included as such"""
+    return tuple((os.path.basename(path), file_hash(path)) for path in paths)
+
+
+def code_version() -> str:
+    """Version of the code producing artefacts: cache format, dashboard sources and tables, library versions"""
+    global _code_version
+    if _code_version is None:
+        import pandas as pd
+        sha = hashlib.sha1(f"{CACHE_FORMAT_VERSION}|{pd.__version__}|{sys.version_info[:2]}".encode('utf-8'))
+        # Code and the tables it reads (answer_normalization.json)
+        for path in sorted(glob.glob(os.path.join(CODE_DIR, '*.py')) + glob.glob(os.path.join(CODE_DIR, '*.json'))):
+            with open(path, 'rb') as f:
+                sha.update(f.read())
+        _code_version = f"v{CACHE_FORMAT_VERSION}-{sha.hexdigest()[:12]}"
+    return _code_version
+
+
+def digest(obj: Any) -> str:
+    """Stable short hash of a JSON-serialisable object (dict order is significant, it drives chart order)"""
+    try:
+        payload = json.dumps(obj, default=str, ensure_ascii=False)
+    except TypeError:
+        # Dict keys JSON cannot encode (e.g. numpy scalars)
+        payload = repr(obj)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def set_namespace(namespace: Optional[str]) -> None:
+    """Keep the artefacts of the current context (thread or copied context) in their own namespace"""
+    _namespace.set(namespace)
+
+
+def current_namespace() -> Optional[str]:
+    return _namespace.get()
+
+
+def _artifact_path(name: str, key: str, ext: str = 'pkl') -> str:
+    namespace = _namespace.get()
+    if namespace is None:
+        return os.path.join(CACHE_DIR, code_version(), name, f"{key}.{ext}")
+    return os.path.join(CACHE_DIR, code_version(), namespace, name, f"{key}.{ext}")
+
+
+def _atomic_write(path: str, write: Callable[[str], None]) -> bool:
+    """Write through a temp file and rename, so readers never see a partial file"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        # A read-only or full disk only costs us the persistence, never the page
+        return False
+
+
+def _read_disk(name: str, key: str):
+    """Return (found, value) for a persisted artefact"""
+    if not DISK_CACHE_ENABLED:
+        return False, None
+    path = _artifact_path(name, key)
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except Exception:
+        return False, None
+    record_read(path, READ_CACHE, (time.perf_counter() - start) * 1000)
+    return True, value
+
+
+def _write_disk(name: str, key: str, value: Any) -> None:
+    """Persist an artefact with pickle"""
+    if not DISK_CACHE_ENABLED:
+        return
+
+    def _write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    _atomic_write(_artifact_path(name, key), _write)
+
+
+def _read_frame(name: str, key: str):
+    """Return (found, frame) for a persisted DataFrame, memory-mapping Arrow files"""
+    if not DISK_CACHE_ENABLED:
+        return False, None
+    if ARROW_AVAILABLE:
+        path = _artifact_path(name, key, 'arrow')
+        start = time.perf_counter()
+        try:
+            table = feather.read_table(path, memory_map=True)
+            df = table.to_pandas()
+            record_read(path, READ_CACHE, (time.perf_counter() - start) * 1000)
+            return True, df
+        except Exception:
+            pass
+    return _read_disk(name, key)
+
+
+def _write_frame(name: str, key: str, df) -> None:
+    """Persist a DataFrame as Arrow (pickle when pyarrow is missing or the frame has no Arrow form)"""
+    if not DISK_CACHE_ENABLED:
+        return
+    if ARROW_AVAILABLE and _atomic_write(_artifact_path(name, key, 'arrow'), df.to_feather):
+        return
+    _write_disk(name, key, df)
+
+
+def _drop(memory_key) -> None:
+    """Forget an in-memory artefact (caller holds _lock)"""
+    global _memory_bytes
+    _memory_cache.pop(memory_key, None)
+    _memory_sources.pop(memory_key, None)
+    _kind, size = _memory_sizes.pop(memory_key, (None, 0))
+    _memory_bytes -= size
+
+
+def _evict(keep) -> None:
+    """Drop least recently used artefacts, lowest kind first, until within MEMORY_CACHE_MB (caller holds _lock)"""
+    budget = MEMORY_CACHE_MB * 1024 * 1024
+    if budget <= 0 or _memory_bytes <= budget:
+        return
+    # _memory_cache is in use order, so a stable sort by kind keeps the least recently used first
+    for memory_key in sorted(_memory_cache, key=lambda k: _memory_sizes[k][0]):
+        if _memory_bytes <= budget:
+            break
+        if memory_key != keep:
+            _drop(memory_key)
+
+
+def _store(memory_key, value, kind: int, sources: List[str], signature: Tuple) -> None:
+    """Keep an artefact in memory, evicting others beyond MEMORY_CACHE_MB"""
+    global _memory_bytes
+    size = 0
+    if MEMORY_CACHE_MB > 0:
+        import memory_monitor
+        size = memory_monitor.deep_sizeof(value)
+    with _lock:
+        _drop(memory_key)
+        _memory_cache[memory_key] = value
+        _memory_sources[memory_key] = (frozenset(os.path.abspath(path) for path in sources), signature)
+        _memory_sizes[memory_key] = (kind, size)
+        _memory_bytes += size
+        _evict(memory_key)
+
+
+def _key(name: str, params: Any, signature: Tuple) -> str:
+    """Cache key of an artefact in the current namespace"""
+    namespace = _namespace.get()
+    return digest([name, params, signature] if namespace is None else [namespace, name, params, signature])
+
+
+def _get(name: str, params: Any, sources: Iterable[str], builder: Callable[[], Any], persist: bool,
+         read, write, signature: Optional[Tuple] = None, kind: int = KIND_ARTIFACT) -> Any:
+    sources = list(sources)
+    if signature is None:
+        signature = source_signature(sources)
+    key = _key(name, params, signature)
+    memory_key = (name, key)
+    with _lock:
+        if memory_key in _memory_cache:
+            _memory_cache.move_to_end(memory_key)
+            return _memory_cache[memory_key]
+
+    found, value = read(name, key) if persist else (False, None)
+    if not found:
+        value = builder()
+        if persist:
+            write(name, key, value)
+    _store(memory_key, value, kind, sources, signature)
+    return value
+
+
+def get_artifact(name: str, params: Any, sources: Iterable[str], builder: Callable[[], Any],
+                 persist: bool = True, signature: Optional[Tuple] = None) -> Any:
+    """
+    Get a cached artefact, building it on a miss:
+    - Lookup order: process memory, then disk (if persist), then builder()
+    - The key covers name, params and the source file hashes, so edited data files are never served stale
+    - signature: precomputed source signature used instead of the file hashes (e.g. the hash of
+      one year's rows from data_loader.partition_signature, so appending another year keeps the entry)
+    - Cached values are shared; callers must not mutate them
+    """
+    return _get(name, params, sources, builder, persist, _read_disk, _write_disk, signature)
+
+
+def get_frame(name: str, params: Any, sources: Iterable[str], builder: Callable[[], Any],
+              persist: bool = True, signature: Optional[Tuple] = None):
+    """Get a cached DataFrame (same contract as get_artifact, stored as a memory-mapped Arrow file)"""
+    return _get(name, params, sources, builder, persist, _read_frame, _write_frame, signature, KIND_FRAME)
+
+
+def find_frame(name: str, params: Any, signature: Tuple):
+    """
+    A DataFrame cached under a given source signature (in memory, else on disk), or None; never
+    built nor kept in memory (e.g. the previous version of a file whose new rows are appended to it)
+    """
+    memory_key = (name, _key(name, params, signature))
+    with _lock:
+        if memory_key in _memory_cache:
+            return _memory_cache[memory_key]
+    found, df = _read_frame(*memory_key)
+    return df if found else None
+
+
+def get_figure(name: str, params: Any, builder: Callable[[], Any], sources: Iterable[str] = (),
+               signature: Optional[Tuple] = None):
+    """
+    Get a cached Plotly figure, building it on a miss.
+    Figures are stored as JSON and a fresh Figure is returned on every call, so callers may update it.
+    """
+    def _build_json():
+        fig = builder()
+        return fig.to_json() if fig is not None else None
+
+    fig_json = _get(name, params, sources, _build_json, True, _read_disk, _write_disk, signature, KIND_FIGURE)
+    if fig_json is None:
+        return None
+    import plotly.io as pio
+    return pio.from_json(fig_json)
+
+
+def clear_memory_cache() -> None:
+    """Drop all in-memory artefacts (the on-disk copies are kept)"""
+    global _memory_bytes
+    with _lock:
+        _memory_cache.clear()
+        _memory_sources.clear()
+        _memory_sizes.clear()
+        _memory_bytes = 0
+
+
+def invalidate(path: str, is_stale: Optional[Callable[[Tuple], bool]] = None) -> int:
+    """
+    Drop the in-memory artefacts built from a file, returns how many were dropped
+    - is_stale(signature) narrows it to the artefacts whose signature no longer matches the file
+      (e.g. data_loader.superseded keeps the artefacts of years the change did not touch)
+    - Artefacts of other files are kept; the on-disk copies are never removed (their keys no longer match)
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        candidates = [(key, signature) for key, (paths, signature) in _memory_sources.items() if path in paths]
+    stale = [key for key, signature in candidates if is_stale is None or is_stale(signature)]
+    with _lock:
+        for key in stale:
+            _drop(key)
+    return len(stale)
+
+
+def prune_stale_versions() -> int:
+    """
+    Remove on-disk cache directories written by other code versions, returns how many were removed
+    - Only entries named like a version directory are touched: CACHE_DIR (YEAP_CACHE_DIR) may be
+      a shared directory, whose other contents are never removed
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    removed = 0
+    for entry in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, entry)
+        if (_VERSION_DIR_PATTERN.match(entry) and entry != code_version() and os.path.isdir(path)
+                and not os.path.islink(path)):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
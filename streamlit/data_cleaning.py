@@ -0,0 +1,176 @@
+"""
+Data cleaning - one pass over every survey file when it is parsed, so render code can assume clean input
+
+For each text column:
+- leading and trailing whitespace is stripped
+- blank cells and the 'nan' / 'None' placeholders left by spreadsheet exports become missing values
+- organizational units spelled with a loose region prefix ('region :Africa') get the
+  canonical 'Region: ' prefix the pages split departments from regions by
+
+Rows with nothing but a year are dropped. Rows with content but no UserId or year are kept
+(other views still count them); they are only listed in the report.
+
+Every change is counted in a data-quality report per file (data_loader.quality_report),
+cached with the cleaned frame.
+
+Usage (from the project root):
+    python streamlit/data_cleaning.py [SOURCE] [--output report.json]   # data-quality report of every file
+"""
+import re
+import json
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Placeholders read as missing values (compared after stripping, case-insensitively)
+MISSING_TOKENS = {'', 'nan', 'none'}
+REGION_COLUMN = 'Department/Region'
+REGION_PREFIX = 'Region: '
+# Region prefix in any spacing or case
+_LOOSE_REGION_PREFIX = re.compile(r'^region\s*:\s*', re.IGNORECASE)
+YEAR_COLUMNS = ['year', 'YEAR']
+
+
+def _text_columns(df: pd.DataFrame) -> List[str]:
+    return [column for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)
+            or pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column])]
+
+
+def _text_changes(uniques) -> Dict[str, Optional[str]]:
+    """Cleaned form of each distinct value that cleaning changes (None: a missing value)"""
+    changes = {}
+    for value in uniques:
+        if not isinstance(value, str):
+            continue
+        stripped = value.strip()
+        if stripped.lower() in MISSING_TOKENS:
+            changes[value] = None
+        elif stripped != value:
+            changes[value] = stripped
+    return changes
+
+
+def _replace(values: pd.Series, codes: np.ndarray, uniques: list, changes: Dict[str, Optional[str]],
+             dtype) -> Tuple[pd.Series, int, int]:
+    """
+    Values with the changed distinct values replaced (exact match, through the factorized codes),
+    and the number of cells replaced by text and by a missing value
+    """
+    cleaned = [changes.get(value, value) for value in uniques]
+    # Code -1 (a missing value) picks the trailing NaN
+    replaced = np.array([np.nan if value is None else value for value in cleaned] + [np.nan], dtype=object)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    changed = np.array([value in changes for value in uniques], dtype=bool)
+    missing = np.array([value is None for value in cleaned], dtype=bool)
+    values = pd.Series(replaced[codes], index=values.index, name=values.name).astype(dtype)
+    return values, int(counts[changed & ~missing].sum()), int(counts[missing].sum())
+
+
+def _clean_text(values: pd.Series) -> Tuple[pd.Series, int, int]:
+    """Stripped values with placeholders missing, and the number of stripped and blanked cells"""
+    # Distinct values only: most columns have nothing to clean and are returned as they are
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques, dtype = values.cat.codes.to_numpy(), list(values.cat.categories), 'category'
+    else:
+        codes, uniques = pd.factorize(values)
+        uniques, dtype = list(uniques), values.dtype
+    changes = _text_changes(uniques)
+    if not changes:
+        return values, 0, 0
+    return _replace(values, codes, uniques, changes, dtype)
+
+
+def _canonical_regions(values: pd.Series) -> Tuple[pd.Series, int]:
+    """Organizational units with the canonical region prefix, and the number of cells changed"""
+    codes, uniques = pd.factorize(values)
+    uniques = list(uniques)
+    changes = {value: REGION_PREFIX + _LOOSE_REGION_PREFIX.sub('', value) for value in uniques
+               if isinstance(value, str) and _LOOSE_REGION_PREFIX.match(value) and not value.startswith(REGION_PREFIX)}
+    if not changes:
+        return values, 0
+    values, changed, _ = _replace(values, codes, uniques, changes, values.dtype)
+    return values, changed
+
+
+def clean(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Cleaned copy of a parsed survey file and its data-quality report"""
+    report = {'rows': len(df), 'stripped_cells': {}, 'missing_placeholders': {}, 'region_prefixes': 0}
+    # Shallow copy: only the cleaned columns are replaced
+    df = df.copy(deep=False)
+    for column in _text_columns(df):
+        values, stripped, missing = _clean_text(df[column])
+        if stripped or missing:
+            df[column] = values
+        if stripped:
+            report['stripped_cells'][column] = stripped
+        if missing:
+            report['missing_placeholders'][column] = missing
+    if REGION_COLUMN in df.columns:
+        df[REGION_COLUMN], report['region_prefixes'] = _canonical_regions(df[REGION_COLUMN])
+
+    year_col = next((column for column in YEAR_COLUMNS if column in df.columns), None)
+    content = [column for column in df.columns if column != year_col]
+    blank = df[content].isna().all(axis=1) if content else pd.Series(False, index=df.index)
+    report['blank_rows_dropped'] = int(blank.sum())
+    if blank.any():
+        df = df[~blank].reset_index(drop=True)
+    if 'UserId' in df.columns:
+        report['rows_without_user'] = int(df['UserId'].isna().sum())
+    if year_col is not None:
+        report['rows_without_year'] = int(df[year_col].isna().sum())
+    return df, report
+
+
+def merge_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Report of a file cleaned in chunks, from the reports of its chunks
+    (cleaning is row by row, so the cleaned chunks add up to the cleaned file)
+    """
+    merged = {}
+    for report in reports:
+        for name, value in report.items():
+            if isinstance(value, dict):
+                counts = merged.setdefault(name, {})
+                for column, count in value.items():
+                    counts[column] = counts.get(column, 0) + count
+            else:
+                merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+def has_issues(report: Dict[str, Any]) -> bool:
+    """Whether cleaning changed anything or left rows without a UserId or year"""
+    return any(report.get(name) for name in ['stripped_cells', 'missing_placeholders', 'region_prefixes',
+                                             'blank_rows_dropped', 'rows_without_user', 'rows_without_year'])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('source', nargs='?', help="Data source (folder in the project root, default: YEAP_DATA_SOURCE)")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    import data_loader
+
+    if args.source:
+        data_loader.use_source(args.source)
+    report = data_loader.quality_report()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+    for file_name, file_report in report.items():
+        marker = '🧹' if has_issues(file_report) else '✅'
+        print(f"{marker} {file_name}: {file_report['rows']} rows, {file_report['blank_rows_dropped']} blank dropped")
+        for name in ['stripped_cells', 'missing_placeholders']:
+            for column, count in file_report[name].items():
+                print(f"     - {name.replace('_', ' ')}: {count} in {' '.join(column.split())[:60]}")
+        for name in ['region_prefixes', 'rows_without_user', 'rows_without_year']:
+            if file_report.get(name):
+                print(f"     - {name.replace('_', ' ')}: {file_report[name]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
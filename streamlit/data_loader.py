@@ -0,0 +1,827 @@
+"""
+Data loader - single place that locates and reads the survey CSV files
+
+Parsed files, the year / organizational unit option lists and the other
+derived artefacts are cached through data_cache (in memory and on disk).
+
+Incremental ingest: when rows are appended to a file already parsed by this process,
+only the appended bytes are parsed and added to the previous frame. Each year of a
+file also gets a version token that only changes when that year's rows do, so
+artefacts of one year keyed by partition_signature survive another year being added.
+
+Year-partitioned layout: a data file split by partition_data.py is served from one CSV per
+year listed in partitions/manifest.json, so a single year only parses its own partition
+(load_year_rows). The partitions are used while the original file is absent or unchanged
+since the split; an edited file is newer than its partitions and is read as a whole.
+
+Data sources: the data directory is chosen per session among DATA_SOURCES (use_source),
+so the demo and production data can be served side by side by one process; each source
+keeps its artefacts in its own data_cache namespace.
+
+Streaming mode: files of at least YEAP_STREAM_MB megabytes are not held in memory by the
+aggregation paths; iter_year_chunks() reads them in chunks of YEAP_STREAM_CHUNK_ROWS rows,
+parsed with the column dtypes of a whole-file parse, so merged partial counts match the
+in-memory results.
+
+Schema: every survey file is parsed with the column types of data_schema (no type inference
+over free-text columns); schema_drift() reports files that no longer fit their schema.
+Every parsed file, partition and chunk is then cleaned once (data_cleaning), so the pages
+read stripped values with missing answers as NaN; quality_report() lists what was changed.
+
+Concurrent loading: independent files are parsed by up to YEAP_LOAD_WORKERS threads
+(load_concurrently); YEAP_CSV_ENGINE=pyarrow parses with the multi-threaded pyarrow CSV
+reader where pyarrow is installed.
+"""
+import io
+import os
+import json
+import time
+import warnings
+import threading
+import contextvars
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Optional: pyarrow CSV engine
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+import data_cache
+import data_schema
+import data_cleaning
+from perf_monitor import timed, record_read, start_stage, end_stage, worker_context, attach_worker, STAGE_DATA, READ_PARSE
+
+# Get absolute path of project root directory
+PROJECT_ROOT = data_cache.PROJECT_ROOT
+
+# Data sources by name. The default source is YEAP_DATA_SOURCE (a name or a directory path),
+# YEAP_DATA_SOURCES lists the sources a session can switch to (comma separated)
+DATA_SOURCES = {
+    'orignaldata': os.path.join(PROJECT_ROOT, 'orignaldata'),
+    'orignaldata_fake_data': os.path.join(PROJECT_ROOT, 'orignaldata_fake_data'),
+}
+
+
+def register_source(value: str) -> str:
+    """Name of a data source given by name or directory (relative to the project root), added if new"""
+    value = value.strip()
+    if value in DATA_SOURCES:
+        return value
+    path = os.path.abspath(os.path.join(PROJECT_ROOT, value))
+    for name, directory in DATA_SOURCES.items():
+        if os.path.abspath(directory) == path:
+            return name
+    name = os.path.basename(path.rstrip(os.sep)) or path
+    if name in DATA_SOURCES:
+        name = f"{name}-{data_cache.digest(path)[:6]}"
+    DATA_SOURCES[name] = path
+    return name
+
+
+DEFAULT_SOURCE = register_source(os.environ.get('YEAP_DATA_SOURCE', 'orignaldata'))
+SELECTABLE_SOURCES = list(dict.fromkeys(
+    [DEFAULT_SOURCE] + [register_source(s) for s in os.environ.get('YEAP_DATA_SOURCES', '').split(',') if s.strip()]))
+
+# Directory of the default source (benchmarks point it elsewhere)
+DATA_DIR = DATA_SOURCES[DEFAULT_SOURCE]
+
+# Survey data files by dataset key
+DATA_FILES = {
+    'PART1': 'PART1_base_dataQ2-5.csv',
+    'Q3': 'PART2_base_dataQ3.csv',
+    'Q4': 'PART2_base_dataQ4.csv',
+    'Q5': 'PART2_base_dataQ5.csv',
+    'Q6': 'PART3_base_dataQ6.csv',
+    'Q7': 'PART3_base_dataQ7.csv',
+    'Q10': 'PART3_base_dataQ10.csv',
+    'Q11': 'PART3_base_dataQ11.csv',
+}
+PART2_KEYS = ['Q3', 'Q4', 'Q5']
+PART3_KEYS = ['Q6', 'Q7', 'Q10', 'Q11']
+
+ENCODINGS = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
+# Year-partitioned layout: <data dir>/partitions/manifest.json and <file name>/year=<year>.csv
+PARTITION_DIR = 'partitions'
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_FORMAT = 1
+
+# Streaming mode: files of at least this size are aggregated in chunks of STREAM_CHUNK_ROWS rows (0 disables)
+STREAM_MIN_BYTES = float(os.environ.get('YEAP_STREAM_MB', '0')) * 1024 * 1024
+STREAM_CHUNK_ROWS = int(os.environ.get('YEAP_STREAM_CHUNK_ROWS', '50000'))
+
+# Files parsed at the same time by load_concurrently (1 parses them one after the other)
+LOAD_WORKERS = max(1, int(os.environ.get('YEAP_LOAD_WORKERS', str(min(4, os.cpu_count() or 1)))))
+# CSV parser: 'c' (pandas default) or 'pyarrow' (used only where pyarrow is installed)
+CSV_ENGINE = os.environ.get('YEAP_CSV_ENGINE', 'c')
+if CSV_ENGINE == 'pyarrow' and not PYARROW_AVAILABLE:
+    CSV_ENGINE = 'c'
+
+# Last parsed version of each file (hash, size, rows, signature of its cached frame), for append detection
+_parsed_files = {}
+# Files whose current version was parsed incrementally (hash, previous hash, years of the new rows)
+_appended_files = {}
+# Latest year partitions of each file (hash, partitions)
+_file_partitions = {}
+# Last read manifest of each data directory (hash, manifest)
+_manifests = {}
+_parsed_lock = threading.Lock()
+# Data source of the current context (a session's script run); None is the default source
+_source = contextvars.ContextVar('data_source', default=None)
+
+
+def use_source(name: str) -> str:
+    """
+    Read the given data source in the current context (a session's script run), returns its name
+    - Its artefacts are kept in a data_cache namespace of the same name
+    - Contexts that never call it read DATA_DIR, in the default namespace
+    """
+    name = register_source(name)
+    _source.set(name)
+    data_cache.set_namespace(name)
+    return name
+
+
+def current_source() -> str:
+    """Name of the data source of the current context"""
+    return _source.get() or DEFAULT_SOURCE
+
+
+def get_data_dir() -> str:
+    """Directory holding the survey CSV files (of the current data source)"""
+    source = _source.get()
+    if source is None or source == DEFAULT_SOURCE:
+        return DATA_DIR
+    return DATA_SOURCES[source]
+
+
+def data_file_path(key: str) -> str:
+    """Absolute path of a survey data file by dataset key (e.g. 'Q6')"""
+    return os.path.join(get_data_dir(), DATA_FILES[key])
+
+
+def _read_csv(data, encoding: Optional[str], **kwargs) -> pd.DataFrame:
+    """pd.read_csv with CSV_ENGINE, falling back to the C parser for input the pyarrow reader rejects"""
+    if CSV_ENGINE == 'pyarrow':
+        try:
+            return pd.read_csv(data, encoding=encoding, engine='pyarrow', **kwargs)
+        except (UnicodeDecodeError, ValueError, pyarrow.ArrowException):
+            if hasattr(data, 'seek'):
+                data.seek(0)
+    return pd.read_csv(data, encoding=encoding, **kwargs)
+
+
+def _parse_with_fallback(source, **kwargs) -> Tuple[pd.DataFrame, Optional[str], int]:
+    """Parse a CSV path or bytes with multiple encoding attempts, returns (frame, encoding, attempts)"""
+    attempts = 0
+    for encoding in ENCODINGS:
+        attempts += 1
+        try:
+            data = io.BytesIO(source) if isinstance(source, bytes) else source
+            return _read_csv(data, encoding, **kwargs), encoding, attempts
+        except UnicodeDecodeError:
+            continue
+
+    # If all encodings fail, try without specifying encoding
+    data = io.BytesIO(source) if isinstance(source, bytes) else source
+    return pd.read_csv(data, **kwargs), None, attempts + 1
+
+
+def read_csv_with_fallback(file_path: str, **kwargs) -> pd.DataFrame:
+    """Read CSV file with multiple encoding attempts (every parse is accounted in perf_monitor)"""
+    start = time.perf_counter()
+    df, encoding, attempts = _parse_with_fallback(file_path, **kwargs)
+    if isinstance(file_path, (str, os.PathLike)):
+        record_read(os.fspath(file_path), READ_PARSE, (time.perf_counter() - start) * 1000, encoding=encoding,
+                    signature=data_cache.file_hash(file_path), attempts=attempts)
+    return df
+
+
+def _read_appended_rows(file_path: str, previous: Dict) -> Optional[pd.DataFrame]:
+    """
+    Parse only the rows appended to a file since its previous version
+    - Returns the previous frame (read back from data_cache) plus the new rows, or None when the
+      file changed otherwise or the previous frame is no longer cached (the caller then parses it in full)
+    - New rows are parsed with the previous column names and dtypes; rows that do not fit
+      them (e.g. text in a numeric column) also fall back to a full parse
+    """
+    size = os.path.getsize(file_path)
+    if size <= previous['size'] or data_cache.prefix_hash(file_path, previous['size']) != previous['hash']:
+        return None
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        f.seek(previous['size'] - 1)
+        tail = f.read()
+    # The previous version must end on a complete line
+    if not tail.startswith(b'\n'):
+        return None
+    old = data_cache.find_frame('frames', None, previous['signature'])
+    if old is None or len(old) != previous['rows']:
+        return None
+    # Categoricals take the new rows' values as new categories (a fixed CategoricalDtype would drop them)
+    categorical = [column for column, dtype in old.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    dtypes = {column: 'category' if column in categorical else dtype for column, dtype in old.dtypes.items()}
+    try:
+        new_rows, encoding, attempts = _parse_with_fallback(tail[1:], header=None, names=list(old.columns),
+                                                            dtype=dtypes)
+    except (ValueError, TypeError, pd.errors.ParserError):
+        return None
+    if not isinstance(new_rows.index, pd.RangeIndex):
+        # More fields than columns: pandas moved the extra ones to the index
+        return None
+    df = pd.concat([old, data_cleaning.clean(new_rows)[0]], ignore_index=True)
+    if categorical:
+        df = df.astype(dict.fromkeys(categorical, 'category'))
+    if [str(dtype) for dtype in df.dtypes] != [str(dtype) for dtype in old.dtypes]:
+        return None
+    record_read(file_path, READ_PARSE, (time.perf_counter() - start) * 1000, nbytes=len(tail) - 1,
+                encoding=encoding, signature=data_cache.file_hash(file_path), attempts=attempts)
+    return df
+
+
+def _parse_file(file_path: str) -> pd.DataFrame:
+    """Parse a file, incrementally when it only had rows appended since this process last parsed it"""
+    previous = _parsed_files.get(file_path)
+    if previous is not None:
+        df = _read_appended_rows(file_path, previous)
+        if df is not None:
+            year_col = get_year_column(df)
+            new_years = df[year_col].iloc[previous['rows']:] if year_col else pd.Series(dtype=object)
+            with _parsed_lock:
+                _appended_files[file_path] = {'hash': data_cache.file_hash(file_path), 'from': previous['hash'],
+                                              'years': set(new_years.dropna().astype(str).str.strip())}
+            return df
+    return _read_clean(file_path)
+
+
+def _dataset_key(file_path: str) -> Optional[str]:
+    """Dataset key of a survey data file (in any data source), or None"""
+    name = os.path.basename(file_path)
+    return next((key for key, file_name in DATA_FILES.items() if file_name == name), None)
+
+
+def _schema_dtypes(file_path: str, numeric: bool = True) -> Dict:
+    """Parse dtypes data_schema gives the columns of a data file ({} for other files)"""
+    key = _dataset_key(file_path)
+    if key is None:
+        return {}
+    header = _parse_with_fallback(file_path, nrows=0)[0].columns
+    return data_schema.column_dtypes(key, list(header), numeric)
+
+
+def _parse_with_schema(file_path: str) -> pd.DataFrame:
+    """
+    Parse a whole file with the column types of its schema
+    - Values that do not fit a numeric column (e.g. a blank year) leave the numeric columns
+      type-inferred; schema_drift reports them
+    """
+    try:
+        with warnings.catch_warnings():
+            # A blank in an integer column warns before it raises
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return read_csv_with_fallback(file_path, dtype=_schema_dtypes(file_path))
+    except (ValueError, TypeError):
+        return read_csv_with_fallback(file_path, dtype=_schema_dtypes(file_path, numeric=False))
+
+
+def _read_clean(file_path: str) -> pd.DataFrame:
+    """Parse a whole file and clean it (data_cleaning); its data-quality report is cached alongside"""
+    df, report = data_cleaning.clean(_parse_with_schema(file_path))
+    data_cache.get_artifact('quality_report', None, [file_path], lambda: report,
+                            signature=partition_signature([file_path], 'All'))
+    return df
+
+
+@timed(STAGE_DATA)
+def load_csv(file_path: str) -> pd.DataFrame:
+    """
+    Load a CSV file, parsing it at most once while its content is unchanged (the parsed frame is
+    persisted by data_cache and memory-mapped on restart); appended rows are parsed on their own.
+    Returns a shallow copy: adding columns or filtering is safe, editing values in place is not.
+    """
+    signature = data_cache.file_hash(file_path)
+    df = data_cache.get_frame('frames', None, [file_path], lambda: _parse_file(file_path))
+    previous = _parsed_files.get(file_path)
+    if signature is not None and (previous is None or previous['hash'] != signature):
+        with _parsed_lock:
+            _parsed_files[file_path] = {'hash': signature, 'size': os.path.getsize(file_path), 'rows': len(df),
+                                        'signature': data_cache.source_signature([file_path])}
+        if previous is not None:
+            # The frame of the previous version is superseded: do not keep both in memory
+            data_cache.invalidate(file_path, lambda cached: cached == previous['signature'])
+    return df.copy(deep=False)
+
+
+def partition_dir() -> str:
+    """Directory of the year partitions and their manifest"""
+    return os.path.join(get_data_dir(), PARTITION_DIR)
+
+
+def read_manifest() -> Dict:
+    """Partition manifest of the data directory ({} without one), re-read only when it changes"""
+    path = os.path.join(partition_dir(), MANIFEST_FILE)
+    signature = data_cache.file_hash(path)
+    if signature is None:
+        return {}
+    cached = _manifests.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        # An unreadable manifest leaves the original files in use
+        manifest = {}
+    with _parsed_lock:
+        _manifests[path] = (signature, manifest)
+    return manifest
+
+
+def _partition_entry(file_path: str) -> Optional[Dict]:
+    """Manifest entry serving a data file, or None when the file itself is read"""
+    if os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(get_data_dir()):
+        return None
+    entry = read_manifest().get('datasets', {}).get(os.path.basename(file_path))
+    if entry is None:
+        return None
+    # A file edited after the split is newer than its partitions
+    signature = data_cache.file_hash(file_path)
+    if signature is not None and signature != entry.get('source_hash'):
+        return None
+    return entry
+
+
+def _partition_paths(entry: Dict, selected_year) -> List[str]:
+    """Partition files holding the rows filter_by_year keeps for selected_year ('All': every partition)"""
+    if selected_year is None or selected_year == 'All':
+        parts = list(entry['partitions'].values()) + ([entry['unassigned']] if entry.get('unassigned') else [])
+    else:
+        parts = [entry['partitions'][str(selected_year)]] if str(selected_year) in entry['partitions'] else []
+    return [os.path.join(partition_dir(), part['file']) for part in parts]
+
+
+def _read_partition(path: str, entry: Dict) -> pd.DataFrame:
+    """Parse and clean one partition with the column dtypes of the original file (cached like load_csv)"""
+    return data_cache.get_frame('partition_frames', None, [path],
+                                lambda: data_cleaning.clean(read_csv_with_fallback(path, dtype=entry['dtypes']))[0])
+
+
+def data_file_exists(file_path: str) -> bool:
+    """Whether a data file can be loaded, as a file or as year partitions"""
+    return os.path.exists(file_path) or _partition_entry(file_path) is not None
+
+
+@timed(STAGE_DATA)
+def load_year_rows(file_path: str, selected_year) -> pd.DataFrame:
+    """
+    Rows of a data file for the selected year, i.e. filter_by_year(load_csv(file_path), selected_year)
+    - A partitioned file only parses the selected year's partition; 'All' concatenates the
+      partitions in manifest order (the order of the years in the original file)
+    - Returns a shallow copy, as load_csv
+    """
+    entry = _partition_entry(file_path)
+    if entry is None:
+        return filter_by_year(load_csv(file_path), selected_year)
+    paths = _partition_paths(entry, selected_year)
+    if not paths:
+        df = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in entry['dtypes'].items()})
+    elif len(paths) == 1:
+        df = _read_partition(paths[0], entry)
+    else:
+        df = data_cache.get_frame('partitioned_frames', None, [file_path],
+                                  lambda: _concat_partitions(paths, entry),
+                                  signature=partition_signature([file_path], 'All'))
+    return df.copy(deep=False)
+
+
+def _concat_partitions(paths: List[str], entry: Dict) -> pd.DataFrame:
+    """Partitions of a file in one frame, categoricals over the categories of every partition"""
+    df = pd.concat([_read_partition(path, entry) for path in paths], ignore_index=True)
+    categorical = [column for column, dtype in entry['dtypes'].items() if dtype == 'category']
+    return df.astype(dict.fromkeys(categorical, 'category')) if categorical else df
+
+
+def load_concurrently(func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    """
+    [func(item) for item in items], run by up to LOAD_WORKERS threads (for independent files)
+    - Each call sees the caller's data source and cache namespace; its reads are accounted
+      to the caller's run and session
+    - The first exception raised by a call is re-raised once all calls are done
+    """
+    if LOAD_WORKERS <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    context = worker_context()
+
+    def _call(item):
+        attach_worker(context)
+        return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(items))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _call, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def load_dataset(key: str) -> pd.DataFrame:
+    """Load a survey data file by dataset key (empty DataFrame if the file is missing)"""
+    file_path = data_file_path(key)
+    if not data_file_exists(file_path):
+        return pd.DataFrame()
+    return load_year_rows(file_path, 'All')
+
+
+def _file_dtypes(file_path: str) -> Dict:
+    """Column dtypes a data file is loaded with (partition manifest, streaming schema or parsed frame)"""
+    entry = _partition_entry(file_path)
+    if entry is not None:
+        return {column: pd.api.types.pandas_dtype(dtype) for column, dtype in entry['dtypes'].items()}
+    if streams(file_path):
+        return _stream_sources(file_path, 'All')[0][1]
+    return load_csv(file_path).dtypes.to_dict()
+
+
+def schema_drift() -> Dict[str, List[str]]:
+    """
+    Differences between each data file of the current source and its data_schema, by file name
+    (an empty list when the file fits its schema; files that do not exist are left out)
+    """
+    report = {}
+    for key, file_name in DATA_FILES.items():
+        path = data_file_path(key)
+        if data_file_exists(path):
+            report[file_name] = data_cache.get_artifact(
+                'schema_drift', key, [path], lambda: data_schema.drift(key, _file_dtypes(path)),
+                signature=partition_signature([path], 'All'))
+    return report
+
+
+def _build_quality_report(file_path: str) -> Dict:
+    """Data-quality report of a file whose report is not cached with its frame"""
+    entry = _partition_entry(file_path)
+    if entry is not None:
+        return data_cleaning.merge_reports([
+            data_cleaning.clean(read_csv_with_fallback(path, dtype=entry['dtypes']))[1]
+            for path in _partition_paths(entry, 'All')])
+    if streams(file_path):
+        return data_cache.get_artifact('stream_schema', None, [file_path],
+                                       lambda: _build_stream_schema(file_path))['quality']
+    return data_cleaning.clean(_parse_with_schema(file_path))[1]
+
+
+def quality_report() -> Dict[str, Dict]:
+    """
+    Data-quality report of each data file of the current source, by file name: what cleaning
+    changed (data_cleaning.clean) and the rows it left without a UserId or year
+    """
+    report = {}
+    for key, file_name in DATA_FILES.items():
+        path = data_file_path(key)
+        if data_file_exists(path):
+            report[file_name] = data_cache.get_artifact('quality_report', None, [path],
+                                                        lambda: _build_quality_report(path),
+                                                        signature=partition_signature([path], 'All'))
+    return report
+
+
+def streams(file_path: str) -> bool:
+    """Whether a data file is large enough to be read in chunks (streaming mode)"""
+    if STREAM_MIN_BYTES <= 0:
+        return False
+    entry = _partition_entry(file_path)
+    paths = [file_path] if entry is None else _partition_paths(entry, 'All')
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path)) >= STREAM_MIN_BYTES
+
+
+def _merged_dtype(dtypes: List):
+    """dtype a whole-file parse gives a column whose chunks were parsed with the given dtypes"""
+    dtypes = list(dict.fromkeys(dtypes))
+    if len(dtypes) == 1:
+        return dtypes[0]
+    if all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+        # Categories of the whole file
+        return 'category'
+    if all(pd.api.types.is_integer_dtype(d) or pd.api.types.is_float_dtype(d) for d in dtypes):
+        # Integers with missing values in other chunks
+        return 'float64'
+    for dtype in dtypes:
+        if pd.api.types.is_string_dtype(dtype) and dtype != object:
+            return dtype
+    return object
+
+
+def _build_stream_schema(file_path: str, numeric: bool = True) -> Dict:
+    """Encoding, whole-file column dtypes and data-quality report of a data file, from one pass over its chunks"""
+    start = time.perf_counter()
+    schema_dtypes = _schema_dtypes(file_path, numeric)
+    for attempts, encoding in enumerate(ENCODINGS + [None], 1):
+        dtypes, reports = {}, []
+        try:
+            with pd.read_csv(file_path, encoding=encoding, dtype=schema_dtypes,
+                             chunksize=STREAM_CHUNK_ROWS) as reader:
+                for chunk in reader:
+                    chunk, report = data_cleaning.clean(chunk)
+                    reports.append(report)
+                    for column, dtype in chunk.dtypes.items():
+                        dtypes.setdefault(column, []).append(dtype)
+        except UnicodeDecodeError:
+            if encoding is None:
+                raise
+            continue
+        except (ValueError, TypeError):
+            if not numeric:
+                raise
+            # Values that do not fit a numeric column: numeric columns inferred, as _parse_with_schema
+            return _build_stream_schema(file_path, numeric=False)
+        record_read(file_path, READ_PARSE, (time.perf_counter() - start) * 1000, encoding=encoding,
+                    signature=data_cache.file_hash(file_path), attempts=attempts)
+        return {'encoding': encoding, 'dtypes': {column: _merged_dtype(d) for column, d in dtypes.items()},
+                'quality': data_cleaning.merge_reports(reports)}
+
+
+def _stream_sources(file_path: str, selected_year) -> List[Tuple[str, Dict, Optional[str]]]:
+    """(path, column dtypes, encoding) of the files holding a data file's rows of the selected year"""
+    entry = _partition_entry(file_path)
+    if entry is not None:
+        return [(path, entry['dtypes'], 'utf-8-sig') for path in _partition_paths(entry, selected_year)]
+    schema = data_cache.get_artifact('stream_schema', None, [file_path], lambda: _build_stream_schema(file_path))
+    return [(file_path, schema['dtypes'], schema['encoding'])]
+
+
+def stream_columns(file_path: str) -> List[str]:
+    """Column names of a data file in streaming mode (without holding it in memory)"""
+    entry = _partition_entry(file_path)
+    if entry is not None:
+        return list(entry['dtypes'])
+    return list(_stream_sources(file_path, 'All')[0][1])
+
+
+def iter_year_chunks(file_path: str, selected_year, columns: Optional[List[str]] = None):
+    """
+    Rows of a data file for the selected year, in chunks of STREAM_CHUNK_ROWS rows (streaming mode)
+    - Together the chunks are filter_by_year(load_csv(file_path), selected_year), with the same dtypes
+    - columns restricts the parsed columns (the year column is always read)
+    """
+    for path, dtypes, encoding in _stream_sources(file_path, selected_year):
+        usecols = None
+        if columns is not None:
+            year_col = get_year_column(list(dtypes))
+            usecols = [column for column in dtypes if column in columns or column == year_col]
+            dtypes = {column: dtypes[column] for column in usecols}
+        parse_ms = 0.0
+        try:
+            with pd.read_csv(path, encoding=encoding, dtype=dtypes, usecols=usecols,
+                             chunksize=STREAM_CHUNK_ROWS) as reader:
+                while True:
+                    start = time.perf_counter()
+                    start_stage(STAGE_DATA)
+                    try:
+                        chunk = next(reader, None)
+                    finally:
+                        end_stage(STAGE_DATA)
+                        parse_ms += (time.perf_counter() - start) * 1000
+                    if chunk is None:
+                        break
+                    yield filter_by_year(data_cleaning.clean(chunk)[0], selected_year)
+        finally:
+            record_read(path, READ_PARSE, parse_ms, encoding=encoding, signature=data_cache.file_hash(path))
+
+
+def normalize_year(value) -> str:
+    """Normalize a year cell to a plain string (e.g. 2026.0 -> '2026')"""
+    year = str(value).strip()
+    if '.' in year and year.replace('.', '').isdigit():
+        return str(int(float(year)))
+    return year
+
+
+def get_year_column(df):
+    """Name of the year column ('YEAR' or 'year') of a DataFrame or a list of column names, or None"""
+    columns = df.columns if isinstance(df, pd.DataFrame) else df
+    if 'YEAR' in columns:
+        return 'YEAR'
+    if 'year' in columns:
+        return 'year'
+    return None
+
+
+def _csv_files_in_data_dir() -> List[str]:
+    """Data files of the data directory, including files only present as year partitions"""
+    data_dir = get_data_dir()
+    if not os.path.isdir(data_dir):
+        return []
+    names = {f for f in os.listdir(data_dir) if f.lower().endswith('.csv')}
+    names.update(read_manifest().get('datasets', {}))
+    return sorted(os.path.join(data_dir, f) for f in names)
+
+
+def _build_year_partitions(file_path: str) -> Optional[Dict[str, str]]:
+    """
+    Version token of each year's rows, by year value as filter_by_year matches it
+    - A year's token is the hash of the file version in which its rows last changed: when rows were
+      appended, the years without new rows keep their token from the previous version
+    """
+    signature = data_cache.file_hash(file_path)
+    if streams(file_path):
+        year_col = get_year_column(stream_columns(file_path))
+        if year_col is None:
+            return None
+        partitions = {}
+        for chunk in iter_year_chunks(file_path, 'All', [year_col]):
+            partitions.update(dict.fromkeys((str(year).strip() for year in chunk[year_col].dropna().unique()), signature))
+        return partitions
+    df = load_csv(file_path)
+    year_col = get_year_column(df)
+    if year_col is None:
+        return None
+    # Distinct values first: stringifying the whole column costs more than the rest of the build
+    partitions = dict.fromkeys((str(year).strip() for year in df[year_col].dropna().unique()), signature)
+    appended = _appended_files.get(file_path)
+    previous = _file_partitions.get(file_path)
+    if appended is not None and appended['hash'] == signature and previous is not None \
+            and previous[0] == appended['from']:
+        partitions.update({year: token for year, token in previous[1].items() if year not in appended['years']})
+    return partitions
+
+
+def year_partitions(file_path: str) -> Optional[Dict[str, str]]:
+    """
+    Year partitions of a data file: year -> version token of that year's rows (None without a year column)
+    Any edit of the file gives every year a new token, except rows appended by an incremental parse,
+    which only renew the tokens of the years they belong to. A partitioned file uses the hash of
+    each year's partition.
+    """
+    entry = _partition_entry(file_path)
+    if entry is not None:
+        return {year: data_cache.file_hash(os.path.join(partition_dir(), part['file']))
+                for year, part in entry['partitions'].items()}
+    partitions = data_cache.get_artifact('year_partitions', None, [file_path],
+                                         lambda: _build_year_partitions(file_path))
+    with _parsed_lock:
+        _file_partitions[file_path] = (data_cache.file_hash(file_path), partitions)
+    return partitions
+
+
+def partition_signature(paths: List[str], selected_year) -> Tuple:
+    """
+    Source signature of the rows filter_by_year keeps for selected_year, for data_cache keys
+    - 'All' (or None) is the whole-file signature (every partition of a partitioned file);
+      files without a year column use their file hash
+    """
+    if selected_year is None or selected_year == 'All':
+        signature = []
+        for path in paths:
+            entry = _partition_entry(path)
+            if entry is None:
+                signature.append((os.path.basename(path), data_cache.file_hash(path)))
+            else:
+                signature.append((os.path.basename(path), tuple(data_cache.file_hash(part) for part in
+                                                                _partition_paths(entry, 'All'))))
+        return tuple(signature)
+    signature = []
+    for path in paths:
+        partitions = year_partitions(path) if data_file_exists(path) else None
+        if partitions is None:
+            signature.append((os.path.basename(path), data_cache.file_hash(path)))
+        else:
+            signature.append((os.path.basename(path), str(selected_year), partitions.get(str(selected_year))))
+    return tuple(signature)
+
+
+def superseded(signature: Tuple, file_path: str) -> bool:
+    """
+    Whether a data_cache signature no longer matches the current rows of a data file
+    - Compares the file's entries of the signature with partition_signature for the same year, so
+      an artefact of a year the change did not touch is still current
+    """
+    name = os.path.basename(file_path)
+    for element in signature or ():
+        if not isinstance(element, tuple) or not element or element[0] != name:
+            continue
+        year = element[1] if len(element) == 3 else 'All'
+        if element != partition_signature([file_path], year)[0]:
+            return True
+    return False
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def data_file_stamps() -> Dict[str, Tuple]:
+    """
+    Change stamp of every data file and year partition, polled by data_watcher
+    - (mtime, size) per file; a data file also carries its manifest entry, so adding or removing a
+      partition changes the file it belongs to
+    """
+    datasets = read_manifest().get('datasets', {})
+    stamps = {}
+    for path in _csv_files_in_data_dir():
+        entry = datasets.get(os.path.basename(path))
+        stamps[path] = (_file_stamp(path), json.dumps(entry, sort_keys=True) if entry else None)
+        for part in _partition_paths(entry, 'All') if entry else []:
+            stamps[part] = (_file_stamp(part), None)
+    return stamps
+
+
+def _build_year_options() -> List[str]:
+    year_values = set()
+    for fpath in _csv_files_in_data_dir():
+        try:
+            # Partition keys are the stripped non-empty year values of the file
+            partitions = year_partitions(fpath)
+            if partitions:
+                year_values.update(normalize_year(y) for y in partitions if y != '')
+        except Exception:
+            # Skip files that cannot be read
+            pass
+
+    # Build options: All + sorted years desc (as strings)
+    year_options = ['All'] + sorted(year_values, reverse=True)
+    if len(year_options) == 1:  # Only 'All'
+        year_options = ['All', '2025']  # Fallback default to 2025
+    return year_options
+
+
+def get_year_options() -> List[str]:
+    """Period filter options: 'All' followed by every year found in the data files (descending)"""
+    files = _csv_files_in_data_dir()
+    return data_cache.get_artifact('year_options', None, files, _build_year_options,
+                                   signature=partition_signature(files, 'All'))
+
+
+def get_default_year(year_options: List[str]) -> str:
+    """Default period selection: 2025, else 2024, else the most recent year"""
+    if '2025' in year_options:
+        return '2025'
+    if '2024' in year_options:
+        return '2024'
+    if len(year_options) > 1:
+        return year_options[1]
+    return 'All'
+
+
+def _regions_of(df: pd.DataFrame) -> List[str]:
+    if 'Department/Region' not in df.columns:
+        return []
+    return df['Department/Region'].dropna().unique().tolist()
+
+
+def _file_regions(key: str) -> List[str]:
+    """
+    Organizational units of one data file (cached per file, so a changed file only rescans itself;
+    per partition for a partitioned file, so a new year only scans its own rows)
+    """
+    path = data_file_path(key)
+    entry = _partition_entry(path)
+    if entry is not None:
+        regions = []
+        for part in _partition_paths(entry, 'All'):
+            regions.extend(data_cache.get_artifact('partition_regions', None, [part],
+                                                   lambda: _regions_of(_read_partition(part, entry))))
+        return list(dict.fromkeys(regions))
+
+    def _build():
+        if streams(path):
+            regions = []
+            for chunk in iter_year_chunks(path, 'All', ['Department/Region']):
+                regions.extend(_regions_of(chunk))
+            return list(dict.fromkeys(regions))
+        return _regions_of(load_dataset(key))
+
+    return data_cache.get_artifact('file_regions', key, [path], _build, signature=partition_signature([path], 'All'))
+
+
+def _build_region_options() -> List[str]:
+    regions_set = set()
+    for key in PART2_KEYS + PART3_KEYS:
+        try:
+            regions_set.update(_file_regions(key))
+        except Exception:
+            pass
+    if not regions_set:
+        return []
+    return ['All'] + sorted(list(regions_set))
+
+
+def get_region_options() -> List[str]:
+    """Organizational unit filter options from PART2 and PART3 files ([] if none found)"""
+    files = [data_file_path(key) for key in PART2_KEYS + PART3_KEYS]
+    return data_cache.get_artifact('region_options', None, files, _build_region_options,
+                                   signature=partition_signature(files, 'All'))
+
+
+def filter_by_year(df: pd.DataFrame, selected_year) -> pd.DataFrame:
+    """Apply the global YEAR filter ('All' keeps every row)"""
+    if selected_year is None or selected_year == 'All':
+        return df
+    year_col = get_year_column(df)
+    if year_col is None:
+        return df
+    return df[df[year_col].astype(str).str.strip() == str(selected_year)]
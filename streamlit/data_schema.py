@@ -0,0 +1,213 @@
+"""
+Data schema - the columns and column types of every survey file, applied when it is parsed
+
+Each data file (by dataset key, see data_loader.DATA_FILES) lists its columns with a kind:
+- 'text': answers and descriptions, parsed as strings (no numeric inference over every cell)
+- 'category': a handful of values repeated on every row, stored as a categorical
+- 'int': counts
+- 'year': the reporting year ('year' or 'YEAR')
+
+Column names are matched with their whitespace collapsed: the data sources differ in the
+line endings inside some headers. A file that does not fit its schema is still loaded:
+columns the schema does not know are type-inferred as before, and values that do not fit
+a numeric kind leave that column inferred. Such drift is reported (data_loader.schema_drift,
+the sidebar, and `python streamlit/data_schema.py`) instead of being absorbed silently.
+
+Usage (from the project root):
+    python streamlit/data_schema.py [SOURCE]   # report schema drift of every data file
+"""
+import argparse
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+TEXT = 'text'
+CATEGORY = 'category'
+INT = 'int'
+YEAR = 'year'
+
+# Parse dtype of each kind
+KIND_DTYPES = {
+    TEXT: str,
+    CATEGORY: 'category',
+    INT: 'int64',
+    YEAR: 'int64',
+}
+NUMERIC_KINDS = {INT, YEAR}
+
+# Columns shared by the files answered per staff member
+_RESPONDENT = {'UserId': TEXT, 'Department/Region': TEXT}
+_OUTPUT = {
+    'Related CPO or GLO under P&B 2024-2025': TEXT,
+    'Web link??': TEXT,
+    'Short description?': TEXT,
+}
+_FUNDING = 'Funding source (Options: regular budget or extrabudgetary)'
+_FOCUS = 'Focus (Options: Youth only or Youth is one of the target groups)'
+
+# Dataset key -> column -> kind, in file order
+SCHEMAS = {
+    'PART1': {'question': CATEGORY, 'option': CATEGORY, 'count': INT, 'year': YEAR},
+    'Q3': {
+        **_RESPONDENT,
+        'Knowledge development and dissemination': TEXT,
+        'Technical assistance and capacity-building': TEXT,
+        'Advocacy and partnerships': TEXT,
+        'year': YEAR,
+    },
+    'Q4': {
+        **_RESPONDENT,
+        'Emplovment and economic policies for youth Skills and Employability': TEXT,
+        'Education, training and skills, and the school-to-work transition': TEXT,
+        'Labour market policies': TEXT,
+        'Youth entrepreneurship and self-employment': TEXT,
+        'Rights for young people': TEXT,
+        'Other': TEXT,
+        'Other (elaborated answ)': TEXT,
+        'year': YEAR,
+    },
+    'Q5': {
+        **_RESPONDENT,
+        'Young women': TEXT,
+        'Young people not in employment, education or training (NEET)': TEXT,
+        'Young migrant workers': TEXT,
+        'Young refugees': TEXT,
+        'Young people - sexual orientation and gender identity': TEXT,
+        'Young people with disabilities': TEXT,
+        'Young rural workers': TEXT,
+        'Young indigenous people': TEXT,
+        'Other': TEXT,
+        'Other (elaborated answ)': TEXT,
+        'year': YEAR,
+    },
+    'Q6': {
+        **_RESPONDENT,
+        "Initiative/output's name??": TEXT,
+        **_OUTPUT,
+        'Flagship or periodic (Y/N)?': TEXT,
+        'Type of publication (Options: Evaluation, or Guidance/tools, or Technical Report, or Working paper, '
+        'or Data/Database)': TEXT,
+        'New or Produced regularly': TEXT,
+        _FUNDING: TEXT,
+        _FOCUS: TEXT,
+        'year': YEAR,
+    },
+    'Q7': {
+        **_RESPONDENT,
+        "Initiative/programme/project's name??": TEXT,
+        **_OUTPUT,
+        'Country or Region': TEXT,
+        'New or long-standing': TEXT,
+        _FUNDING: TEXT,
+        'DC code if applicable': TEXT,
+        _FOCUS: TEXT,
+        'Is it part of a UN Joint Programme (Yes or No)': TEXT,
+        'year': YEAR,
+    },
+    'Q10': {
+        **_RESPONDENT,
+        "Course/programme/project's name??": TEXT,
+        **_OUTPUT,
+        'In person or online or both': TEXT,
+        'With certification (Yes or No)': TEXT,
+        'New or long-standing': TEXT,
+        _FUNDING: TEXT,
+        _FOCUS: TEXT,
+        'For public use or ILO staff only': TEXT,
+        'year': YEAR,
+    },
+    'Q11': {
+        **_RESPONDENT,
+        "Output/initiative/programme/project's name??": TEXT,
+        **_OUTPUT,
+        'Geographical focus (Global, Regional or National/local)': TEXT,
+        'Specify name of the Region/country': TEXT,
+        'Type of partnership (Options: UN interagency initiative; or multistakeholder initiative; '
+        'or bilateral partnership; or event; or campaign; or challenge)': TEXT,
+        'New or long-standing': TEXT,
+        _FUNDING: TEXT,
+        _FOCUS: TEXT,
+        'year': YEAR,
+    },
+}
+
+
+def normalize_name(column: str) -> str:
+    """Column name with its whitespace collapsed (schema lookup key)"""
+    return ' '.join(str(column).split())
+
+
+def _kinds(key: str) -> Dict[str, str]:
+    """Normalized column name -> kind ('YEAR' is accepted for 'year')"""
+    kinds = {normalize_name(column): kind for column, kind in SCHEMAS[key].items()}
+    for column, kind in list(kinds.items()):
+        if kind == YEAR:
+            kinds[column.upper()] = kind
+    return kinds
+
+
+def column_dtypes(key: str, header: List[str], numeric: bool = True) -> Dict[str, object]:
+    """
+    Parse dtypes of a file's columns (by their name in the header) that the schema knows
+    - numeric=False leaves the numeric kinds to type inference (values that did not fit them)
+    """
+    if key not in SCHEMAS:
+        return {}
+    kinds = _kinds(key)
+    dtypes = {}
+    for column in header:
+        kind = kinds.get(normalize_name(column))
+        if kind is not None and (numeric or kind not in NUMERIC_KINDS):
+            dtypes[column] = KIND_DTYPES[kind]
+    return dtypes
+
+
+def drift(key: str, dtypes: Dict[str, object]) -> List[str]:
+    """
+    Differences between a parsed file (its column dtypes, in file order) and its schema
+    - Missing and unexpected columns, numeric columns whose values did not fit their type
+    """
+    if key not in SCHEMAS:
+        return []
+    kinds = _kinds(key)
+    names = {normalize_name(column) for column in dtypes}
+    issues = []
+    missing = [column for column, kind in SCHEMAS[key].items()
+               if normalize_name(column) not in names and not (kind == YEAR and column.upper() in names)]
+    if missing:
+        issues.append(f"missing columns: {', '.join(missing)}")
+    unexpected = [column for column in dtypes if normalize_name(column) not in kinds]
+    if unexpected:
+        issues.append(f"unexpected columns (types inferred): {', '.join(repr(column) for column in unexpected)}")
+    for column, dtype in dtypes.items():
+        kind = kinds.get(normalize_name(column))
+        if kind in NUMERIC_KINDS and not pd.api.types.is_integer_dtype(dtype):
+            issues.append(f"'{column}' should be {kind} but holds {dtype} values")
+    return issues
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('source', nargs='?', help="Data source (folder in the project root, default: YEAP_DATA_SOURCE)")
+    args = parser.parse_args(argv)
+
+    import data_loader
+
+    if args.source:
+        data_loader.use_source(args.source)
+    report = data_loader.schema_drift()
+    for file_name in data_loader.DATA_FILES.values():
+        issues = report.get(file_name)
+        if issues is None:
+            print(f"   {file_name}: not found")
+        elif issues:
+            print(f"⚠️ {file_name}:")
+            for issue in issues:
+                print(f"     - {issue}")
+        else:
+            print(f"✅ {file_name}")
+    return 1 if any(report.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""
+Data file watcher - notices updated CSVs in the data directory without a restart
+
+Artefact keys already include the content hash of their source files, so an updated file is
+never served stale; the watcher frees what it superseded and tells open sessions to refresh:
+- poll() compares the mtime and size of every data file and year partition with the previous
+  poll (data_loader.data_file_stamps), at most every WATCH_SECONDS
+- in-memory artefacts built from a changed file are dropped when their signature no longer
+  matches it (data_cache.invalidate + data_loader.superseded): a Q7 update keeps the Q3–Q5
+  overview tables, and rows added for 2026 keep the 2024 aggregates
+- each change bumps the data version; render_refresh() polls from every open session and
+  reruns the session when the version moved on
+Each data source (data_loader.use_source) is polled and versioned on its own.
+
+Polling runs inside the sessions (no thread, no external service); YEAP_WATCH_SECONDS=0 disables it.
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, List
+
+import data_cache
+import data_loader
+
+# Seconds between polls, and between the refresh checks of open sessions (0 disables the watcher).
+# Every check reruns a fragment in each open session, so keep it long on shared deployments
+WATCH_SECONDS = float(os.environ.get('YEAP_WATCH_SECONDS', '120'))
+# Session state key of the data source and version a session last rendered
+VERSION_STATE_KEY = '_data_version'
+
+_poll_lock = threading.Lock()
+# Poll state per data directory
+_states = {}
+
+
+def _state() -> Dict[str, Any]:
+    """Poll state of the current data directory"""
+    data_dir = data_loader.get_data_dir()
+    if data_dir not in _states:
+        _states[data_dir] = {'stamps': None, 'polled': 0.0, 'version': 0, 'changed': [], 'dropped': 0, 'time': None}
+    return _states[data_dir]
+
+
+def poll(force: bool = False) -> List[str]:
+    """
+    Look for changed files of the current data source (at most every WATCH_SECONDS unless force),
+    returns their paths
+    - The first poll only records the stamps
+    """
+    with _poll_lock:
+        state = _state()
+        if not force and time.time() - state['polled'] < WATCH_SECONDS:
+            return []
+        state['polled'] = time.time()
+        stamps = data_loader.data_file_stamps()
+        previous = state['stamps']
+        state['stamps'] = stamps
+        if previous is None:
+            return []
+        changed = sorted(path for path in set(stamps) | set(previous) if stamps.get(path) != previous.get(path))
+        if not changed:
+            return []
+
+        dropped = 0
+        for path in changed:
+            try:
+                dropped += data_cache.invalidate(path, lambda signature: data_loader.superseded(signature, path))
+            except Exception:
+                # The new version could not be read: drop everything built from the file
+                dropped += data_cache.invalidate(path)
+        state.update(version=state['version'] + 1, changed=changed, dropped=dropped,
+                     time=time.strftime('%Y-%m-%d %H:%M:%S'))
+        return changed
+
+
+def data_version() -> int:
+    """Number of data changes of the current data source seen by this process"""
+    return _state()['version']
+
+
+def last_change() -> Dict[str, Any]:
+    """Files of the latest change, when it was seen and how many artefacts it dropped"""
+    state = _state()
+    return {'files': list(state['changed']), 'time': state['time'], 'dropped': state['dropped']}
+
+
+def _changed_names(files: List[str]) -> str:
+    names = list(dict.fromkeys(os.path.relpath(path, data_loader.get_data_dir()) for path in files))
+    return ', '.join(names[:3]) + (f" (+{len(names) - 3})" if len(names) > 3 else '')
+
+
+def render_refresh() -> None:
+    """
+    Refresh hook of the main script (call before the pages load data):
+    - polls, and shows a toast naming the files when the data changed since the session's last run
+    - a fragment rerun every WATCH_SECONDS polls again and reruns the whole session on a change
+    """
+    if WATCH_SECONDS <= 0:
+        return
+    import streamlit as st
+
+    poll()
+    current = (data_loader.current_source(), data_version())
+    seen = st.session_state.get(VERSION_STATE_KEY)
+    if seen is not None and seen[0] == current[0] and seen[1] != current[1]:
+        st.toast(f"🔄 Data updated: {_changed_names(last_change()['files'])}")
+    st.session_state[VERSION_STATE_KEY] = current
+
+    @st.fragment(run_every=WATCH_SECONDS)
+    def _check_data_version():
+        # Fragment reruns do not run the main script: read the session's source again
+        source, version = st.session_state[VERSION_STATE_KEY]
+        data_loader.use_source(source)
+        poll()
+        if data_version() != version:
+            st.rerun(scope='app')
+
+    _check_data_version()
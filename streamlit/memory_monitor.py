@@ -0,0 +1,254 @@
+"""
+Memory profiling (opt-in with the performance panel: YEAP_PERF=1 or `python start_dashboard.py --perf`)
+
+Reports deep memory usage (DataFrame columns with deep=True, containers followed recursively):
+- the process-wide artefact cache (data_cache): parsed frames, aggregates and figure JSON, per artefact name
+- session state, per session (every session of the server when running under `streamlit run`)
+- the process resident set size
+
+Objects reachable from several places are counted once, where first seen (cache, then sessions):
+shallow frame copies share their column buffers, so a session only pays for what it owns.
+A snapshot is appended to MEMORY_LOG_PATH at most every MEMORY_SNAPSHOT_SECONDS (taken at the
+end of a script run); the sidebar panel shows the latest one.
+"""
+import os
+import sys
+import json
+import time
+import types
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from perf_monitor import PERF_ENABLED, PROJECT_ROOT
+
+# Optional: peak RSS where /proc is not available (not on Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Snapshot log location and interval (override with YEAP_MEMORY_LOG / YEAP_MEMORY_SNAPSHOT_SECONDS)
+MEMORY_LOG_PATH = os.environ.get('YEAP_MEMORY_LOG', os.path.join(PROJECT_ROOT, '.yeap_perf', 'memory.jsonl'))
+MEMORY_SNAPSHOT_SECONDS = float(os.environ.get('YEAP_MEMORY_SNAPSHOT_SECONDS', '60'))
+# Largest session state keys listed per session
+TOP_KEYS = 5
+
+# Objects sized by sys.getsizeof only (never followed)
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                 threading.Thread)
+
+_snapshot_lock = threading.Lock()
+_last_snapshot = {'time': 0.0, 'report': None}
+
+
+def _claim(values, seen: Dict[Any, Any]) -> bool:
+    """
+    Mark the memory behind an array as counted (shallow copies and views share it)
+    - Returns False if it was already counted
+    """
+    chunked = getattr(values, '_pa_array', None)
+    if chunked is not None:
+        # Arrow-backed column (pandas string dtype)
+        key, holder = ('arrow',) + tuple(buf.address for chunk in chunked.chunks
+                                         for buf in chunk.buffers() if buf is not None), chunked
+    else:
+        try:
+            holder = np.asarray(values)
+        except Exception:
+            return True
+        while isinstance(holder.base, np.ndarray):
+            holder = holder.base
+        key = ('numpy', id(holder))
+    if key in seen:
+        return False
+    # Keep the holder alive so its id is not reused during the walk
+    seen[key] = holder
+    return True
+
+
+def _frame_bytes(df: pd.DataFrame, seen: Dict[Any, Any]) -> int:
+    total = deep_sizeof(df.index, seen)
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if _claim(column.array, seen):
+            total += int(column.memory_usage(index=False, deep=True))
+    return total
+
+
+def deep_sizeof(obj: Any, seen: Optional[Dict[Any, Any]] = None) -> int:
+    """
+    Deep size of an object in bytes
+    - seen: objects (and column buffers) already counted; shared across calls to count each once
+    """
+    if seen is None:
+        seen = {}
+    if id(obj) in seen:
+        return 0
+    # Keep a reference so a temporary's id is not reused during the walk
+    seen[id(obj)] = obj
+
+    if isinstance(obj, pd.DataFrame):
+        return _frame_bytes(obj, seen)
+    if isinstance(obj, pd.RangeIndex):
+        return int(obj.memory_usage())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True)) if _claim(obj.array, seen) else 0
+    if isinstance(obj, np.ndarray):
+        if not _claim(obj, seen):
+            return 0
+        if obj.dtype == object:
+            return int(obj.nbytes) + sum(deep_sizeof(item, seen) for item in obj.ravel())
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))) or isinstance(obj, _OPAQUE_TYPES):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, 'to_plotly_json'):
+        # Plotly figures: size of their data and layout
+        return sys.getsizeof(obj) + deep_sizeof(obj.to_plotly_json(), seen)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + deep_sizeof(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def rss_kb() -> Optional[int]:
+    """Current resident set size of the process (KB; peak RSS where /proc is missing, None if unsupported)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if RESOURCE_AVAILABLE:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux kilobytes
+        return rss // 1024 if sys.platform == 'darwin' else rss
+    return None
+
+
+def cache_report(seen: Dict[Any, Any]) -> Dict[str, Dict[str, int]]:
+    """Artefact cache usage per artefact name: entries and deep bytes"""
+    with data_cache._lock:
+        items = list(data_cache._memory_cache.items())
+    report = {}
+    for (name, _), value in items:
+        entry = report.setdefault(name, {'entries': 0, 'bytes': 0})
+        entry['entries'] += 1
+        entry['bytes'] += deep_sizeof(value, seen)
+    return dict(sorted(report.items(), key=lambda item: item[1]['bytes'], reverse=True))
+
+
+def _session_states() -> Dict[str, Dict[str, Any]]:
+    """session id -> session state values, for every session of the server (current session only otherwise)"""
+    try:
+        from streamlit.runtime import Runtime
+        if Runtime.exists():
+            sessions = Runtime.instance()._session_mgr.list_sessions()
+            return {info.session.id: dict(info.session.session_state.filtered_state) for info in sessions}
+    except Exception:
+        pass
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return {ctx.session_id: {key: st.session_state[key] for key in st.session_state.keys()}}
+    except Exception:
+        pass
+    return {}
+
+
+def session_report(seen: Dict[Any, Any]) -> List[Dict[str, Any]]:
+    """Per session: keys, deep bytes not already counted in the cache, and the largest keys"""
+    sessions = []
+    for session, state in _session_states().items():
+        sizes = {str(key): deep_sizeof(value, seen) for key, value in state.items()}
+        top = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:TOP_KEYS]
+        sessions.append({'session': session, 'keys': len(sizes), 'bytes': sum(sizes.values()), 'top_keys': top})
+    return sorted(sessions, key=lambda s: s['bytes'], reverse=True)
+
+
+def memory_report() -> Dict[str, Any]:
+    """Process-wide memory report: RSS, artefact cache per name and session state per session"""
+    start = time.perf_counter()
+    seen = {}
+    cache = cache_report(seen)
+    sessions = session_report(seen)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rss_kb': rss_kb(),
+        'cache_bytes': sum(entry['bytes'] for entry in cache.values()),
+        'cache': cache,
+        'session_count': len(sessions),
+        'sessions_bytes': sum(s['bytes'] for s in sessions),
+        'sessions': sessions,
+        'report_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def snapshot(force: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Take a memory report and append it to MEMORY_LOG_PATH, at most every MEMORY_SNAPSHOT_SECONDS
+    - Returns the latest report (None before the first one)
+    """
+    with _snapshot_lock:
+        if not force and time.time() - _last_snapshot['time'] < MEMORY_SNAPSHOT_SECONDS:
+            return _last_snapshot['report']
+        report = memory_report()
+        _last_snapshot.update(time=time.time(), report=report)
+    try:
+        os.makedirs(os.path.dirname(MEMORY_LOG_PATH), exist_ok=True)
+        with open(MEMORY_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False, default=str) + '\n')
+    except OSError:
+        # Instrumentation must never break a page
+        pass
+    return report
+
+
+def _mb(nbytes: Optional[float]) -> str:
+    return 'n/a' if nbytes is None else f"{nbytes / (1024 * 1024):.1f}"
+
+
+def _render_panel(report: Dict[str, Any], current_session: Optional[str]) -> None:
+    import streamlit as st
+    with st.sidebar.expander(f"🧠 Memory ({_mb(report['rss_kb'] * 1024 if report['rss_kb'] else None)} MB RSS)",
+                             expanded=False):
+        st.caption(f"Snapshot of {report['timestamp']} · next after {MEMORY_SNAPSHOT_SECONDS:g}s · "
+                   f"logged to {MEMORY_LOG_PATH}")
+        if st.button("Refresh", key='_memory_refresh'):
+            report = snapshot(force=True)
+        table = ["| Cache artefact | Entries | MB |", "|---|---:|---:|"]
+        table += [f"| {name} | {entry['entries']} | {_mb(entry['bytes'])} |" for name, entry in report['cache'].items()]
+        table.append(f"| **Total** | | **{_mb(report['cache_bytes'])}** |")
+        st.markdown('\n'.join(table))
+
+        table = ["| Session | Keys | MB |", "|---|---:|---:|"]
+        table += [f"| {s['session'][:8]}{' (this)' if s['session'] == current_session else ''} | {s['keys']} "
+                  f"| {_mb(s['bytes'])} |" for s in report['sessions']]
+        st.markdown('\n'.join(table))
+        for s in report['sessions']:
+            if s['session'] == current_session and s['top_keys']:
+                st.caption("Largest keys: " + ' · '.join(f"{key} {nbytes / 1024:.0f} KB" for key, nbytes in s['top_keys']))
+
+
+def report_run() -> Optional[Dict[str, Any]]:
+    """End-of-run hook: periodic snapshot and the sidebar panel (no-op unless YEAP_PERF=1)"""
+    if not PERF_ENABLED:
+        return None
+    report = snapshot()
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        _render_panel(report, ctx.session_id if ctx else None)
+    except Exception:
+        pass
+    return report
@@ -0,0 +1,192 @@
+"""
+Partition data - splits the survey CSV files into one file per year, listed in a manifest
+
+Every data file with a year column is written to partitions/<file name>/year=<year>.csv in
+the data directory (rows without a year to _unassigned.csv), and partitions/manifest.json
+records the partitions, the year column and the column dtypes of the original file.
+The data loader then parses only the selected year's partition (data_loader.load_year_rows).
+
+The original files may be kept or removed: a file edited after the split is newer than its
+partitions and is read as a whole again until it is split anew. A new year can also be
+added as a partition of its own, without touching the original file.
+
+Usage (from the project root):
+    python streamlit/partition_data.py split [KEY ...]        # e.g. split Q6 Q7 (default: every file)
+    python streamlit/partition_data.py add KEY YEAR FILE.csv  # add or replace one year of a file
+    python streamlit/partition_data.py status
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+import data_cache
+import data_loader
+
+UNASSIGNED_FILE = '_unassigned.csv'
+# Characters kept in partition file names
+UNSAFE_NAME_CHARS = re.compile(r'[^\w.-]')
+
+
+def _partition_file_name(year: str) -> str:
+    return f"year={UNSAFE_NAME_CHARS.sub('_', year)}.csv"
+
+
+def _write_partition(folder: str, name: str, rows: pd.DataFrame) -> Dict:
+    """Write one partition (through a temp file), returns its manifest record"""
+    path = os.path.join(data_loader.partition_dir(), folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return {'file': f"{folder}/{name}", 'rows': len(rows)}
+
+
+def _write_manifest(manifest: Dict) -> None:
+    path = os.path.join(data_loader.partition_dir(), data_loader.MANIFEST_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(manifest, indent=2, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
+
+def _load_manifest() -> Dict:
+    manifest = dict(data_loader.read_manifest())
+    manifest['format'] = data_loader.MANIFEST_FORMAT
+    manifest['datasets'] = dict(manifest.get('datasets', {}))
+    return manifest
+
+
+def split_file(key: str) -> Optional[Dict]:
+    """
+    Split one data file by year, returns its manifest entry (None for files without a year column)
+    - Partitions keep the row order of each year; years follow their first appearance in the file
+    - Partition files of years no longer in the file are removed
+    """
+    file_path = data_loader.data_file_path(key)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    df = data_loader.load_csv(file_path)
+    year_col = data_loader.get_year_column(df)
+    if year_col is None:
+        return None
+
+    # Partition keys are the year values as filter_by_year matches them
+    years = df[year_col].astype(str).str.strip().where(df[year_col].notna())
+    folder = os.path.splitext(os.path.basename(file_path))[0]
+    entry = {
+        'key': key,
+        'source_hash': data_cache.file_hash(file_path),
+        'year_column': year_col,
+        'dtypes': {column: str(dtype) for column, dtype in df.dtypes.items()},
+        'partitions': {},
+    }
+    for year in years.dropna().unique():
+        entry['partitions'][year] = _write_partition(folder, _partition_file_name(year), df[years == year])
+    if years.isna().any():
+        entry['unassigned'] = _write_partition(folder, UNASSIGNED_FILE, df[years.isna()])
+
+    written = {os.path.basename(part['file']) for part in
+               list(entry['partitions'].values()) + ([entry['unassigned']] if 'unassigned' in entry else [])}
+    folder_path = os.path.join(data_loader.partition_dir(), folder)
+    for name in os.listdir(folder_path):
+        if name.endswith('.csv') and name not in written:
+            os.remove(os.path.join(folder_path, name))
+    return entry
+
+
+def split(keys: Optional[List[str]] = None) -> Dict:
+    """Split the given data files (default: every file present) and update the manifest"""
+    unknown = [key for key in keys or [] if key not in data_loader.DATA_FILES]
+    if unknown:
+        raise ValueError(f"Unknown dataset key(s): {', '.join(unknown)}")
+    manifest = _load_manifest()
+    for key in keys or data_loader.DATA_FILES:
+        file_path = data_loader.data_file_path(key)
+        if not keys and not os.path.exists(file_path):
+            continue
+        entry = split_file(key)
+        if entry is None:
+            print(f"⚠️ {key}: no year column, left unpartitioned")
+            continue
+        manifest['datasets'][os.path.basename(file_path)] = entry
+        print(f"✅ {key}: {len(entry['partitions'])} year partitions ({', '.join(entry['partitions'])})")
+    _write_manifest(manifest)
+    return manifest
+
+
+def add_year(key: str, year: str, csv_path: str) -> Dict:
+    """
+    Add (or replace) the partition of one year from a CSV with the columns of the partitioned file
+    - Every row must belong to that year, and the values must fit the recorded column dtypes
+    """
+    manifest = _load_manifest()
+    name = os.path.basename(data_loader.data_file_path(key))
+    entry = manifest['datasets'].get(name)
+    if entry is None:
+        raise ValueError(f"{name} is not partitioned yet, run 'split {key}' first")
+    df = data_loader.read_csv_with_fallback(csv_path)
+    if list(df.columns) != list(entry['dtypes']):
+        raise ValueError(f"Columns of {csv_path} differ from {name}")
+    year = str(year).strip()
+    if not (df[entry['year_column']].astype(str).str.strip() == year).all():
+        raise ValueError(f"Every row of {csv_path} must have {entry['year_column']} = {year}")
+    try:
+        df = df.astype(entry['dtypes'])
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Values of {csv_path} do not fit the column types of {name}: {e}")
+
+    entry = dict(entry, partitions=dict(entry['partitions']))
+    entry['partitions'][year] = _write_partition(os.path.splitext(name)[0], _partition_file_name(year), df)
+    manifest['datasets'][name] = entry
+    _write_manifest(manifest)
+    print(f"✅ {key}: {year} partition written ({len(df)} rows)")
+    return manifest
+
+
+def status() -> None:
+    """Print the partitioned files and whether their partitions are in use"""
+    datasets = data_loader.read_manifest().get('datasets', {})
+    if not datasets:
+        print(f"No partitions in {data_loader.partition_dir()}")
+    for name, entry in datasets.items():
+        path = os.path.join(data_loader.get_data_dir(), name)
+        in_use = data_cache.file_hash(path) in (None, entry.get('source_hash'))
+        state = "in use" if in_use else "not used: the original file changed since the split"
+        years = ', '.join(f"{year} ({part['rows']} rows)" for year, part in entry['partitions'].items())
+        print(f"{'✅' if in_use else '⚠️'} {name}: {state}; {years}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    split_parser = commands.add_parser('split', help="Split data files into year partitions")
+    split_parser.add_argument('keys', nargs='*', metavar='KEY',
+                              help=f"Dataset keys among {', '.join(data_loader.DATA_FILES)} (default: every file)")
+    add_parser = commands.add_parser('add', help="Add or replace the partition of one year")
+    add_parser.add_argument('key', choices=list(data_loader.DATA_FILES), metavar='KEY')
+    add_parser.add_argument('year')
+    add_parser.add_argument('csv_path')
+    commands.add_parser('status', help="List the partitioned files")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'split':
+            split(args.keys)
+        elif args.command == 'add':
+            add_year(args.key, args.year, args.csv_path)
+        else:
+            status()
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
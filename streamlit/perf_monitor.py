@@ -0,0 +1,346 @@
+"""
+Per-rerun performance instrumentation (opt-in: YEAP_PERF=1 or `python start_dashboard.py --perf`)
+
+Each script run is split into stages (sidebar filters, data loading, aggregation,
+figure building, st.plotly_chart emission, page layout). Stage times are exclusive:
+time spent in a nested stage (e.g. data loading inside an aggregation) is only
+counted once, so the stages and 'other' add up to the run total.
+
+At the end of a run the breakdown is shown in a collapsible sidebar panel and
+appended as one JSON line to PERF_LOG_PATH. When disabled every timing hook is a no-op.
+
+Dataset I/O is accounted whether or not timing is enabled (it is cheap): the data layer
+calls record_read() for every CSV parse, on-disk cache load and source file hash, with
+path, bytes, encoding, duration and the calling page function. Reads are kept per run,
+per session and per process; a CSV parsed again in a session although its content is
+unchanged is flagged as a re-parse.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Get absolute path of project root directory
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CODE_DIR)
+
+# Opt-in switch and JSON lines log location (override with YEAP_PERF_LOG)
+PERF_ENABLED = os.environ.get('YEAP_PERF', '0') == '1'
+PERF_LOG_PATH = os.environ.get('YEAP_PERF_LOG', os.path.join(PROJECT_ROOT, '.yeap_perf', 'runs.jsonl'))
+
+# Stage names
+STAGE_SIDEBAR = 'sidebar filters'
+STAGE_PAGE_IMPORT = 'page import'
+STAGE_DATA = 'data loading'
+STAGE_AGGREGATION = 'aggregation'
+STAGE_FIGURES = 'figure building'
+STAGE_EMIT = 'plotly_chart emission'
+STAGE_PAGE = 'page layout'
+STAGE_OTHER = 'other'
+
+# Dataset read kinds
+READ_PARSE = 'parse'  # CSV file parsed
+READ_CACHE = 'cache'  # artefact loaded from the on-disk cache
+READ_HASH = 'hash'    # source file read to hash its content
+READ_KINDS = [READ_PARSE, READ_CACHE, READ_HASH]
+
+# Data layer modules: the caller of a read is the first frame outside these
+_DATA_LAYER_FILES = {'data_loader.py', 'data_cache.py', 'perf_monitor.py'}
+# Sessions whose read totals are kept (oldest dropped first)
+MAX_SESSIONS = 200
+
+# A script run (and its callbacks) executes on a single thread, so the current run is thread-local
+_local = threading.local()
+_log_lock = threading.Lock()
+_io_lock = threading.Lock()
+_process_reads = {kind: 0 for kind in READ_KINDS}
+_process_reads['bytes'] = 0
+# session id -> {'runs', 'by_file': {path: {kind: count, 'bytes', 'ms'}}, 'parsed': {(path, signature)}}
+_session_reads = OrderedDict()
+
+
+def _current_run() -> Optional[Dict[str, Any]]:
+    if not PERF_ENABLED:
+        return None
+    return getattr(_local, 'run', None)
+
+
+def _session_id() -> Optional[str]:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+def start_run() -> None:
+    """Begin timing a script run and collecting its reads (call first thing in streamlit_app.py)"""
+    _local.reads = []
+    with _io_lock:
+        _session_entry(_session_id())['runs'] += 1
+    if not PERF_ENABLED:
+        return
+    _local.run = {
+        'start': time.perf_counter(),
+        'stages': {},
+        # Open stages: [name, start, time spent in nested stages]
+        'stack': [],
+        'counters': {},
+    }
+
+
+def start_stage(name: str) -> None:
+    """Open a stage; pair with end_stage(name) (or use the stage() context manager)"""
+    run = _current_run()
+    if run is not None:
+        run['stack'].append([name, time.perf_counter(), 0.0])
+
+
+def end_stage(name: str) -> None:
+    """Close the innermost open stage named `name`, crediting its exclusive time"""
+    run = _current_run()
+    if run is None or not run['stack'] or run['stack'][-1][0] != name:
+        return
+    _, start, nested = run['stack'].pop()
+    elapsed = (time.perf_counter() - start) * 1000
+    entry = run['stages'].setdefault(name, {'ms': 0.0, 'calls': 0})
+    entry['ms'] += elapsed - nested
+    entry['calls'] += 1
+    if run['stack']:
+        run['stack'][-1][2] += elapsed
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as a stage"""
+    start_stage(name)
+    try:
+        yield
+    finally:
+        end_stage(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function as a stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_run() is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add to a per-run counter (shown with the stages)"""
+    run = _current_run()
+    if run is not None:
+        run['counters'][name] = run['counters'].get(name, 0) + value
+
+
+def _session_entry(session: Optional[str]) -> Dict[str, Any]:
+    """Read totals of a session (call with _io_lock held)"""
+    entry = _session_reads.get(session)
+    if entry is None:
+        entry = _session_reads[session] = {'runs': 0, 'by_file': {}, 'parsed': set()}
+        while len(_session_reads) > MAX_SESSIONS:
+            _session_reads.popitem(last=False)
+    return entry
+
+
+def _caller() -> str:
+    """'module.function:line' of the first frame outside the data layer"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.dirname(os.path.abspath(filename)) == CODE_DIR and os.path.basename(filename) not in _DATA_LAYER_FILES:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def record_read(path: str, kind: str, ms: float, nbytes: Optional[int] = None, encoding: Optional[str] = None,
+                signature: Optional[str] = None, attempts: int = 1) -> Dict[str, Any]:
+    """
+    Account one dataset read (called by data_loader / data_cache)
+    - signature: content hash of a parsed file; a second parse with the same signature in a session is a re-parse
+    - attempts: parses needed to find the encoding
+    - Returns the read record
+    """
+    if nbytes is None:
+        try:
+            nbytes = os.path.getsize(path)
+        except OSError:
+            nbytes = 0
+    session = _session_id()
+    record = {
+        'path': path,
+        'kind': kind,
+        'bytes': nbytes,
+        'encoding': encoding,
+        'attempts': attempts,
+        'ms': round(ms, 3),
+        'caller': getattr(_local, 'caller', None) or _caller(),
+        'reparse': False,
+    }
+    with _io_lock:
+        _process_reads[kind] += 1
+        _process_reads['bytes'] += nbytes
+        entry = _session_entry(session)
+        if kind == READ_PARSE and signature is not None:
+            record['reparse'] = (path, signature) in entry['parsed']
+            entry['parsed'].add((path, signature))
+        totals = entry['by_file'].setdefault(path, {**{k: 0 for k in READ_KINDS}, 'bytes': 0, 'ms': 0.0})
+        totals[kind] += 1
+        totals['bytes'] += nbytes
+        totals['ms'] += ms
+    reads = getattr(_local, 'reads', None)
+    if reads is not None:
+        reads.append(record)
+    return record
+
+
+def worker_context() -> Dict[str, Any]:
+    """Read log, session and calling page function of the current run, for attach_worker"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        script_ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        script_ctx = None
+    return {'reads': getattr(_local, 'reads', None), 'script_ctx': script_ctx, 'caller': _caller()}
+
+
+def attach_worker(context: Dict[str, Any]) -> None:
+    """
+    Account the reads of a worker thread to the run that started it (context from worker_context)
+    - Stages are not timed in workers: the waiting run's own stage covers them
+    """
+    _local.run = None
+    _local.reads = context['reads']
+    _local.caller = context['caller']
+    if context['script_ctx'] is not None:
+        try:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx
+            add_script_run_ctx(threading.current_thread(), context['script_ctx'])
+        except Exception:
+            pass
+
+
+def run_reads() -> List[Dict[str, Any]]:
+    """Reads of the current script run so far"""
+    return list(getattr(_local, 'reads', None) or [])
+
+
+def session_reads(session: Optional[str] = None) -> Dict[str, Any]:
+    """Read totals of a session (default: the current one): runs, per kind, bytes and per file"""
+    if session is None:
+        session = _session_id()
+    with _io_lock:
+        entry = _session_reads.get(session, {'runs': 0, 'by_file': {}})
+        by_file = {path: dict(totals) for path, totals in entry['by_file'].items()}
+        runs = entry['runs']
+    totals = {kind: sum(f[kind] for f in by_file.values()) for kind in READ_KINDS}
+    return {'runs': runs, **totals, 'bytes': sum(f['bytes'] for f in by_file.values()), 'by_file': by_file}
+
+
+def process_reads() -> Dict[str, int]:
+    """Read counts of this process per kind, plus bytes (take differences to count the reads of a span)"""
+    with _io_lock:
+        return dict(_process_reads)
+
+
+def _read_summary(reads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals = {kind: sum(1 for r in reads if r['kind'] == kind) for kind in READ_KINDS}
+    return {
+        **totals,
+        'reparses': sum(1 for r in reads if r['reparse']),
+        'bytes': sum(r['bytes'] for r in reads),
+        'ms': round(sum(r['ms'] for r in reads), 3),
+    }
+
+
+def _summary(run: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    # Close stages left open by an exception or an early return
+    while run['stack']:
+        end_stage(run['stack'][-1][0])
+    total = (time.perf_counter() - run['start']) * 1000
+    stages = {name: {'ms': round(v['ms'], 2), 'calls': v['calls']} for name, v in run['stages'].items()}
+    stages[STAGE_OTHER] = {'ms': round(max(0.0, total - sum(v['ms'] for v in run['stages'].values())), 2), 'calls': 1}
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'session': _session_id(),
+        **context,
+        'total_ms': round(total, 2),
+        'stages': stages,
+        'counters': run['counters'],
+        'io': _read_summary(run_reads()),
+        'reads': run_reads(),
+        'session_io': {k: v for k, v in session_reads().items() if k != 'by_file'},
+    }
+
+
+def _write_log(summary: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(PERF_LOG_PATH), exist_ok=True)
+        line = json.dumps(summary, ensure_ascii=False, default=str)
+        with _log_lock, open(PERF_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError:
+        # Instrumentation must never break a page
+        pass
+
+
+def _render_panel(summary: Dict[str, Any]) -> None:
+    import streamlit as st
+    with st.sidebar.expander(f"⏱️ Performance ({summary['total_ms']:.0f} ms)", expanded=False):
+        rows = sorted(summary['stages'].items(), key=lambda item: item[1]['ms'], reverse=True)
+        table = ["| Stage | ms | Calls |", "|---|---:|---:|"]
+        table += [f"| {name} | {v['ms']:.1f} | {v['calls']} |" for name, v in rows]
+        st.markdown('\n'.join(table))
+        if summary['counters']:
+            st.caption(' · '.join(f"{name}: {value:g}" for name, value in summary['counters'].items()))
+
+        io, session_io = summary['io'], summary['session_io']
+        st.caption(f"Reads this run: {io[READ_PARSE]} CSV parses, {io[READ_CACHE]} cache loads, "
+                   f"{io[READ_HASH]} hashes, {io['bytes'] / 1024:.0f} KB · "
+                   f"this session: {session_io[READ_PARSE]} parses in {session_io['runs']} runs")
+        for read in summary['reads']:
+            if read['reparse']:
+                st.warning(f"{os.path.basename(read['path'])} parsed again by {read['caller']} "
+                           f"(already loaded this session, content unchanged)")
+        if summary['reads']:
+            table = ["| File | Kind | KB | ms | Caller |", "|---|---|---:|---:|---|"]
+            table += [f"| {os.path.basename(r['path'])} | {r['kind']}{' (' + r['encoding'] + ')' if r['encoding'] else ''} "
+                      f"| {r['bytes'] / 1024:.0f} | {r['ms']:.1f} | {r['caller']} |" for r in summary['reads']]
+            st.markdown('\n'.join(table))
+        st.caption(f"Logged to {PERF_LOG_PATH}")
+
+
+def finish_run(**context) -> Optional[Dict[str, Any]]:
+    """
+    End the current run: render the sidebar panel and append the JSON line
+    - context (e.g. page, year, region) is stored with the run
+    - Returns the run summary (None when disabled)
+    """
+    run = _current_run()
+    if run is None:
+        _local.reads = None
+        return None
+    summary = _summary(run, context)
+    _local.run = None
+    _local.reads = None
+    _write_log(summary)
+    try:
+        _render_panel(summary)
+    except Exception:
+        pass
+    return summary
@@ -0,0 +1,82 @@
+"""
+Label formatting shared by charts and sidebar selectboxes
+
+Chart labels and filter options repeat on every rerun, so every formatter
+here is memoized in a bounded LRU cache (LABEL_CACHE_SIZE entries each).
+"""
+from functools import lru_cache
+
+# Maximum number of distinct labels remembered per formatter
+LABEL_CACHE_SIZE = 4096
+
+# Characters after which a zero-width space is inserted so long option labels can wrap
+SOFT_WRAP_CHARS = ['/', '\\', '-', '—', '–', '_', ' ', '（', '）', '(', ')', ':', '：', ',', '·']
+SOFT_WRAP_TABLE = str.maketrans({ch: ch + '\u200B' for ch in SOFT_WRAP_CHARS})
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def soft_wrap_label(s: object) -> str:
+    """Insert soft wrap opportunities (zero-width spaces) after common separators"""
+    return str(s).translate(SOFT_WRAP_TABLE)
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def wrap_title(title: str, max_chars: int = 120) -> str:
+    """Wrap long titles to prevent overflow"""
+    if not title:
+        return ''
+    parts = []
+    line = ''
+    for word in str(title).split():
+        if len(line) + len(word) + 1 > max_chars:
+            parts.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    if line:
+        parts.append(line)
+    return '<br>'.join(parts)
+
+
+def _cap_word(w: str) -> str:
+    # Preserve fully capitalized and short acronyms
+    if w.isupper() and len(w) <= 5:
+        return w
+    # Process hyphenated words
+    return '-'.join(sub.capitalize() if sub else '' for sub in w.split('-'))
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _title_case(s: str) -> str:
+    return ' '.join(_cap_word(part) for part in s.split())
+
+
+def to_title_case(s) -> str:
+    """Capitalize the first letter of label text (preserve short acronyms like ILO, UN)."""
+    if s is None:
+        return ''
+    return _title_case(str(s))
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def wrap_legend_text(text: str, max_chars: int = 18) -> str:
+    """Simple line wrap by character count, returns text with <br>"""
+    words = str(text).split()
+    lines = []
+    current = ''
+    for w in words:
+        if len(current) + len(w) + (1 if current else 0) <= max_chars:
+            current = f"{current} {w}".strip()
+        else:
+            if current:
+                lines.append(current)
+            current = w
+    if current:
+        lines.append(current)
+    return '<br>'.join(lines)
+
+
+def clear_label_cache() -> None:
+    """Drop all memoized labels"""
+    for formatter in (soft_wrap_label, wrap_title, _title_case, wrap_legend_text):
+        formatter.cache_clear()
@@ -2,82 +2,32 @@ import streamlit as st
 import os
 import base64
 import pandas as pd
-import plotly.graph_objects as go
+
+import data_cache
+from perf_monitor import timed, STAGE_AGGREGATION, STAGE_FIGURES
+from data_loader import data_file_path, data_file_exists, get_data_dir, load_year_rows, partition_signature
 
 # Try to apply unified page style if available
 try:
-    from st_styles import apply_page_style, create_chart
+    from st_styles import apply_page_style, create_chart, compact_figure, render_chart
     STYLES_AVAILABLE = True
 except Exception:
     STYLES_AVAILABLE = False
+    render_chart = st.plotly_chart
 
 
-def safe_read_csv(file_path):
-    """
-    Safely read CSV file with automatic encoding detection
-    """
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-    
-    for encoding in encodings:
-        try:
-            return pd.read_csv(file_path, encoding=encoding)
-        except UnicodeDecodeError:
-            continue
-    
-    # If all encodings fail, try without specifying encoding
-    try:
-        return pd.read_csv(file_path)
-    except Exception as e:
-        st.error(f"Failed to read {file_path}: {str(e)}")
-        return pd.DataFrame()
-
-
-def get_q2_data():
-    """Load Q2 data from PART1_base_dataQ2-5.csv"""
+@timed(STAGE_AGGREGATION)
+def get_q2_data(selected_year=None):
+    """Load Q2 data from PART1_base_dataQ2-5.csv (cached per year until the file changes)"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        csv_path = os.path.join(project_root, 'orignaldata', 'PART1_base_dataQ2-5.csv')
-        
-        if os.path.exists(csv_path):
-            df = safe_read_csv(csv_path)
+        if selected_year is None:
             selected_year = st.session_state.get('selected_year', 'All')
-            
-            # Find the year column
-            year_col = 'YEAR' if 'YEAR' in df.columns else 'year' if 'year' in df.columns else None
-            
-            # Filter out Q2 data
-            q2_data = df[df['question'].str.contains('Q2:', na=False)]
-            
-            # ---------------- Key modification: keep the year dimension if 'All' is selected ----------------
-            if selected_year == 'All' and year_col:
-                data_dict = {}
-                for _, row in q2_data.iterrows():
-                    y = str(row[year_col]).strip()
-                    if y.endswith('.0'): y = y[:-2]
-                    if not y or y == 'nan': continue
-                    
-                    option = str(row['option']).strip()
-                    count = int(row['count']) if pd.notna(row['count']) else 0
-                    
-                    if y not in data_dict:
-                        data_dict[y] = {}
-                    data_dict[y][option] = data_dict[y].get(option, 0) + count
-                # Return a 2D dictionary (e.g., {'2024': {'Yes': 10}, '2025': {'Yes': 15}})
-                return data_dict
-                
-            # ---------------- If a specific year is selected, run the original logic ----------------
-            else:
-                if selected_year != 'All' and year_col:
-                    q2_data = q2_data[q2_data[year_col].astype(str).str.strip() == str(selected_year)]
-                
-                data_dict = {}
-                for _, row in q2_data.iterrows():
-                    option = str(row['option']).strip()
-                    count = int(row['count']) if pd.notna(row['count']) else 0
-                    data_dict[option] = data_dict.get(option, 0) + count
-                # Return a 1D dictionary (e.g., {'Yes': 10, 'No': 5})
-                return data_dict
+        csv_path = data_file_path('PART1')
+        
+        if data_file_exists(csv_path):
+            return data_cache.get_artifact('q2_data', selected_year, [csv_path],
+                                           lambda: _build_q2_data(csv_path, selected_year),
+                                           signature=partition_signature([csv_path], selected_year))
         else:
             return {}
     except Exception as e:
@@ -85,11 +35,60 @@ def get_q2_data():
         return {}
 
 
+def _build_q2_data(csv_path, selected_year):
+    """Aggregate Q2 option counts: 1D dict for a single year, 2D {year: {option: count}} for 'All'"""
+    df = load_year_rows(csv_path, selected_year)
+    
+    # Find the year column
+    year_col = 'YEAR' if 'YEAR' in df.columns else 'year' if 'year' in df.columns else None
+    
+    # Filter out Q2 data
+    q2_data = df[df['question'].str.contains('Q2:', na=False)]
+    
+    # ---------------- Key modification: keep the year dimension if 'All' is selected ----------------
+    if selected_year == 'All' and year_col:
+        data_dict = {}
+        for _, row in q2_data.iterrows():
+            y = str(row[year_col]).strip()
+            if y.endswith('.0'): y = y[:-2]
+            if not y or y == 'nan': continue
+            
+            option = str(row['option']).strip()
+            count = int(row['count']) if pd.notna(row['count']) else 0
+            
+            if y not in data_dict:
+                data_dict[y] = {}
+            data_dict[y][option] = data_dict[y].get(option, 0) + count
+        # Return a 2D dictionary (e.g., {'2024': {'Yes': 10}, '2025': {'Yes': 15}})
+        return data_dict
+        
+    # ---------------- If a specific year is selected, run the original logic ----------------
+    else:
+        if selected_year != 'All' and year_col:
+            q2_data = q2_data[q2_data[year_col].astype(str).str.strip() == str(selected_year)]
+        
+        data_dict = {}
+        for _, row in q2_data.iterrows():
+            option = str(row['option']).strip()
+            count = int(row['count']) if pd.notna(row['count']) else 0
+            data_dict[option] = data_dict.get(option, 0) + count
+        # Return a 1D dictionary (e.g., {'Yes': 10, 'No': 5})
+        return data_dict
+
+
+@timed(STAGE_FIGURES)
 def create_q2_chart(data):
-    """Create Q2 chart: Pie for single year, 100% Stacked Bar for All years"""
+    """Create Q2 chart: Pie for single year, 100% Stacked Bar for All years (cached by data content)"""
     if not data:
         return None
-        
+    def _build():
+        fig = _build_q2_chart(data)
+        return compact_figure(fig) if STYLES_AVAILABLE else fig
+    return data_cache.get_figure('q2_chart', data_cache.digest(data), _build)
+
+
+def _build_q2_chart(data):
+    """Build the Q2 figure"""
     title = "Distribution of Responses on Whether Entities Conducted Youth Employment Work in the Reference Period"
     import plotly.graph_objects as go
     
@@ -176,173 +175,62 @@ def create_q2_chart(data):
         return fig
 
 
-def get_q345_data():
-    """Load and process Q3, Q4, Q5 data to create summary table, separated by Department and Region"""
+@timed(STAGE_AGGREGATION)
+def get_q345_data(selected_year=None):
+    """Load and process Q3, Q4, Q5 data to create summary table, separated by Department and Region (cached per year)"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        
-        # Load data files
-        q3_path = os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ3.csv')
-        q4_path = os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ4.csv')
-        q5_path = os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ5.csv')
-        
-        # Initialize result dictionaries for departments and regions
-        department_data = {}
-        region_data = {}
-        
-        # Process Q3 data
-        if os.path.exists(q3_path):
-            df_q3 = safe_read_csv(q3_path)
-            
-            # Apply global YEAR filter if available
-            try:
-                selected_year = st.session_state.get('selected_year', 'All')
-                if selected_year != 'All':
-                    # Check for both 'YEAR' and 'year' columns
-                    if 'YEAR' in df_q3.columns:
-                        df_q3 = df_q3[df_q3['YEAR'].astype(str).str.strip() == str(selected_year)]
-                    elif 'year' in df_q3.columns:
-                        df_q3 = df_q3[df_q3['year'].astype(str).str.strip() == str(selected_year)]
-            except Exception:
-                pass
-            
-            # Get unique departments and regions
-            all_entities = df_q3['Department/Region'].dropna().unique()
-            departments = [entity for entity in all_entities if not entity.startswith('Region:')]
-            regions = [entity for entity in all_entities if entity.startswith('Region:')]
-            
-            # Initialize departments and regions in result_data
-            for dept in departments:
-                if dept not in department_data:
-                    department_data[dept] = {}
-            for region in regions:
-                if region not in region_data:
-                    region_data[region] = {}
-            
-            q3_columns = [col for col in df_q3.columns if col not in ['UserId', 'Department/Region', 'year']]
-            
-            # Group by department and check for YES values
-            for dept in departments:
-                dept_data = df_q3[df_q3['Department/Region'] == dept]
-                for col in q3_columns:
-                    col_key = f"Q3_{col.strip()}"
-                    # Check if any row for this department has YES for this column
-                    has_yes = (dept_data[col].fillna('').str.upper() == 'YES').any()
-                    department_data[dept][col_key] = "Yes" if has_yes else ""
-            
-            # Group by region and check for YES values
-            for region in regions:
-                region_data_df = df_q3[df_q3['Department/Region'] == region]
-                for col in q3_columns:
-                    col_key = f"Q3_{col.strip()}"
-                    # Check if any row for this region has YES for this column
-                    has_yes = (region_data_df[col].fillna('').str.upper() == 'YES').any()
-                    region_data[region][col_key] = "Yes" if has_yes else ""
-        
-        # Process Q4 data
-        if os.path.exists(q4_path):
-            df_q4 = safe_read_csv(q4_path)
-            
-            # Apply global YEAR filter if available
-            try:
-                selected_year = st.session_state.get('selected_year', 'All')
-                if selected_year != 'All':
-                    # Check for both 'YEAR' and 'year' columns
-                    if 'YEAR' in df_q4.columns:
-                        df_q4 = df_q4[df_q4['YEAR'].astype(str).str.strip() == str(selected_year)]
-                    elif 'year' in df_q4.columns:
-                        df_q4 = df_q4[df_q4['year'].astype(str).str.strip() == str(selected_year)]
-            except Exception:
-                pass
-            
-            all_entities = df_q4['Department/Region'].dropna().unique()
-            departments = [entity for entity in all_entities if not entity.startswith('Region:')]
-            regions = [entity for entity in all_entities if entity.startswith('Region:')]
-            
-            # Initialize departments and regions in result_data
-            for dept in departments:
-                if dept not in department_data:
-                    department_data[dept] = {}
-            for region in regions:
-                if region not in region_data:
-                    region_data[region] = {}
-            
-            q4_columns = [col for col in df_q4.columns if col not in ['UserId', 'Department/Region', 'year', 'Other', 'Other (elaborated answ)']]
-            
-            # Group by department and check for YES values
-            for dept in departments:
-                dept_data = df_q4[df_q4['Department/Region'] == dept]
-                for col in q4_columns:
-                    col_key = f"Q4_{col.strip()}"
-                    # Check if any row for this department has YES for this column
-                    has_yes = (dept_data[col].fillna('').str.upper() == 'YES').any()
-                    department_data[dept][col_key] = "Yes" if has_yes else ""
-            
-            # Group by region and check for YES values
-            for region in regions:
-                region_data_df = df_q4[df_q4['Department/Region'] == region]
-                for col in q4_columns:
-                    col_key = f"Q4_{col.strip()}"
-                    # Check if any row for this region has YES for this column
-                    has_yes = (region_data_df[col].fillna('').str.upper() == 'YES').any()
-                    region_data[region][col_key] = "Yes" if has_yes else ""
-        
-        # Process Q5 data
-        if os.path.exists(q5_path):
-            df_q5 = safe_read_csv(q5_path)
-            
-            # Apply global YEAR filter if available
-            try:
-                selected_year = st.session_state.get('selected_year', 'All')
-                if selected_year != 'All':
-                    # Check for both 'YEAR' and 'year' columns
-                    if 'YEAR' in df_q5.columns:
-                        df_q5 = df_q5[df_q5['YEAR'].astype(str).str.strip() == str(selected_year)]
-                    elif 'year' in df_q5.columns:
-                        df_q5 = df_q5[df_q5['year'].astype(str).str.strip() == str(selected_year)]
-            except Exception:
-                pass
-            
-            all_entities = df_q5['Department/Region'].dropna().unique()
-            departments = [entity for entity in all_entities if not entity.startswith('Region:')]
-            regions = [entity for entity in all_entities if entity.startswith('Region:')]
-            
-            # Initialize departments and regions in result_data
-            for dept in departments:
-                if dept not in department_data:
-                    department_data[dept] = {}
-            for region in regions:
-                if region not in region_data:
-                    region_data[region] = {}
-            
-            q5_columns = [col for col in df_q5.columns if col not in ['UserId', 'Department/Region', 'year', 'Other', 'Other (elaborated answ)']]
-            
-            # Group by department and check for YES values
-            for dept in departments:
-                dept_data = df_q5[df_q5['Department/Region'] == dept]
-                for col in q5_columns:
-                    col_key = f"Q5_{col.strip()}"
-                    # Check if any row for this department has YES for this column
-                    has_yes = (dept_data[col].fillna('').str.upper() == 'YES').any()
-                    department_data[dept][col_key] = "Yes" if has_yes else ""
-            
-            # Group by region and check for YES values
-            for region in regions:
-                region_data_df = df_q5[df_q5['Department/Region'] == region]
-                for col in q5_columns:
-                    col_key = f"Q5_{col.strip()}"
-                    # Check if any row for this region has YES for this column
-                    has_yes = (region_data_df[col].fillna('').str.upper() == 'YES').any()
-                    region_data[region][col_key] = "Yes" if has_yes else ""
-        
-        return {'departments': department_data, 'regions': region_data}
-        
+        if selected_year is None:
+            selected_year = st.session_state.get('selected_year', 'All')
+        sources = [data_file_path(key) for key in ('Q3', 'Q4', 'Q5')]
+        return data_cache.get_artifact('q345_data', selected_year, sources,
+                                       lambda: _build_q345_data(*sources, selected_year),
+                                       signature=partition_signature(sources, selected_year))
     except Exception as e:
         st.error(f"Error loading Q3-Q4-Q5 data: {e}")
         return {'departments': {}, 'regions': {}}
 
 
+def _add_yes_flags(df, prefix, exclude_columns, department_data, region_data):
+    """Mark each Department and Region with "Yes" per column if any of its rows answered YES"""
+    # Region entries carry the canonical 'Region: ' prefix (data_cleaning)
+    all_entities = df['Department/Region'].dropna().unique()
+    for entity in all_entities:
+        target = region_data if entity.startswith('Region:') else department_data
+        target.setdefault(entity, {})
+    
+    columns = [col for col in df.columns if col not in exclude_columns]
+    if not columns or len(all_entities) == 0:
+        return
+    # One YES test per column, then any() per entity
+    is_yes = pd.DataFrame({col: df[col].astype(str).str.upper() == 'YES' for col in columns}, index=df.index)
+    has_yes = is_yes.groupby(df['Department/Region'], sort=False).any()
+    for entity in all_entities:
+        target = region_data if entity.startswith('Region:') else department_data
+        row = has_yes.loc[entity]
+        for col in columns:
+            target[entity][f"{prefix}_{col.strip()}"] = "Yes" if row[col] else ""
+
+
+def _build_q345_data(q3_path, q4_path, q5_path, selected_year):
+    """Build the Yes/blank summary per Department and Region from the Q3, Q4, Q5 files"""
+    # Initialize result dictionaries for departments and regions
+    department_data = {}
+    region_data = {}
+    
+    base_exclude = ['UserId', 'Department/Region', 'year']
+    for prefix, path, exclude_columns in [
+        ('Q3', q3_path, base_exclude),
+        ('Q4', q4_path, base_exclude + ['Other', 'Other (elaborated answ)']),
+        ('Q5', q5_path, base_exclude + ['Other', 'Other (elaborated answ)']),
+    ]:
+        if data_file_exists(path):
+            # Rows of the selected year (only its partition is parsed in a partitioned layout)
+            df = load_year_rows(path, selected_year)
+            _add_yes_flags(df, prefix, exclude_columns, department_data, region_data)
+    
+    return {'departments': department_data, 'regions': region_data}
+
+
 def create_q345_table(data):
     """Create a formatted table for Q3-Q4-Q5 data"""
     if not data:
@@ -1147,56 +1035,15 @@ def get_base64_image(image_path):
 
 def create_layout():
     """Landing page with logo and dynamic year-based title"""
-    # Inject top anchor and robust scroll-to-top to ensure page resets to top on render
-    try:
-        st.markdown('<div id="yeap-top-anchor"></div>', unsafe_allow_html=True)
-        import streamlit.components.v1 as components
-        components.html(
-            """
-            <script>
-            (function() {
-              const MAX_FRAMES = 80;
-              let frames = 0;
-              try { if ('scrollRestoration' in window.history) window.history.scrollRestoration = 'manual'; } catch (e) {}
-              function doScroll() {
-                try {
-                  const doc = window.parent && window.parent.document ? window.parent.document : document;
-                  const anchor = doc.getElementById('yeap-top-anchor');
-                  if (anchor && typeof anchor.scrollIntoView === 'function') {
-                    try { anchor.scrollIntoView({ behavior: 'auto', block: 'start', inline: 'nearest' }); } catch (e) {}
-                  }
-                  const containers = [
-                    doc.documentElement,
-                    doc.body,
-                    doc.querySelector('[data-testid]="stAppViewContainer"'),
-                    doc.querySelector('[data-testid]="block-container"'),
-                    doc.querySelector('section.main'),
-                    doc.querySelector('.main'),
-                    doc.querySelector('.block-container')
-                  ].filter(Boolean);
-                  containers.forEach(el => { try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {} });
-                  try { (window.parent && window.parent.scrollTo ? window.parent.scrollTo(0, 0) : window.scrollTo(0, 0)); } catch (e) {}
-                } catch (err) {}
-                if (++frames < MAX_FRAMES) requestAnimationFrame(doScroll);
-              }
-              requestAnimationFrame(doScroll);
-            })();
-            </script>
-            """,
-            height=1,
-        )
-    except Exception:
-        pass
+    # Scroll-to-top on navigation is handled once per page change by st_navigation (see streamlit_app.py)
     if STYLES_AVAILABLE:
         try:
             apply_page_style()
         except Exception:
             pass
 
-    # Resolve logo path
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    logo_path = os.path.join(project_root, 'orignaldata', 'logo.png')
+    # Resolve logo path (in the data source directory)
+    logo_path = os.path.join(get_data_dir(), 'logo.png')
 
     # Determine year-aware title with line break
     selected_year = st.session_state.get('selected_year', None)
@@ -1300,7 +1147,7 @@ References
     if q2_data:
         q2_chart = create_q2_chart(q2_data)
         if q2_chart:
-            st.plotly_chart(q2_chart, width='stretch', config={'displayModeBar': False})
+            render_chart(q2_chart, width='stretch', config={'displayModeBar': False})
         else:
             st.error("Failed to create Q2 chart")
     else:
@@ -1374,7 +1221,7 @@ References
             # Create and display the chart
             count_fig = create_theme_count_chart(data_processor, current_theme=None)
             if count_fig:
-                st.plotly_chart(count_fig, width='stretch')
+                render_chart(count_fig, width='stretch')
             else:
                 st.info("Chart could not be generated")
         else:
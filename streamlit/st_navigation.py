@@ -0,0 +1,59 @@
+import streamlit as st
+
+# In-page top anchor for robust scrollIntoView behavior
+TOP_ANCHOR_ID = 'yeap-top-anchor'
+
+# Session state flag requesting a scroll to top (set on every page change)
+SCROLL_TO_TOP_KEY = '_scroll_to_top'
+
+
+def render_top_anchor():
+    """Render the in-page top anchor that the navigation hook scrolls to"""
+    st.markdown(f'<div id="{TOP_ANCHOR_ID}" style="position:relative;top:-50px;height:0;"></div>', unsafe_allow_html=True)
+
+
+def request_scroll_to_top():
+    """Ask the navigation hook to scroll to top at the end of this run"""
+    st.session_state[SCROLL_TO_TOP_KEY] = True
+
+
+def scroll_to_top_on_navigation():
+    """
+    Navigation hook: scroll the page back to the top once per page change.
+    - Renders a single zero-height component only when a scroll was requested, nothing on ordinary reruns
+    - Call it once at the end of the script run, so the page content is already in the DOM
+    """
+    if not st.session_state.get(SCROLL_TO_TOP_KEY, False):
+        return
+    st.session_state[SCROLL_TO_TOP_KEY] = False
+    try:
+        import streamlit.components.v1 as components
+        components.html(
+            """
+            <script>
+            (function() {
+              function scrollToTop() {
+                try {
+                  const doc = window.parent && window.parent.document ? window.parent.document : document;
+                  const anchor = doc.getElementById('%s');
+                  if (anchor && typeof anchor.scrollIntoView === 'function') {
+                    anchor.scrollIntoView({ behavior: 'auto', block: 'start', inline: 'nearest' });
+                  }
+                  // Reset Streamlit's scroll containers (the app view container scrolls, not the window)
+                  doc.querySelectorAll('[data-testid="stAppViewContainer"], [data-testid="stMain"], section.main, .main').forEach(el => {
+                    try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {}
+                  });
+                  try { (window.parent && window.parent.scrollTo ? window.parent.scrollTo(0, 0) : window.scrollTo(0, 0)); } catch (e) {}
+                } catch (err) {}
+              }
+              try { if ('scrollRestoration' in window.parent.history) window.parent.history.scrollRestoration = 'manual'; } catch (e) {}
+              // Once now, and once more after the next layout pass in case late elements shifted the page
+              scrollToTop();
+              requestAnimationFrame(scrollToTop);
+            })();
+            </script>
+            """ % TOP_ANCHOR_ID,
+            height=0,
+        )
+    except Exception:
+        pass
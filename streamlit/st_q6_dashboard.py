@@ -7,6 +7,8 @@ import sys
 import base64
 from typing import Dict, Any, List
 
+from data_loader import data_file_path, get_data_dir
+
 # Try to import custom styles
 try:
     from st_styles import style_manager, create_chart, apply_page_style, create_metrics, create_table, create_standardized_chart
@@ -41,9 +43,7 @@ def get_base64_image(image_path):
 def create_unified_header():
     """Create unified header for all pages"""
     # Get base64 image
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    image_path = os.path.join(project_root, 'orignaldata', 'logo.png')
+    image_path = os.path.join(get_data_dir(), 'logo.png')
     
     img_base64 = get_base64_image(image_path)
     
@@ -84,11 +84,8 @@ class Q6DataProcessor:
     
     def load_data(self):
         """Load Q6 data"""
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        
         # Load Q6 data
-        q6_file = os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv')
+        q6_file = data_file_path('Q6')
         
         if os.path.exists(q6_file):
             self.original_data = safe_read_csv(q6_file)
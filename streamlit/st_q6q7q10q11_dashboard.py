@@ -1,21 +1,33 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 import os
 import sys
 import base64
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+
+import data_cache
+import answer_normalization
+from perf_monitor import timed, STAGE_DATA, STAGE_AGGREGATION, STAGE_FIGURES
+from data_loader import data_file_path, data_file_exists, get_data_dir, load_year_rows, get_year_column, normalize_year, partition_signature, PART3_KEYS
+from data_loader import streams, stream_columns, iter_year_chunks, load_concurrently
+from st_labels import soft_wrap_label
 
 # Import unified style   module
 try:
     from st_styles import style_manager, create_chart, apply_page_style, create_metrics, create_table, create_standardized_chart
+    from st_styles import compact_figure, render_chart
     STYLES_AVAILABLE = True
 except ImportError:
     STYLES_AVAILABLE = False
+    render_chart = st.plotly_chart
     # Define backup colors - Updated with new color scheme
 STANDARD_COLORS = ['#1E2DBE', '#FA3C4B', '#05D2D2', '#FFCD2D', '#960A55', '#8CE164', '#34495E', '#F1C40F', '#E67E22', '#95A5A6']
 
+# Columns not counted as work content when a question has no work name column
+WORKS_EXCLUDE_COLUMNS = ['UserId', 'User ID', 'Region', 'Question']
+THEME_EXCLUDE_COLUMNS = ['UserId', 'User ID', 'Region', 'Question', 'clean_year', 'YEAR', 'year']
+
 def safe_read_csv(file_path: str, **kwargs) -> pd.DataFrame:
     """Safely read CSV file with multiple encoding attempts"""
     encodings_to_try = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
@@ -38,10 +50,8 @@ def get_base64_image(image_path):
 
 def create_unified_header():
     """Create unified header with logo and title for all pages"""
-    # Resolve logo path
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    logo_path = os.path.join(project_root, 'orignaldata', 'logo.png')
+    # Resolve logo path (in the data source directory)
+    logo_path = os.path.join(get_data_dir(), 'logo.png')
 
     # Determine year-aware title with line break
     selected_year = st.session_state.get('selected_year', None)
@@ -109,12 +119,33 @@ def create_unified_header():
     </div>
     """, unsafe_allow_html=True)
 
+def _merge_counts(totals: Dict[str, list], key: str, counts: Tuple[int, int, set]) -> None:
+    """Add the _works_counts of a chunk to the running totals of a key"""
+    total = totals.setdefault(key, [0, 0, set()])
+    total[0] += counts[0]
+    total[1] += counts[1]
+    total[2] |= counts[2]
+
+
 class Q6Q7Q10Q11DataProcessor:
     """Q6Q7Q10Q11 Data Processor - responsible for loading and preprocessing original data"""
     
-    def __init__(self, base_path: str = None):
-        """Initialize data processor"""
+    def __init__(self, base_path: str = None, selected_year: str = None):
+        """Initialize data processor (selected_year defaults to the global YEAR filter)"""
         self.base_path = base_path or "."
+        if selected_year is None:
+            selected_year = st.session_state.get('selected_year', 'All')
+        self.selected_year = selected_year
+        # Identifies any region filter applied to combined_data (part of the aggregate cache key)
+        self.filter_key = None
+        self.source_files = [data_file_path(key) for key in PART3_KEYS]
+        # Streaming mode (large files): the aggregates read the files in chunks, combined_data is not built
+        self.streaming = any(streams(path) for path in self.source_files)
+        # User IDs of the region filter in streaming mode (applied to each chunk)
+        self.user_ids = None
+        # Hash of the selected year's rows in the source files (data_cache key of the per-year artefacts)
+        self.source_signature = None
+        self._slices = None
         self.q6_data = None
         self.q7_data = None
         self.q10_data = None
@@ -122,40 +153,23 @@ class Q6Q7Q10Q11DataProcessor:
         self.combined_data = None
         self._load_all_data()
     
+    @timed(STAGE_DATA)
     def _load_all_data(self):
         """Load all original data files"""
         try:
-            # Get absolute path of project root directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            
-            # Original data file paths
-            data_files = {
-                'q6': os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv'),
-                'q7': os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ7.csv'),
-                'q10': os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ10.csv'),
-                'q11': os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ11.csv')
-            }
-            
-            # Load Q6 data
-            self.q6_data = self._load_data_file(data_files['q6'])
-            if not self.q6_data.empty:
-                self.q6_data['Question'] = 'Q6'
-            
-            # Load Q7 data
-            self.q7_data = self._load_data_file(data_files['q7'])
-            if not self.q7_data.empty:
-                self.q7_data['Question'] = 'Q7'
-            
-            # Load Q10 data
-            self.q10_data = self._load_data_file(data_files['q10'])
-            if not self.q10_data.empty:
-                self.q10_data['Question'] = 'Q10'
-            
-            # Load Q11 data
-            self.q11_data = self._load_data_file(data_files['q11'])
-            if not self.q11_data.empty:
-                self.q11_data['Question'] = 'Q11'
+            if self.streaming:
+                self.source_signature = partition_signature(self.source_files, self.selected_year)
+                return
+
+            # Original data file paths, parsed concurrently (YEAP_LOAD_WORKERS)
+            data_files = [data_file_path(key) for key in PART3_KEYS]
+            frames = self._load_data_files(data_files)
+            for question, df in zip(PART3_KEYS, frames):
+                if not df.empty:
+                    df['Question'] = question
+            self.q6_data, self.q7_data, self.q10_data, self.q11_data = frames
+            # After the loads: the year partitions of a cold file reuse the frames parsed above
+            self.source_signature = partition_signature(self.source_files, self.selected_year)
             
             # Combine all data for unified processing
             self._combine_data()
@@ -166,70 +180,152 @@ class Q6Q7Q10Q11DataProcessor:
             self._initialize_empty_dataframes()
     
     def _combine_data(self):
-        """Combine all question data into a single DataFrame"""
+        """Combine all question data into a single DataFrame (persisted per year by data_cache)"""
+        combined = data_cache.get_frame('part3_combined', self.selected_year, self.source_files,
+                                        self._build_combined_data, signature=self.source_signature)
+        self.combined_data = combined.copy(deep=False)
+    
+    def _build_combined_data(self) -> pd.DataFrame:
+        """Concatenate the question frames, keeping rows with a UserId and year"""
         dataframes = []
         
         for df in [self.q6_data, self.q7_data, self.q10_data, self.q11_data]:
             if df is not None and not df.empty:
-                # More lenient filtering: keep rows with UserId and year
-                # This ensures we don't lose records that might have partial data
-                basic_filter = (
-                    df['UserId'].notna() & 
-                    (df['UserId'].astype(str).str.strip() != '') &
-                    (df['UserId'].astype(str).str.strip() != 'nan')
-                )
-                
-                # Also keep rows that have year information
-                if 'year' in df.columns:
-                    year_filter = (
-                        df['year'].notna() & 
-                        (df['year'].astype(str).str.strip() != '') &
-                        (df['year'].astype(str).str.strip() != 'nan')
-                    )
-                    basic_filter = basic_filter & year_filter
-                elif 'YEAR' in df.columns:
-                    year_filter = (
-                        df['YEAR'].notna() & 
-                        (df['YEAR'].astype(str).str.strip() != '') &
-                        (df['YEAR'].astype(str).str.strip() != 'nan')
-                    )
-                    basic_filter = basic_filter & year_filter
-                
-                df_filtered = df[basic_filter].copy()
+                df_filtered = self._rows_with_user_and_year(df)
                 if not df_filtered.empty:
                     dataframes.append(df_filtered)
         
         if dataframes:
-            self.combined_data = pd.concat(dataframes, ignore_index=True, sort=False)
-        else:
-            self.combined_data = pd.DataFrame()
-    
-    def _load_data_file(self, file_path: str) -> pd.DataFrame:
-        """Load data file with year filtering"""
-        try:
-            full_path = os.path.join(self.base_path, file_path)
-            if os.path.exists(full_path):
-                df = safe_read_csv(full_path)
-                
-                # Apply global YEAR filter if available
-                try:
-                    selected_year = st.session_state.get('selected_year', 'All')
-                    if selected_year != 'All':
-                        # Check for both 'YEAR' and 'year' columns
-                        if 'YEAR' in df.columns:
-                            df = df[df['YEAR'].astype(str).str.strip() == str(selected_year)]
-                        elif 'year' in df.columns:
-                            df = df[df['year'].astype(str).str.strip() == str(selected_year)]
-                except Exception:
-                    pass
-                
-                return df
-            else:
-                st.warning(f"File not found: {full_path}")
+            return pd.concat(dataframes, ignore_index=True, sort=False)
+        return pd.DataFrame()
+
+    @staticmethod
+    def _rows_with_user_and_year(df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of a question's data kept in combined_data"""
+        # More lenient filtering: keep rows with UserId and year
+        # (placeholders are already missing values, see data_cleaning)
+        # This ensures we don't lose records that might have partial data
+        basic_filter = df['UserId'].notna()
+        
+        # Also keep rows that have year information
+        if 'year' in df.columns:
+            basic_filter = basic_filter & df['year'].notna()
+        elif 'YEAR' in df.columns:
+            basic_filter = basic_filter & df['YEAR'].notna()
+        
+        return df[basic_filter].copy()
+
+    def _stream_layout(self) -> Dict[str, Any]:
+        """
+        Shape of combined_data in streaming mode, from one pass over the files: its column dtypes
+        and the position of each question's first row
+        """
+        def _build():
+            samples, offsets, position = [], {}, 0
+            for question, file_path in zip(PART3_KEYS, self.source_files):
+                if not data_file_exists(file_path):
+                    continue
+                offsets[question] = position
+                for chunk in iter_year_chunks(file_path, self.selected_year):
+                    rows = self._rows_with_user_and_year(chunk)
+                    if position == offsets[question] and not rows.empty:
+                        samples.append(rows.iloc[:1].assign(Question=question))
+                    position += len(rows)
+            # Only files with rows left take part in the concatenation (and its dtype promotion)
+            dtypes = pd.concat(samples, ignore_index=True, sort=False).dtypes.to_dict() if samples else {}
+            return {'dtypes': dtypes, 'offsets': offsets}
+
+        return data_cache.get_artifact('stream_layout', self.selected_year, self.source_files, _build,
+                                       signature=self.source_signature)
+
+    def _stream_rows(self, questions: List[str] = None):
+        """
+        combined_data in streaming mode, chunk by chunk (questions: only the rows of these questions)
+        - Rows carry their combined_data labels and Question, the region filter is applied
+        """
+        layout = self._stream_layout()
+        offsets = layout['offsets']
+        for question, file_path in zip(PART3_KEYS, self.source_files):
+            if question not in offsets or (questions is not None and question not in questions):
+                continue
+            position = offsets[question]
+            for chunk in iter_year_chunks(file_path, self.selected_year):
+                chunk = self._rows_with_user_and_year(chunk)
+                chunk.index = pd.RangeIndex(position, position + len(chunk))
+                # dtypes of combined_data (e.g. integers of a column other files lack become floats)
+                cast = {column: dtype for column, dtype in layout['dtypes'].items()
+                        if column in chunk.columns and chunk[column].dtype != dtype}
+                if cast:
+                    chunk = chunk.astype(cast)
+                position += len(chunk)
+                if self.user_ids is not None:
+                    chunk = chunk[chunk['UserId'].isin(self.user_ids)]
+                if not chunk.empty:
+                    yield chunk.assign(Question=question)
+
+    def has_data(self) -> bool:
+        """Whether any row is left after the year and region filters"""
+        if self.streaming:
+            return not self._recalculate_works_count_stats().empty
+        return self.combined_data is not None and not self.combined_data.empty
+
+    def question_rows(self, question: str, columns: List[str] = None, required: str = None) -> pd.DataFrame:
+        """
+        Rows of one question in combined_data (read from its file in streaming mode)
+        - columns: only these columns of combined_data (those it lacks are left out)
+        - required: only the rows with a value in this column (if combined_data has it)
+        In streaming mode both are applied to each chunk before the chunks are concatenated
+        """
+        if self.streaming:
+            # Columns of combined_data, those of the other questions' files left empty
+            layout = self._stream_layout()['dtypes']
+            if required not in layout:
+                required = None
+            if columns is not None:
+                layout = {column: layout[column] for column in columns if column in layout}
+            chunks = []
+            for chunk in self._stream_rows([question]):
+                if required is not None:
+                    chunk = chunk[chunk[required].notna()] if required in chunk.columns else chunk.iloc[:0]
+                chunk = chunk[[column for column in layout if column in chunk.columns]]
+                if not chunk.empty:
+                    chunks.append(chunk)
+            if not chunks:
                 return pd.DataFrame()
-        except Exception as e:
-            st.error(f"Error loading file {file_path}: {e}")
+            rows = pd.concat(chunks).reindex(columns=list(layout))
+            return rows.astype({column: layout[column] for column in rows.columns if column not in chunks[0].columns})
+        if self.combined_data is None or self.combined_data.empty:
             return pd.DataFrame()
+        rows = self.combined_data[self.combined_data['Question'] == question]
+        if required in rows.columns:
+            rows = rows[rows[required].notna()]
+        if columns is not None:
+            rows = rows[[column for column in columns if column in rows.columns]]
+        return rows
+    
+    def _load_data_files(self, file_paths: List[str]) -> List[pd.DataFrame]:
+        """Load data files with year filtering, parsing them concurrently"""
+        def _read(file_path):
+            try:
+                # Rows of the selected year (only its partition is parsed in a partitioned layout)
+                return load_year_rows(file_path, self.selected_year), None
+            except Exception as e:
+                return pd.DataFrame(), e
+        
+        file_paths = [os.path.join(self.base_path, file_path) for file_path in file_paths]
+        existing = [file_path for file_path in file_paths if data_file_exists(file_path)]
+        loaded = dict(zip(existing, load_concurrently(_read, existing)))
+        frames = []
+        for file_path in file_paths:
+            if file_path not in loaded:
+                st.warning(f"File not found: {file_path}")
+                frames.append(pd.DataFrame())
+                continue
+            df, error = loaded[file_path]
+            if error is not None:
+                st.error(f"Error loading file {file_path}: {error}")
+            frames.append(df)
+        return frames
     
     def _initialize_empty_dataframes(self):
         """Initialize empty DataFrames as backup"""
@@ -239,81 +335,123 @@ class Q6Q7Q10Q11DataProcessor:
         self.q11_data = pd.DataFrame()
         self.combined_data = pd.DataFrame()
     
+    def cache_params(self) -> List[Any]:
+        """Identity of combined_data for caching: year, region filter and row count (catches callers that re-filter it)"""
+        row_count = 0 if self.combined_data is None else len(self.combined_data)
+        return [self.selected_year, self.filter_key, row_count]
+
+    @timed(STAGE_AGGREGATION)
+    def _cached(self, name: str, params: Any, builder):
+        """Cache an aggregate of combined_data, invalidated when the selected year's PART3 rows change"""
+        return data_cache.get_artifact(name, self.cache_params() + [params], self.source_files, builder,
+                                       signature=self.source_signature)
+
+    def _year_slices(self) -> Dict[str, Any]:
+        """
+        Row positions of each year in combined_data (year value as filter_by_year matches it),
+        in order of first appearance; {} when some row has no year
+        """
+        data = self.combined_data
+        if self._slices is not None and self._slices[0] is data:
+            return self._slices[1]
+        slices = {}
+        year_col = get_year_column(data)
+        if year_col is not None and data[year_col].notna().all():
+            codes, uniques = pd.factorize(data[year_col].astype(str).str.strip())
+            slices = {year: (codes == i).nonzero()[0] for i, year in enumerate(uniques)}
+        self._slices = (data, slices)
+        return slices
+
+    def _cached_per_year(self, name: str, year: str, positions, params: Any, builder, columns: List[str] = None):
+        """
+        Cache a partial result of one year's rows of the 'All' combined_data
+        - Keyed by the version of that year's rows in the source files, so a new year leaves it valid
+        - builder receives the year's rows (re-indexed from 0), restricted to columns if given
+        """
+        def _build():
+            data = self.combined_data if columns is None else self.combined_data[columns]
+            return builder(data.iloc[positions].reset_index(drop=True))
+
+        return data_cache.get_artifact(name, [self.filter_key, year, len(positions), params], self.source_files,
+                                       _build, signature=partition_signature(self.source_files, year))
+
     def _recalculate_works_count_stats(self):
         """Recalculate works_count statistics from raw data"""
         try:
+            if self.streaming:
+                return self._cached('works_count_stats', None, self._stream_works_count_stats)
             if self.combined_data is None or self.combined_data.empty:
                 return pd.DataFrame()
-            
-            # Recalculate statistics for each question
-            questions = ['Q6', 'Q7', 'Q10', 'Q11']
-            new_works_count_data = []
-            
-            for question in questions:
-                # Filter data for this question
-                question_data = self.combined_data[self.combined_data['Question'] == question]
-                
-                if not question_data.empty:
-                    # Total works count: all records (including empty rows)
-                    total_works = len(question_data)
-                    
-                    # Filtered works count: valid works (excluding empty rows)
-                    # Check if work name columns have values
-                    work_name_columns = [col for col in question_data.columns if 'name' in col.lower() or 'work' in col.lower()]
-                    if work_name_columns:
-                        # Calculate rows with at least one work name column not null and not empty string
-                        valid_mask = question_data[work_name_columns].notna().any(axis=1)
-                        # Further filter empty strings
-                        for col in work_name_columns:
-                            if col in question_data.columns:
-                                valid_mask = valid_mask & (question_data[col].astype(str).str.strip() != '')
-                        valid_works = valid_mask.sum()
-                    else:
-                        # If no work name columns found, check all non-ID and non-region columns
-                        exclude_cols = ['UserId', 'User ID', 'Region', 'Question']
-                        content_cols = [col for col in question_data.columns if col not in exclude_cols]
-                        if content_cols:
-                            valid_works = question_data[content_cols].notna().any(axis=1).sum()
-                        else:
-                            valid_works = 0
-                    
-                    # Get unique user IDs - count only users with valid content
-                    user_id_col = 'UserId' if 'UserId' in question_data.columns else 'User ID'
-                    if user_id_col in question_data.columns:
-                        # Count only users with valid work content
-                        if work_name_columns:
-                            # Use the same filtering logic as valid_works
-                            valid_mask = question_data[work_name_columns].notna().any(axis=1)
-                            for col in work_name_columns:
-                                if col in question_data.columns:
-                                    valid_mask = valid_mask & (question_data[col].astype(str).str.strip() != '')
-                            users_with_valid_works = question_data[valid_mask][user_id_col].nunique()
-                        else:
-                            # If no work name columns found, check all content columns
-                            exclude_cols = ['UserId', 'User ID', 'Region', 'Question']
-                            content_cols = [col for col in question_data.columns if col not in exclude_cols]
-                            if content_cols:
-                                valid_mask = question_data[content_cols].notna().any(axis=1)
-                                users_with_valid_works = question_data[valid_mask][user_id_col].nunique()
-                            else:
-                                users_with_valid_works = 0
-                    else:
-                        users_with_valid_works = 0
-                    
-                    new_works_count_data.append({
-                        'Question': question,
-                        'Total_Works': total_works,  # Total works count
-                        'Valid_Works': valid_works,  # Filtered works count
-                        'Unique_Users': users_with_valid_works,  # Number of users with valid content
-                        'Total_Outputs': total_works,  # Maintain compatibility
-                        'Valid_Outputs': valid_works   # Maintain compatibility
-                    })
-            
-            return pd.DataFrame(new_works_count_data)
-                
+            return self._cached('works_count_stats', None, self._compute_works_count_stats)
         except Exception as e:
             st.warning(f"Error recalculating works count stats: {str(e)}")
             return pd.DataFrame()
+
+    def _compute_works_count_stats(self) -> pd.DataFrame:
+        """Compute works_count statistics for each question"""
+        # Recalculate statistics for each question
+        questions = ['Q6', 'Q7', 'Q10', 'Q11']
+        counts = {}
+        
+        for question in questions:
+            # Filter data for this question
+            question_data = self.combined_data[self.combined_data['Question'] == question]
+            
+            if not question_data.empty:
+                counts[question] = self._works_counts(question_data, WORKS_EXCLUDE_COLUMNS)
+        
+        return self._works_count_frame(counts)
+
+    def _stream_works_count_stats(self) -> pd.DataFrame:
+        """works_count statistics in streaming mode, merged from the counts of each chunk"""
+        columns = list(self._stream_layout()['dtypes'])
+        counts = {}
+        for chunk in self._stream_rows():
+            question = chunk['Question'].iat[0]
+            _merge_counts(counts, question, self._works_counts(chunk.reindex(columns=columns), WORKS_EXCLUDE_COLUMNS))
+        return self._works_count_frame(counts)
+
+    @staticmethod
+    def _works_counts(question_data: pd.DataFrame, exclude_cols: List[str]) -> Tuple[int, int, set]:
+        """
+        Rows, valid works and the IDs of the users with valid works among one question's rows
+        (counts of row subsets add up, see _merge_counts)
+        """
+        # Filtered works count: valid works (excluding empty rows)
+        # Check if work name columns have values
+        work_name_columns = [col for col in question_data.columns if 'name' in col.lower() or 'work' in col.lower()]
+        if work_name_columns:
+            # Calculate rows with at least one work name column not null (blank cells are null, see data_cleaning)
+            valid_mask = question_data[work_name_columns].notna().any(axis=1)
+        else:
+            # If no work name columns found, check all non-ID and non-region columns
+            content_cols = [col for col in question_data.columns if col not in exclude_cols]
+            valid_mask = question_data[content_cols].notna().any(axis=1)
+        
+        # Get unique user IDs - count only users with valid content
+        user_id_col = 'UserId' if 'UserId' in question_data.columns else 'User ID'
+        user_ids = set()
+        if user_id_col in question_data.columns:
+            user_ids = set(question_data.loc[valid_mask, user_id_col].dropna())
+        
+        # Total works count: all records (including empty rows)
+        return len(question_data), int(valid_mask.sum()), user_ids
+
+    @staticmethod
+    def _works_count_frame(counts: Dict[str, Tuple[int, int, set]]) -> pd.DataFrame:
+        """works_count statistics from the _works_counts of each question"""
+        new_works_count_data = []
+        for question, (total_works, valid_works, user_ids) in counts.items():
+            new_works_count_data.append({
+                'Question': question,
+                'Total_Works': total_works,  # Total works count
+                'Valid_Works': valid_works,  # Filtered works count
+                'Unique_Users': len(user_ids),  # Number of users with valid content
+                'Total_Outputs': total_works,  # Maintain compatibility
+                'Valid_Outputs': valid_works   # Maintain compatibility
+            })
+        
+        return pd.DataFrame(new_works_count_data)
     
     def _load_analysis_results(self):
         """Load pre-computed analysis results (deprecated, kept for compatibility)"""
@@ -480,243 +618,286 @@ class Q6Q7Q10Q11DataProcessor:
     def get_field_distribution(self, question: str, field_name: str) -> Dict[str, int]:
         """Get distribution of values for a specific field in a question"""
         try:
-            # Use filtered combined_data to ensure response region filtering
-            if self.combined_data is None or self.combined_data.empty:
-                return {}
-            
-            # Get data for specified question from filtered data
-            question_data = self.combined_data[self.combined_data['Question'] == question]
-            
-            if question_data.empty:
-                return {}
-            
-            # Check if field exists
-            if field_name not in question_data.columns:
+            if not self.has_data():
                 return {}
-            
-            # Data standardization processing
-            field_data = question_data[field_name].copy()
-            
-            # More lenient null value handling - only remove truly empty values
-            field_data = field_data.dropna()
-            field_data = field_data[field_data.astype(str).str.strip() != '']
-            field_data = field_data[field_data.astype(str).str.strip() != 'nan']
-            
-            if field_data.empty:
-                return {}
-            
-            # Standardization processing: remove extra spaces, unify case format
-            field_data = field_data.astype(str).str.strip()  # Remove leading and trailing spaces
-            field_data = field_data.str.replace(r'\s+', ' ', regex=True)  # Replace multiple spaces with single space
-            
-            # Standardize common value formats
-            standardization_map = {
-                # Funding source standardization
-                'extrabudgetary': 'Extrabudgetary',
-                'extra budgetary': 'Extrabudgetary', 
-                'extra-budgetary': 'Extrabudgetary',
-                'EXTRABUDGETARY': 'Extrabudgetary',
-                'regular budget': 'Regular Budget',
-                'regularbudget': 'Regular Budget',
-                'REGULAR BUDGET': 'Regular Budget',
-                
-                # Publication type standardization
-                'technical report': 'Technical Report',
-                'Technical report': 'Technical Report',
-                'TECHNICAL REPORT': 'Technical Report',
-                'working paper': 'Working Paper',
-                'Working paper': 'Working Paper',
-                'WORKING PAPER': 'Working Paper',
-                'guidance/tools': 'Guidance/Tools',
-                'Guidance/tools': 'Guidance/Tools',
-                'GUIDANCE/TOOLS': 'Guidance/Tools',
-                'evaluation': 'Evaluation',
-                'EVALUATION': 'Evaluation',
-                'data/database': 'Data/Database',
-                'Data/database': 'Data/Database',
-                'DATA/DATABASE': 'Data/Database',
-                'best practices/lessons learned': 'Best Practices/Lessons Learned',
-                'Best practices/lessons learned': 'Best Practices/Lessons Learned',
-                'BEST PRACTICES/LESSONS LEARNED': 'Best Practices/Lessons Learned',
-                
-                # Youth-related standardization
-                'youth only': 'Youth Only',
-                'YOUTH ONLY': 'Youth Only',
-                'youth is one of the target groups': 'Youth Is One Of The Target Groups',
-                'YOUTH IS ONE OF THE TARGET GROUPS': 'Youth Is One Of The Target Groups',
-                
-                # Geographic focus standardization
-                'global': 'Global',
-                'GLOBAL': 'Global',
-                'regional': 'Regional',
-                'REGIONAL': 'Regional',
-                'national/local': 'National/Local',
-                'NATIONAL/LOCAL': 'National/Local',
-                
-                # Certification standardization
-                'yes': 'Yes',
-                'YES': 'Yes',
-                'no': 'No',
-                'NO': 'No',
-                
-                # Delivery mode standardization
-                'in person': 'In Person',
-                'IN PERSON': 'In Person',
-                'online': 'Online',
-                'ONLINE': 'Online',
-                'both': 'Both',
-                'BOTH': 'Both'
-            }
-            
-            # Apply standardization mapping
-            for old_value, new_value in standardization_map.items():
-                field_data = field_data.str.replace(old_value, new_value, case=False, regex=False)
-            
-            # Calculate field value distribution
-            field_counts = field_data.value_counts()
-            
-            return field_counts.to_dict()
-            
+            return self._cached('field_distribution', [question, field_name],
+                                lambda: self._compute_field_distribution(question, field_name))
         except Exception as e:
             st.error(f"Get field distribution error for {question} - {field_name}: {e}")
             return {}
 
+    def _compute_field_distribution(self, question: str, field_name: str) -> Dict[str, int]:
+        """Compute the standardized value counts of a field"""
+        if self.streaming:
+            counts = self._stream_field_counts(question, field_name)['values']
+            # Ordered as value_counts: by count, ties in order of first appearance
+            return pd.Series(counts, dtype='int64').sort_values(ascending=False, kind='stable').to_dict()
+        field_data = self._standardized_field(question, field_name)
+        if field_data is None:
+            return {}
+        
+        # Calculate field value distribution
+        field_counts = field_data.value_counts()
+        
+        return field_counts.to_dict()
+
+    def _standardized_field(self, question: str, field_name: str):
+        """
+        Standardized non-empty values of a field in combined_data, by row label (None if there are none)
+        - 'All' assembles them from per-year results, so only a newly added year is standardized
+        """
+        # Use filtered combined_data to ensure response region filtering
+        if self.combined_data is None or self.combined_data.empty:
+            return None
+        slices = self._year_slices() if self.selected_year == 'All' else {}
+        if not slices:
+            return self._standardize_field(self.combined_data, question, field_name)
+        
+        # Only the columns the standardization reads are sliced per year
+        columns = ['Question']
+        if field_name in self.combined_data.columns and field_name != 'Question':
+            columns.append(field_name)
+        parts = []
+        for year, positions in slices.items():
+            values = self._cached_per_year('standardized_field', year, positions, [question, field_name],
+                                           lambda data: self._standardize_field(data, question, field_name), columns)
+            if values is not None:
+                # Back to the row labels of combined_data
+                parts.append(values.set_axis(self.combined_data.index[positions[values.index.to_numpy()]]))
+        if not parts:
+            return None
+        return pd.concat(parts).sort_index()
+
+    def _standardize_field(self, data: pd.DataFrame, question: str, field_name: str):
+        """Non-empty values of a question's field, whitespace and answer spellings standardized (None if none)"""
+        # Get data for specified question from filtered data
+        question_data = data[data['Question'] == question]
+        
+        if question_data.empty:
+            return None
+        
+        # Check if field exists
+        if field_name not in question_data.columns:
+            return None
+        
+        # Data standardization processing
+        field_data = question_data[field_name].copy()
+        
+        # Blank cells are already missing values (data_cleaning)
+        field_data = field_data.dropna()
+        
+        if field_data.empty:
+            return None
+        
+        # Standardize each distinct value once, the results are mapped back to the rows below
+        field_data = field_data.astype(str)
+        codes, uniques = pd.factorize(field_data)
+        values = pd.Series(uniques, dtype=field_data.dtype)
+        
+        # Standardization processing: remove extra spaces, unify case format
+        values = values.str.strip()  # Remove leading and trailing spaces
+        values = values.str.replace(r'\s+', ' ', regex=True)  # Replace multiple spaces with single space
+        
+        # Known spellings of the field's answers to their canonical answer
+        # (answer_normalization.json, exact match: free text is left as it is)
+        values = answer_normalization.canonical_answers(values, field_name).tolist()
+        
+        return pd.Series(np.array(values, dtype=object)[codes], index=field_data.index, name=field_data.name,
+                         dtype=field_data.dtype)
+
     def get_time_series_distribution(self, question: str, field_name: str) -> Dict[str, Dict[str, int]]:
         """Get 2D distribution data with year dimension (for stacked charts in All view)"""
         try:
-            if self.combined_data is None or self.combined_data.empty: return {}
-            question_data = self.combined_data[self.combined_data['Question'] == question]
-            if question_data.empty or field_name not in question_data.columns: return {}
-            
-            # Extract year column
-            year_col = 'YEAR' if 'YEAR' in question_data.columns else 'year' if 'year' in question_data.columns else None
-            if not year_col: return {}
-            
-            field_data = question_data[[field_name, year_col]].copy()
-            field_data = field_data.dropna()
-            field_data = field_data[field_data[field_name].astype(str).str.strip() != '']
-            field_data = field_data[field_data[field_name].astype(str).str.strip() != 'nan']
-            
-            # Standardize names (reusing existing mapping dictionary)
-            field_data[field_name] = field_data[field_name].astype(str).str.strip()
-            field_data[field_name] = field_data[field_name].str.replace(r'\s+', ' ', regex=True)
-            
-            standardization_map = {
-                'extrabudgetary': 'Extrabudgetary', 'extra budgetary': 'Extrabudgetary', 
-                'extra-budgetary': 'Extrabudgetary', 'EXTRABUDGETARY': 'Extrabudgetary',
-                'regular budget': 'Regular Budget', 'regularbudget': 'Regular Budget',
-                'REGULAR BUDGET': 'Regular Budget', 'technical report': 'Technical Report',
-                'Technical report': 'Technical Report', 'TECHNICAL REPORT': 'Technical Report',
-                'working paper': 'Working Paper', 'Working paper': 'Working Paper',
-                'WORKING PAPER': 'Working Paper', 'guidance/tools': 'Guidance/Tools',
-                'Guidance/tools': 'Guidance/Tools', 'GUIDANCE/TOOLS': 'Guidance/Tools',
-                'evaluation': 'Evaluation', 'EVALUATION': 'Evaluation',
-                'data/database': 'Data/Database', 'Data/database': 'Data/Database',
-                'DATA/DATABASE': 'Data/Database', 'best practices/lessons learned': 'Best Practices/Lessons Learned',
-                'Best practices/lessons learned': 'Best Practices/Lessons Learned',
-                'BEST PRACTICES/LESSONS LEARNED': 'Best Practices/Lessons Learned',
-                'youth only': 'Youth Only', 'YOUTH ONLY': 'Youth Only',
-                'youth is one of the target groups': 'Youth Is One Of The Target Groups',
-                'YOUTH IS ONE OF THE TARGET GROUPS': 'Youth Is One Of The Target Groups',
-                'global': 'Global', 'GLOBAL': 'Global', 'regional': 'Regional',
-                'REGIONAL': 'Regional', 'national/local': 'National/Local',
-                'NATIONAL/LOCAL': 'National/Local', 'yes': 'Yes', 'YES': 'Yes',
-                'no': 'No', 'NO': 'No', 'in person': 'In Person', 'IN PERSON': 'In Person',
-                'online': 'Online', 'ONLINE': 'Online', 'both': 'Both', 'BOTH': 'Both'
-            }
-            
-            for old_value, new_value in standardization_map.items():
-                field_data[field_name] = field_data[field_name].str.replace(old_value, new_value, case=False, regex=False)
-            
-            # Clean up year format (convert 2024.0 to 2024)
-            field_data[year_col] = field_data[year_col].astype(str).apply(
-                lambda x: str(int(float(x))) if '.' in x and x.replace('.','').isdigit() else x.strip()
-            )
-            field_data = field_data[field_data[year_col] != 'nan']
-            
-            # Generate cross-tabulated 2D dictionary
-            crosstab = pd.crosstab(field_data[year_col], field_data[field_name])
-            return crosstab.to_dict(orient='index')
+            if not self.has_data():
+                return {}
+            return self._cached('time_series_distribution', [question, field_name],
+                                lambda: self._compute_time_series_distribution(question, field_name))
         except Exception as e:
             return {}
 
+    def _compute_time_series_distribution(self, question: str, field_name: str) -> Dict[str, Dict[str, int]]:
+        """Compute the year x value cross-tabulation of a field"""
+        if self.streaming:
+            pairs = self._stream_field_counts(question, field_name)['pairs']
+            # Sorted years x sorted values with zeros, as pd.crosstab
+            years = sorted({year for year, _ in pairs})
+            values = sorted({value for _, value in pairs})
+            return {year: {value: pairs.get((year, value), 0) for value in values} for year in years}
+        if self.combined_data is None or self.combined_data.empty: return {}
+        question_data = self.combined_data[self.combined_data['Question'] == question]
+        if question_data.empty or field_name not in question_data.columns: return {}
+        
+        # Extract year column
+        year_col = 'YEAR' if 'YEAR' in question_data.columns else 'year' if 'year' in question_data.columns else None
+        if not year_col: return {}
+        
+        # Standardized values (shared with the field distribution) with their year
+        values = self._standardized_field(question, field_name)
+        if values is None: return {}
+        field_data = self._values_with_year(values, self.combined_data.loc[values.index, year_col], year_col)
+        
+        # Generate cross-tabulated 2D dictionary
+        crosstab = pd.crosstab(field_data[year_col], field_data[values.name])
+        return crosstab.to_dict(orient='index')
+
+    @staticmethod
+    def _values_with_year(values: pd.Series, years: pd.Series, year_col: str) -> pd.DataFrame:
+        """Standardized values of a field with the clean year of their row (rows without a year dropped)"""
+        field_data = pd.DataFrame({values.name: values, year_col: years})
+        field_data = field_data.dropna()
+        
+        # Clean up year format (convert 2024.0 to 2024)
+        field_data[year_col] = field_data[year_col].astype(str).apply(
+            lambda x: str(int(float(x))) if '.' in x and x.replace('.','').isdigit() else x.strip()
+        )
+        return field_data[field_data[year_col] != 'nan']
+
+    def _stream_field_counts(self, question: str, field_name: str) -> Dict[str, Dict]:
+        """
+        Standardized value counts of a field in streaming mode, in total ('values', in order of first
+        appearance) and by (year, value) ('pairs'), from one pass over the question's file
+        """
+        def _build():
+            counts = {'values': {}, 'pairs': {}}
+            columns = list(self._stream_layout()['dtypes'])
+            if field_name not in columns:
+                return counts
+            year_col = get_year_column(columns)
+            for chunk in self._stream_rows([question]):
+                values = self._standardize_field(chunk, question, field_name)
+                if values is None:
+                    continue
+                for value, n in values.value_counts(sort=False).items():
+                    counts['values'][value] = counts['values'].get(value, 0) + int(n)
+                if year_col is None or year_col not in chunk.columns:
+                    continue
+                field_data = self._values_with_year(values, chunk.loc[values.index, year_col], year_col)
+                # By position: the field may be the year column itself
+                pairs = pd.MultiIndex.from_arrays([field_data[year_col], field_data[values.name]])
+                for pair, n in pairs.value_counts(sort=False).items():
+                    counts['pairs'][pair] = counts['pairs'].get(pair, 0) + int(n)
+            return counts
+
+        return self._cached('stream_field_counts', [question, field_name], _build)
+
     def get_all_years_theme_counts(self) -> pd.DataFrame:
         """Extract multi-year Cluster comparison data, using the exact same precise cleaning logic as single-year stats"""
         try:
-            if self.combined_data is None or self.combined_data.empty:
+            if not self.has_data():
                 return pd.DataFrame()
-            
-            year_col = 'YEAR' if 'YEAR' in self.combined_data.columns else 'year'
-            questions = ['Q6', 'Q7', 'Q10', 'Q11']
-            question_labels = {
-                'Q6': 'Knowledge development & dissemination',
-                'Q7': 'Technical assistance', 
-                'Q10': 'Capacity building',
-                'Q11': 'Advocacy & partnerships'
-            }
-            
-            results = []
-            
-            # Safely extract and clean all existing years
-            temp_df = self.combined_data.copy()
-            temp_df['clean_year'] = temp_df[year_col].astype(str).str.strip().apply(
-                lambda x: str(int(float(x))) if '.' in x and x.replace('.','').isdigit() else x
-            )
-            years = temp_df['clean_year'].unique()
-            years = [y for y in years if y != 'nan' and y != '']
-            
-            for y in years:
-                year_data = temp_df[temp_df['clean_year'] == y]
-                
-                for question in questions:
-                    question_data = year_data[year_data['Question'] == question]
-                    
-                    valid_works = 0
-                    users_with_valid_works = 0
-                    
-                    if not question_data.empty:
-                        # --- Exactly replicate the filtering logic of _recalculate_works_count_stats ---
-                        work_name_columns = [col for col in question_data.columns if 'name' in col.lower() or 'work' in col.lower()]
-                        
-                        if work_name_columns:
-                            valid_mask = question_data[work_name_columns].notna().any(axis=1)
-                            for col in work_name_columns:
-                                if col in question_data.columns:
-                                    valid_mask = valid_mask & (question_data[col].astype(str).str.strip() != '')
-                            valid_works = valid_mask.sum()
-                        else:
-                            exclude_cols = ['UserId', 'User ID', 'Region', 'Question', 'clean_year', 'YEAR', 'year']
-                            content_cols = [col for col in question_data.columns if col not in exclude_cols]
-                            if content_cols:
-                                valid_works = question_data[content_cols].notna().any(axis=1).sum()
-                        
-                        user_id_col = 'UserId' if 'UserId' in question_data.columns else 'User ID'
-                        if user_id_col in question_data.columns:
-                            if work_name_columns:
-                                users_with_valid_works = question_data[valid_mask][user_id_col].nunique()
-                            else:
-                                if content_cols:
-                                    valid_mask = question_data[content_cols].notna().any(axis=1)
-                                    users_with_valid_works = question_data[valid_mask][user_id_col].nunique()
-                                    
-                    results.append({
-                        year_col: y,
-                        'Question': question,
-                        'Cluster': question_labels.get(question, question),
-                        'Number of staff reporting': users_with_valid_works,
-                        'Number of outputs delivered': valid_works
-                    })
-                    
-            return pd.DataFrame(results)
-            
+            return self._cached('all_years_theme_counts', None, self._compute_all_years_theme_counts)
         except Exception as e:
             st.error(f"Error extracting multi-year counts: {e}")
             return pd.DataFrame()
 
+    def _compute_all_years_theme_counts(self) -> pd.DataFrame:
+        """Compute per-year staff and output counts for every Cluster (per-year rows cached by year partition)"""
+        if self.streaming:
+            return self._stream_all_years_theme_counts()
+        if self.combined_data is None or self.combined_data.empty:
+            return pd.DataFrame()
+        
+        year_col = 'YEAR' if 'YEAR' in self.combined_data.columns else 'year'
+        
+        # Each year's rows only depend on that year's data: reuse them when another year is added
+        slices = self._year_slices()
+        clean_years = [normalize_year(y) for y in slices]
+        if slices and len(set(clean_years)) == len(clean_years):
+            results = []
+            for (year, positions), y in zip(slices.items(), clean_years):
+                if y != 'nan' and y != '':
+                    results.extend(self._cached_per_year('theme_counts', year, positions, None,
+                                                         lambda data: self._theme_counts_for_year(data, year_col, y)))
+            return pd.DataFrame(results)
+        
+        results = []
+        
+        # Safely extract and clean all existing years
+        temp_df = self.combined_data.copy()
+        temp_df['clean_year'] = temp_df[year_col].astype(str).str.strip().apply(
+            lambda x: str(int(float(x))) if '.' in x and x.replace('.','').isdigit() else x
+        )
+        years = temp_df['clean_year'].unique()
+        years = [y for y in years if y != 'nan' and y != '']
+        
+        for y in years:
+            year_data = temp_df[temp_df['clean_year'] == y]
+            results.extend(self._theme_counts_for_year(year_data, year_col, y))
+                
+        return pd.DataFrame(results)
+
+    def _stream_all_years_theme_counts(self) -> pd.DataFrame:
+        """Per-year Cluster counts in streaming mode, merged from the counts of each chunk"""
+        columns = list(self._stream_layout()['dtypes'])
+        year_col = 'YEAR' if 'YEAR' in columns else 'year'
+        counts = {}
+        for chunk in self._stream_rows():
+            question = chunk['Question'].iat[0]
+            chunk = chunk.reindex(columns=columns)
+            clean_years = chunk[year_col].astype(str).map(normalize_year)
+            for y in clean_years.unique():
+                if y != 'nan' and y != '':
+                    _merge_counts(counts.setdefault(y, {}), question,
+                                  self._works_counts(chunk[clean_years == y], THEME_EXCLUDE_COLUMNS))
+        
+        results = []
+        for y, year_counts in counts.items():
+            results.extend(self._theme_count_rows(year_counts, year_col, y))
+        return pd.DataFrame(results)
+
+    def _theme_counts_for_year(self, year_data: pd.DataFrame, year_col: str, y: str) -> List[Dict[str, Any]]:
+        """Staff and output counts of one year's rows, one row per Cluster"""
+        counts = {}
+        for question in ['Q6', 'Q7', 'Q10', 'Q11']:
+            question_data = year_data[year_data['Question'] == question]
+            # --- Exactly replicate the filtering logic of _recalculate_works_count_stats ---
+            counts[question] = self._works_counts(question_data, THEME_EXCLUDE_COLUMNS)
+        return self._theme_count_rows(counts, year_col, y)
+
+    @staticmethod
+    def _theme_count_rows(counts: Dict[str, Tuple[int, int, set]], year_col: str, y: str) -> List[Dict[str, Any]]:
+        """One row per Cluster from the _works_counts of each question in a year"""
+        questions = ['Q6', 'Q7', 'Q10', 'Q11']
+        question_labels = {
+            'Q6': 'Knowledge development & dissemination',
+            'Q7': 'Technical assistance', 
+            'Q10': 'Capacity building',
+            'Q11': 'Advocacy & partnerships'
+        }
+        
+        results = []
+        for question in questions:
+            _, valid_works, user_ids = counts.get(question, (0, 0, set()))
+            results.append({
+                year_col: y,
+                'Question': question,
+                'Cluster': question_labels.get(question, question),
+                'Number of staff reporting': len(user_ids),
+                'Number of outputs delivered': valid_works
+            })
+            
+        return results
+
+@timed(STAGE_FIGURES)
 def create_theme_count_chart(data_processor, current_theme=None):
     """
     Upgraded: Support single-year and multi-year (All) Cluster comparison charts
+    (cached per year, highlighted theme and processor data)
     """
+    selected_year = st.session_state.get('selected_year', 'All')
+    params = [selected_year, current_theme, data_processor.cache_params()]
+    return data_cache.get_figure('theme_count_chart', params,
+                                 lambda: _compact(_build_theme_count_chart(data_processor, current_theme)),
+                                 sources=data_processor.source_files, signature=data_processor.source_signature)
+
+
+def _compact(fig):
+    """Compact a figure for the browser when st_styles is available"""
+    return compact_figure(fig) if STYLES_AVAILABLE else fig
+
+
+def _build_theme_count_chart(data_processor, current_theme=None):
+    """Build the Cluster comparison chart"""
     import plotly.graph_objects as go
     selected_year = st.session_state.get('selected_year', 'All')
     
@@ -826,15 +1007,6 @@ def create_theme_count_chart(data_processor, current_theme=None):
 
 def create_theme_detail_list(data_processor, question):
     """Create detail list for specific question/theme"""
-    if data_processor.combined_data is None or data_processor.combined_data.empty:
-        return None
-    
-    # Filter data for specific question
-    works_df = data_processor.combined_data[data_processor.combined_data['Question'] == question].copy()
-    
-    if works_df.empty:
-        return None
-    
     # Project name column mapping
     project_name_mapping = {
         'Q6': 'Initiative/output\'s name??',
@@ -845,16 +1017,10 @@ def create_theme_detail_list(data_processor, question):
     
     project_col = project_name_mapping.get(question)
     
-    # Filter to only show records that have a valid project name
-    if project_col and project_col in works_df.columns:
-        has_project_name = (
-            works_df[project_col].notna() & 
-            (works_df[project_col].astype(str).str.strip() != '') & 
-            (works_df[project_col].astype(str).str.strip() != 'None') &
-            (works_df[project_col].astype(str).str.strip() != 'nan') &
-            (works_df[project_col].astype(str).str.lower().str.strip() != 'none')
-        )
-        works_df = works_df[has_project_name].copy()
+    # Rows of the question with a valid project name, only the displayed columns
+    # (blank and 'None' / 'nan' placeholders are already missing values, see data_cleaning)
+    works_df = data_processor.question_rows(question, ['Question', 'UserId', 'Department/Region', project_col],
+                                            required=project_col).copy()
     
     if works_df.empty:
         return None
@@ -895,6 +1061,7 @@ def create_theme_detail_list(data_processor, question):
         return create_chart(chart_data, chart_type, title)
     else:
         # Fallback chart creation logic
+        import plotly.graph_objects as go
         colors = STANDARD_COLORS
         
         if hasattr(data, 'index'):
@@ -983,11 +1150,41 @@ def create_theme_detail_list(data_processor, question):
         return fig
 
 
+def get_region_index(selected_year) -> Dict[str, Dict[str, Any]]:
+    """
+    Records and user IDs of each organizational unit in the PART3 rows of the selected year,
+    read in chunks (region filter of streaming mode; user_ids is None without a UserId column)
+    """
+    files = [data_file_path(key) for key in PART3_KEYS]
+
+    def _build():
+        index = {}
+        for file_path in files:
+            if not data_file_exists(file_path) or 'Department/Region' not in stream_columns(file_path):
+                continue
+            for chunk in iter_year_chunks(file_path, selected_year, ['Department/Region', 'UserId']):
+                for region, rows in chunk.groupby('Department/Region', sort=False):
+                    entry = index.setdefault(region, {'records': 0, 'user_ids': None})
+                    entry['records'] += len(rows)
+                    if 'UserId' in rows.columns:
+                        entry['user_ids'] = entry['user_ids'] or {}
+                        entry['user_ids'].update(dict.fromkeys(rows['UserId'].dropna().tolist()))
+        return {region: dict(entry, user_ids=None if entry['user_ids'] is None else list(entry['user_ids']))
+                for region, entry in index.items()}
+
+    return data_cache.get_artifact('region_index', selected_year, files, _build,
+                                   signature=partition_signature(files, selected_year))
+
+
 def apply_region_filter_to_processor(data_processor, filtered_user_ids):
     """Filter data in data processor based on filtered user IDs"""
     try:
+        if data_processor.streaming:
+            # Applied to each chunk as the aggregates read the files
+            data_processor.user_ids = filtered_user_ids
+            data_processor.filter_key = data_cache.digest(sorted(str(user_id) for user_id in filtered_user_ids))
         # Filter data in combined_data
-        if data_processor.combined_data is not None and not data_processor.combined_data.empty:
+        elif data_processor.combined_data is not None and not data_processor.combined_data.empty:
             # Assume combined_data has UserId or User ID column
             if 'UserId' in data_processor.combined_data.columns:
                 data_processor.combined_data = data_processor.combined_data[
@@ -997,6 +1194,8 @@ def apply_region_filter_to_processor(data_processor, filtered_user_ids):
                 data_processor.combined_data = data_processor.combined_data[
                     data_processor.combined_data['User ID'].isin(filtered_user_ids)
                 ]
+            # Region filter identity, part of the aggregate cache key
+            data_processor.filter_key = data_cache.digest(sorted(str(user_id) for user_id in filtered_user_ids))
         
         # Recalculate statistics
         data_processor._recalculate_works_count_stats()
@@ -1011,47 +1210,7 @@ def create_layout():
     # Add unified header first
     create_unified_header()
 
-    # Inject top anchor and robust scroll-to-top to ensure page resets to top on render
-    try:
-        st.markdown('<div id="yeap-top-anchor"></div>', unsafe_allow_html=True)
-        import streamlit.components.v1 as components
-        components.html(
-            """
-            <script>
-            (function() {
-              const MAX_FRAMES = 80;
-              let frames = 0;
-              try { if ('scrollRestoration' in window.history) window.history.scrollRestoration = 'manual'; } catch (e) {}
-              function doScroll() {
-                try {
-                  const doc = window.parent && window.parent.document ? window.parent.document : document;
-                  const anchor = doc.getElementById('yeap-top-anchor');
-                  if (anchor && typeof anchor.scrollIntoView === 'function') {
-                    try { anchor.scrollIntoView({ behavior: 'auto', block: 'start', inline: 'nearest' }); } catch (e) {}
-                  }
-                  const containers = [
-                    doc.documentElement,
-                    doc.body,
-                    doc.querySelector('[data-testid="stAppViewContainer"]'),
-                    doc.querySelector('[data-testid="block-container"]'),
-                    doc.querySelector('section.main'),
-                    doc.querySelector('.main'),
-                    doc.querySelector('.block-container')
-                  ].filter(Boolean);
-                  containers.forEach(el => { try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {} });
-                  try { (window.parent && window.parent.scrollTo ? window.parent.scrollTo(0, 0) : window.scrollTo(0, 0)); } catch (e) {}
-                } catch (err) {}
-                if (++frames < MAX_FRAMES) requestAnimationFrame(doScroll);
-              }
-              requestAnimationFrame(doScroll);
-            })();
-            </script>
-            """,
-            height=1,
-        )
-    except Exception:
-        pass
-    
+    # Scroll-to-top on navigation is handled once per page change by st_navigation (see streamlit_app.py)
     # Apply page styles
     if STYLES_AVAILABLE:
         apply_page_style()
@@ -1124,8 +1283,12 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
     regions_set = set()
     original_data = pd.DataFrame()
     filtered_user_ids = None
+    # Streaming mode: the region filter reads the region index rather than the PART3 rows
+    region_index = None
     
     try:
+        if any(streams(data_file_path(key)) for key in PART3_KEYS):
+            region_index = get_region_index(st.session_state.get('selected_year', 'All'))
         # If global shared selection exists, reuse it
         if 'selected_region' in st.session_state and 'regions_options' in st.session_state:
             selected_region = st.session_state['selected_region']
@@ -1133,28 +1296,12 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
             has_region_data = True
             selected_year = st.session_state.get('selected_year', 'All')
             # Build original_data from PART3 files still needed for filtering and counts
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            data_files = [
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ7.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ10.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ11.csv')
-            ]
+            data_files = [data_file_path(key) for key in PART3_KEYS]
             combined_original_data = []
             for file_path in data_files:
-                if os.path.exists(file_path):
-                    df = safe_read_csv(file_path)
-                    # Apply YEAR filter if available
-                    try:
-                        if selected_year != 'All':
-                            # Check for both 'YEAR' and 'year' columns
-                            if 'YEAR' in df.columns:
-                                df = df[df['YEAR'].astype(str).str.strip() == str(selected_year)]
-                            elif 'year' in df.columns:
-                                df = df[df['year'].astype(str).str.strip() == str(selected_year)]
-                    except Exception:
-                        pass
+                if region_index is None and data_file_exists(file_path):
+                    # Rows of the selected year
+                    df = load_year_rows(file_path, selected_year)
                     if 'Department/Region' in df.columns:
                         combined_original_data.append(df)
             if combined_original_data:
@@ -1163,32 +1310,18 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
                 original_data = pd.DataFrame()
         else:
             # Fallback to local construction (original logic)
-            # Get absolute path of project root directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            
-            data_files = [
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ7.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ10.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ11.csv')
-            ]
+            data_files = [data_file_path(key) for key in PART3_KEYS]
             
             combined_original_data = []
             selected_year = st.session_state.get('selected_year', 'All')
+            if region_index is not None:
+                regions_set.update(region_index)
+                has_region_data = any(data_file_exists(file_path) and 'Department/Region' in stream_columns(file_path)
+                                      for file_path in data_files)
             for file_path in data_files:
-                if os.path.exists(file_path):
-                    df = safe_read_csv(file_path)
-                    # Apply YEAR filter if available
-                    try:
-                        if selected_year != 'All':
-                            # Check for both 'YEAR' and 'year' columns
-                            if 'YEAR' in df.columns:
-                                df = df[df['YEAR'].astype(str).str.strip() == str(selected_year)]
-                            elif 'year' in df.columns:
-                                df = df[df['year'].astype(str).str.strip() == str(selected_year)]
-                    except Exception:
-                        pass
+                if region_index is None and data_file_exists(file_path):
+                    # Rows of the selected year
+                    df = load_year_rows(file_path, selected_year)
                     if 'Department/Region' in df.columns:
                         regions_set.update(df['Department/Region'].dropna().unique())
                         has_region_data = True
@@ -1208,17 +1341,10 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
                 regions = ['All'] + sorted(list(regions_set))
 
                 # Improve display: insert soft wrap opportunities so long texts can wrap gracefully
-                def _wrap_label(s):
-                    s = str(s)
-                    # Insert zero-width space after common separators to allow wrapping
-                    for ch in ['/', '\\', '-', '—', '–', '_', ' ', '（', '）', '(', ')', ':', '：', ',', '·']:
-                        s = s.replace(ch, ch + '\u200B')
-                    return s
-
                 selected_region = st.sidebar.selectbox(
                     "Select Organizational Unit",
                     regions,
-                    format_func=_wrap_label
+                    format_func=soft_wrap_label
                 )
             elif has_region_data and not regions_set:
                 st.sidebar.info("Regional filtering not available - no region data found.")
@@ -1229,7 +1355,14 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
     
     # Apply region filtering (similar to Dash version logic)
     filtered_data = original_data
-    if has_region_data and selected_region != 'All' and not original_data.empty:
+    if has_region_data and selected_region != 'All' and region_index is not None:
+        region = region_index.get(selected_region)
+        if region:
+            st.info(f"Showing data for: {selected_region} ({region['records']} records)")
+            filtered_user_ids = region['user_ids']
+        elif region_index:
+            st.warning(f"No data found for region: {selected_region}. Showing all data.")
+    elif has_region_data and selected_region != 'All' and not original_data.empty:
         try:
             if 'Department/Region' in original_data.columns:
                 filtered_data = original_data[original_data['Department/Region'] == selected_region]
@@ -1256,7 +1389,7 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
         data_processor = apply_region_filter_to_processor(data_processor, filtered_user_ids)
     
     # Check if data is available
-    if (data_processor.combined_data is None or data_processor.combined_data.empty):
+    if not data_processor.has_data():
         st.warning("No data available to display. Please ensure the data files are in the correct location.")
         return
 
@@ -1326,7 +1459,7 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
         if works_count_data:
             count_fig = create_theme_count_chart(data_processor, current_theme=None)
             if count_fig:
-                st.plotly_chart(count_fig, width='stretch')
+                render_chart(count_fig, width='stretch')
         # Note: Removed redundant warning messages as they are handled at the top level
     
     else:
@@ -1358,7 +1491,7 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
                 current_theme = theme_mapping[selected_section]
                 count_fig = create_theme_count_chart(data_processor, current_theme=current_theme)
                 if count_fig:
-                    st.plotly_chart(count_fig, width='stretch')
+                    render_chart(count_fig, width='stretch')
             # Note: Removed redundant warning messages as they are handled at the top level
             
             st.markdown("---")  # Add separator
@@ -1442,7 +1575,7 @@ The ILO promotes **knowledge exchange**, **institutional strengthening**, and **
                 
                 if field_data:
                     fig = create_chart(field_data, chart_type, chart_title, preserve_order=preserve_order)
-                    st.plotly_chart(fig, width='stretch')
+                    render_chart(fig, width='stretch')
         # Section 3: Outputs Detail List
         st.subheader("📋 Outputs Detail List")
         
@@ -1,8 +1,34 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 import pandas as pd
+import os
+import hashlib
+import json
+
+import data_cache
+from perf_monitor import timed, STAGE_FIGURES, STAGE_EMIT, PERF_ENABLED
+from st_labels import wrap_title, to_title_case, wrap_legend_text
+from color_config import map_values_to_gradient, get_gradient_colorscale
+
+# Plotly is imported inside the chart builders so that importing this module stays cheap
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Session state key holding the hash of the stylesheet already injected for this session
+GLOBAL_CSS_STATE_KEY = '_global_css_hash'
+# Element id of the injected <style> node in the parent document
+GLOBAL_CSS_ELEMENT_ID = 'yeap-global-css'
+# Session state key holding the serialized size (bytes) of each chart rendered in this session
+CHART_PAYLOAD_STATE_KEY = '_chart_payload_bytes'
+# Measuring a payload serializes the chart once more: only with YEAP_PERF=1 or for the
+# warm-up report (cache_warmup.render_pages turns it on)
+RECORD_CHART_PAYLOADS = PERF_ENABLED
+# Numeric series at least this long are sent as base64 typed arrays instead of JSON lists
+TYPED_ARRAY_MIN_LENGTH = 16
+# Trace attributes holding per-trace data, never moved into the template
+TRACE_DATA_KEYS = {'type', 'name', 'x', 'y', 'text', 'labels', 'values', 'customdata', 'ids', 'uid'}
+# Annotation attributes holding per-annotation content and position
+ANNOTATION_DATA_KEYS = {'text', 'x', 'y'}
 
 class StreamlitStyleManager:
     """Streamlit Style Manager - Simplified Version"""
@@ -46,6 +72,14 @@ class StreamlitStyleManager:
                 'margin': dict(l=40, r=40, t=70, b=40)
             }
         }
+        
+        # Global stylesheet text and content hash (built lazily)
+        self._custom_css = None
+        self._custom_css_hash = None
+        
+        # Compact custom legend: one annotation per label (color block inlined) instead of two
+        # (YEAP_COMPACT_LEGEND=1, or compact_legend=True per create_chart call)
+        self.compact_legend = os.environ.get('YEAP_COMPACT_LEGEND', '0') == '1'
     
     def get_theme_colors(self) -> Dict[str, str]:
         """Get theme colors"""
@@ -61,10 +95,11 @@ class StreamlitStyleManager:
             return self.global_chart_config[chart_type]
         return self.global_chart_config
     
-    def apply_custom_css(self):
-        """Apply custom CSS styles - Simplified Version"""
-        st.markdown(f"""
-        <style>
+    def get_custom_css(self) -> str:
+        """Build the global stylesheet text (built once per manager)"""
+        if self._custom_css is not None:
+            return self._custom_css
+        self._custom_css = f"""
         /* Import Google Fonts */
         @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;700&family=Noto+Sans:wght@400;700&display=swap');
         
@@ -153,8 +188,54 @@ class StreamlitStyleManager:
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             margin: 1rem 0;
         }}
-        </style>
-        """, unsafe_allow_html=True)
+        """
+        self._custom_css_hash = hashlib.sha1(self._custom_css.encode('utf-8')).hexdigest()[:12]
+        return self._custom_css
+
+    def get_custom_css_hash(self) -> str:
+        """Get the content hash of the global stylesheet"""
+        self.get_custom_css()
+        return self._custom_css_hash
+
+    def apply_custom_css(self):
+        """
+        Inject the global stylesheet once per session:
+        - The CSS is written into the parent document <head> under a fixed element id, so it survives reruns
+        - Reruns with an unchanged content hash emit nothing at all
+        """
+        css = self.get_custom_css()
+        css_hash = self.get_custom_css_hash()
+        if st.session_state.get(GLOBAL_CSS_STATE_KEY) == css_hash:
+            return
+        try:
+            import streamlit.components.v1 as components
+            components.html(
+                """
+                <script>
+                (function() {
+                  try {
+                    const doc = window.parent && window.parent.document ? window.parent.document : document;
+                    let el = doc.getElementById('%s');
+                    if (!el) {
+                      el = doc.createElement('style');
+                      el.id = '%s';
+                      doc.head.appendChild(el);
+                    }
+                    if (el.getAttribute('data-hash') !== '%s') {
+                      el.textContent = %s;
+                      el.setAttribute('data-hash', '%s');
+                    }
+                  } catch (e) {}
+                })();
+                </script>
+                """ % (GLOBAL_CSS_ELEMENT_ID, GLOBAL_CSS_ELEMENT_ID, css_hash,
+                       json.dumps(css).replace('</', '<\\/'), css_hash),
+                height=0,
+            )
+            st.session_state[GLOBAL_CSS_STATE_KEY] = css_hash
+        except Exception:
+            # Fallback: inline <style> block, re-emitted on every run
+            st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
     
     def create_metric_card(self, title: str, value: str, delta: str = None, 
                           delta_color: str = "normal") -> str:
@@ -185,8 +266,9 @@ class StreamlitStyleManager:
     
     def create_horizontal_bar_chart(self, df: pd.DataFrame, x_col: str, y_col: str, 
                                    title: str = None, color_col: str = None,
-                                   max_label_length: int = 20) -> go.Figure:
+                                   max_label_length: int = 20) -> "go.Figure":
         """Create horizontal bar chart"""
+        import plotly.express as px
         # Handle label length
         if max_label_length and len(df) > 0:
             df = df.copy()
@@ -213,97 +295,84 @@ class StreamlitStyleManager:
         return {'layout': self.global_chart_config['layout']}
 
     def _wrap_title(self, title: str, max_chars: int = 120) -> str:
-        """Wrap long titles to prevent overflow"""
-        if not title:
-            return ''
-        parts = []
-        line = ''
-        for word in str(title).split():
-            if len(line) + len(word) + 1 > max_chars:
-                parts.append(line)
-                line = word
-            else:
-                line = f"{line} {word}".strip()
-        if line:
-            parts.append(line)
-        return '<br>'.join(parts)
+        """Wrap long titles to prevent overflow (memoized, see st_labels)"""
+        return wrap_title(title, max_chars)
 
     def _to_title_case(self, s: str) -> str:
         """Capitalize the first letter of label text (preserve short acronyms like ILO, UN)."""
-        if s is None:
-            return ''
-        s = str(s)
-        def _cap_word(w: str) -> str:
-            # Preserve fully capitalized and short acronyms
-            if w.isupper() and len(w) <= 5:
-                return w
-            # Process hyphenated words
-            return '-'.join(sub.capitalize() if sub else '' for sub in w.split('-'))
-        return ' '.join(_cap_word(part) for part in s.split())
+        return to_title_case(s)
 
     # Custom: Fixed-width vertical legend (simulated using annotations)
     def _wrap_legend_text(self, text: str, max_chars: int = 18) -> str:
         """Simple line wrap by character count, returns text with <br>"""
-        words = str(text).split()
-        lines = []
-        current = ''
-        for w in words:
-            if len(current) + len(w) + (1 if current else 0) <= max_chars:
-                current = f"{current} {w}".strip()
-            else:
-                if current:
-                    lines.append(current)
-                current = w
-        if current:
-            lines.append(current)
-        return '<br>'.join(lines)
+        return wrap_legend_text(text, max_chars)
 
-    def add_fixed_width_vertical_legend(self, fig: go.Figure, labels: List[str], colors: List[str], *,
-                                        x: float = 0.88, y: float = 1.0, max_chars: int = 18,
-                                        font_size: int = 12, row_gap: float = 0.06, draw_box: bool = False) -> None:
+    def _legend_annotations(self, labels: List[str], colors: List[str], *, x: float = 0.88, y: float = 1.0,
+                            max_chars: int = 18, font_size: int = 12, row_gap: float = 0.06,
+                            compact: bool = False):
         """
-        Add custom vertical legend to the right of the chart:
-        - Fixed text width, wraps automatically when exceeded
-        - Completely abandon geometric shapes, use the text character (■) to render color blocks, ensuring 100% vertical alignment and preventing deformation stretching
+        Build the fixed-width vertical legend as plain annotation dicts, returns (annotations, total_lines):
+        - Default: two annotations per label, the wrapped text and a ■ color block to its left
+        - Compact: one annotation per label, the color block inlined in front of the text
         """
         wrapped_labels = [self._wrap_legend_text(lbl, max_chars=max_chars) for lbl in labels]
         total_lines = sum(wl.count('<br>') + 1 for wl in wrapped_labels)
 
+        annotations = []
         y_cursor = y
         x_text = x
         symbol_x = x_text - 0.025  # Place color block to the left of the text
+        base = dict(xref='paper', yref='paper', showarrow=False, align='left', xanchor='left', yanchor='top')
         
         for idx, wrapped in enumerate(wrapped_labels):
-            # 1. Text annotation
-            fig.add_annotation(
-                xref='paper', yref='paper',
-                x=x_text, y=y_cursor,
-                text=wrapped,
-                showarrow=False,
-                align='left',
-                xanchor='left',
-                yanchor='top',
-                font=dict(size=font_size, color='#333'),
-            )
-            
-            # 2. Color block annotation (🌟 Core fix: Directly use the ■ character as an annotation)
-            # Because it is also text, it shares the same coordinate point (y_cursor) and anchor (top) with the text next to it
-            # The rendering engine will place them on the same baseline, precisely aligning with the first line!
-            fig.add_annotation(
-                xref='paper', yref='paper',
-                x=symbol_x, y=y_cursor,
-                text='■',
-                showarrow=False,
-                align='left',
-                xanchor='left',
-                yanchor='top',
-                font=dict(size=font_size + 2, color=colors[idx % len(colors)]), # Slightly increase the font size to make the block fuller
-            )
+            color = colors[idx % len(colors)]
+            if compact:
+                annotations.append(dict(
+                    base, x=symbol_x, y=y_cursor,
+                    text=f"<span style='color:{color}'>■</span> {wrapped}",
+                    font=dict(size=font_size, color='#333'),
+                ))
+            else:
+                # 1. Text annotation
+                annotations.append(dict(
+                    base, x=x_text, y=y_cursor,
+                    text=wrapped,
+                    font=dict(size=font_size, color='#333'),
+                ))
+                # 2. Color block annotation (🌟 Core fix: Directly use the ■ character as an annotation)
+                # Because it is also text, it shares the same coordinate point (y_cursor) and anchor (top) with the text next to it
+                # The rendering engine will place them on the same baseline, precisely aligning with the first line!
+                annotations.append(dict(
+                    base, x=symbol_x, y=y_cursor,
+                    text='■',
+                    font=dict(size=font_size + 2, color=color),  # Slightly increase the font size to make the block fuller
+                ))
             
             # 3. Move cursor down
             lines = wrapped.count('<br>') + 1
             y_cursor -= row_gap + (lines - 1) * (row_gap * 0.75)
 
+        return annotations, total_lines
+
+    def add_fixed_width_vertical_legend(self, fig: "go.Figure", labels: List[str], colors: List[str], *,
+                                        x: float = 0.88, y: float = 1.0, max_chars: int = 18,
+                                        font_size: int = 12, row_gap: float = 0.06, draw_box: bool = False,
+                                        compact: Optional[bool] = None) -> None:
+        """
+        Add custom vertical legend to the right of the chart:
+        - Fixed text width, wraps automatically when exceeded
+        - Completely abandon geometric shapes, use the text character (■) to render color blocks, ensuring 100% vertical alignment and preventing deformation stretching
+        - All annotations are added in a single layout update (compact defaults to self.compact_legend)
+        """
+        if compact is None:
+            compact = self.compact_legend
+        annotations, total_lines = self._legend_annotations(
+            labels, colors, x=x, y=y, max_chars=max_chars, font_size=font_size, row_gap=row_gap, compact=compact
+        )
+        fig.layout.annotations = fig.layout.annotations + tuple(annotations)
+
+        x_text = x
+        symbol_x = x_text - 0.025  # Same offset as the color blocks
         if draw_box:
             height_est = total_lines * row_gap * 0.85 + 0.04
             fig.add_shape(
@@ -316,8 +385,16 @@ class StreamlitStyleManager:
                 layer="below"
             )
 
-    def create_standardized_chart(self, data, chart_type: str, title: str, preserve_order: bool = False) -> go.Figure:
-        """Standardized chart creation, unified style, supports pie/bar/horizontal_bar, uses gradients for regional charts"""
+    def create_standardized_chart(self, data, chart_type: str, title: str, preserve_order: bool = False,
+                                  compact_legend: Optional[bool] = None) -> "go.Figure":
+        """
+        Standardized chart creation, unified style, supports pie/bar/horizontal_bar, uses gradients for regional charts
+        - compact_legend defaults to self.compact_legend
+        """
+        if compact_legend is None:
+            compact_legend = self.compact_legend
+        import plotly.graph_objects as go
+        
         # Support Series or dict
         if isinstance(data, pd.Series):
             series = data.dropna()
@@ -340,31 +417,11 @@ class StreamlitStyleManager:
         is_frequency_chart = any(keyword in title.lower() for keyword in ['types of', 'outputs delivered', 'frequency', 'distribution'])
         
         if (is_region_chart or is_partnership_chart or is_frequency_chart) and chart_type == 'bar':
-            # Use gradient color scheme
-            gradient_colors_hex = [
-                '#BEDCfa',  # rgb(190, 220, 250) - lightest
-                '#82AFDC',  # rgb(130, 175, 220)
-                '#5A87CD',  # rgb(90, 135, 205)
-                '#3264C8',  # rgb(50, 100, 200)
-                '#1E2DBE',  # rgb(30, 45, 190) - ILO BLUE (main color)
-                '#151F85',  # rgb(21, 31, 133)
-                '#230050'   # rgb(35, 0, 80) - darkest
-            ]
-            
-            # Allocate color based on value (larger value = darker color)
+            # Use gradient color scheme: larger value = darker color (vectorized colormap from color_config)
+            colors = map_values_to_gradient(values)
             if values:
                 max_val = max(values)
                 min_val = min(values)
-                val_range = max_val - min_val if max_val != min_val else 1
-                
-                colors = []
-                for val in values:
-                    # Calculate color index (larger value = larger index, darker color)
-                    normalized_val = (val - min_val) / val_range
-                    color_idx = int(normalized_val * (len(gradient_colors_hex) - 1))
-                    colors.append(gradient_colors_hex[color_idx])
-            else:
-                colors = [gradient_colors_hex[0]] * len(labels)
             
             fig = go.Figure(data=[go.Bar(
                 x=labels,
@@ -382,7 +439,7 @@ class StreamlitStyleManager:
                 x=[None], y=[None],
                 mode='markers',
                 marker=dict(
-                    colorscale=[[i/(len(gradient_colors_hex)-1), color] for i, color in enumerate(gradient_colors_hex)],
+                    colorscale=get_gradient_colorscale(),
                     showscale=True,
                     cmin=min_val if values else 0,
                     cmax=max_val if values else 1,
@@ -407,28 +464,30 @@ class StreamlitStyleManager:
             colors = self.get_chart_colors()
             
             if chart_type == 'pie':
-                fig = go.Figure(data=[go.Pie(
-                    labels=labels,
-                    values=values,
-                    marker_colors=colors[:len(labels)]
-                )])
-                # Disable built-in legend, use custom vertical fixed-width legend instead
-                fig.update_layout(
-                    margin=dict(l=20, r=180, t=60, b=20),
-                    autosize=True,
-                    showlegend=False
-                )
-                # Add custom legend (fixed width, word wrap, row by row display)
-                self.add_fixed_width_vertical_legend(
-                    fig,
-                    labels=labels,
-                    colors=colors[:len(labels)],
+                # Custom legend (fixed width, word wrap, row by row display), built together with the figure
+                legend_annotations, _ = self._legend_annotations(
+                    labels,
+                    colors[:len(labels)],
                     x=0.88,
                     y=1.0,
                     max_chars=14,
                     font_size=12,
                     row_gap=0.06,
-                    draw_box=False
+                    compact=compact_legend
+                )
+                fig = go.Figure(
+                    data=[go.Pie(
+                        labels=labels,
+                        values=values,
+                        marker_colors=colors[:len(labels)]
+                    )],
+                    # Disable built-in legend, use custom vertical fixed-width legend instead
+                    layout=dict(
+                        margin=dict(l=20, r=180, t=60, b=20),
+                        autosize=True,
+                        showlegend=False,
+                        annotations=legend_annotations
+                    )
                 )
             elif chart_type == 'horizontal_bar':
                 fig = go.Figure(data=[go.Bar(
@@ -456,9 +515,8 @@ class StreamlitStyleManager:
         title_config = layout_config.get('title', {}).copy()
         title_config['text'] = self._wrap_title(title)
         layout_config['title'] = title_config
-        fig.update_layout(**layout_config)
-        # Unify hover label style, ensure consistency with global font
-        fig.update_layout(hoverlabel=dict(
+        # Unify hover label style, ensure consistency with global font (one layout update)
+        layout_config['hoverlabel'] = dict(
             bgcolor='white',
             bordercolor='#dee2e6',
             font=dict(
@@ -466,11 +524,13 @@ class StreamlitStyleManager:
                 size=12,
                 color='#333333'
             )
-        ))
+        )
+        fig.update_layout(**layout_config)
         
         return fig
     
-    def create_smart_chart(self, data, chart_type: str, title: str, preserve_order: bool = False) -> go.Figure:
+    def create_smart_chart(self, data, chart_type: str, title: str, preserve_order: bool = False,
+                           compact_legend: Optional[bool] = None) -> "go.Figure":
         """
         Smart generic chart function:
         - If data is 1D (single year), draw normal chart according to chart_type
@@ -493,7 +553,7 @@ class StreamlitStyleManager:
                 is_2d = True
                 
         if not is_2d:
-            return self.create_standardized_chart(data_dict, chart_type, title, preserve_order)
+            return self.create_standardized_chart(data_dict, chart_type, title, preserve_order, compact_legend)
             
         # ---------------- ALL Years: Automatically generate generic 2D charts ----------------
         df = pd.DataFrame(data_dict).T.fillna(0)
@@ -513,7 +573,6 @@ class StreamlitStyleManager:
                     ordered_cols.append(col)
             df = df[[col for col in ordered_cols if col in df.columns]]
         
-        fig = go.Figure()
         colors = self.get_chart_colors()
         
         layout_config = self.get_global_chart_config('layout').copy()
@@ -521,53 +580,53 @@ class StreamlitStyleManager:
         title_config['text'] = self._wrap_title(title)
         layout_config['title'] = title_config
         layout_config['margin'] = dict(t=80, b=80, l=40, r=40)
+        layout_config['xaxis'] = dict(type='category', title="")
+        layout_config['legend'] = dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5)
+        
+        # Traces are assembled as plain dicts in one pass and the figure is created once
+        years = df.index.to_numpy()
+        traces = []
         
         # 🌟 Branch 1: Draw Multi-Line Chart
         if chart_type == 'line':
             for i, option in enumerate(df.columns):
                 display_name = self._to_title_case(str(option))
-                fig.add_trace(go.Scatter(
+                traces.append(dict(
+                    type='scatter',
                     name=display_name,
-                    x=df.index,
-                    y=df[option],
+                    x=years,
+                    y=df[option].to_numpy(),
                     mode='lines+markers',     # Points + lines
-                    marker=dict(size=8),      # Dot size
+                    marker=dict(size=8, color=colors[i % len(colors)]),  # Dot size
                     line=dict(width=3),       # Line thickness
-                    marker_color=colors[i % len(colors)],
                     hovertemplate='<b>Year: %{x}</b><br>' + display_name + '<br>Count: %{y}<extra></extra>'
                 ))
             
-            fig.update_layout(
-                **layout_config,
-                yaxis=dict(title="Count (Absolute Value)"),
-                xaxis=dict(type='category', title=""),
-                legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5)
-            )
+            layout_config['yaxis'] = dict(title="Count (Absolute Value)")
             
         # 🌟 Branch 2: Draw 100% Stacked Bar Chart
         else:
             for i, option in enumerate(df.columns):
                 display_name = self._to_title_case(str(option))
-                fig.add_trace(go.Bar(
+                counts = df[option].to_numpy()
+                traces.append(dict(
+                    type='bar',
                     name=display_name,
-                    x=df.index,
-                    y=df[option],
-                    marker_color=colors[i % len(colors)],
-                    text=df[option],
+                    x=years,
+                    y=counts,
+                    marker=dict(color=colors[i % len(colors)]),
+                    text=counts,
                     textposition='inside',
                     hovertemplate='<b>Year: %{x}</b><br>' + display_name + '<br>Count: %{text}<extra></extra>'
                 ))
             
-            fig.update_layout(
-                **layout_config,
+            layout_config.update(
                 barmode='stack',
                 barnorm='percent',
-                yaxis=dict(title="Percentage (%)", ticksuffix="%", range=[0, 100]),
-                xaxis=dict(type='category', title=""),
-                legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5)
+                yaxis=dict(title="Percentage (%)", ticksuffix="%", range=[0, 100])
             )
             
-        return fig
+        return go.Figure(data=traces, layout=layout_config)
 
 # Global style manager instance (for import by other modules)
 style_manager = StreamlitStyleManager()
@@ -580,8 +639,10 @@ def apply_page_style():
         pass
 
 # Compatible standardized chart function (for import by other modules)
-def create_standardized_chart(data, chart_type: str, title: str, preserve_order: bool = False) -> go.Figure:
-    return style_manager.create_standardized_chart(data, chart_type, title, preserve_order=preserve_order)
+def create_standardized_chart(data, chart_type: str, title: str, preserve_order: bool = False,
+                              compact_legend: Optional[bool] = None) -> "go.Figure":
+    return style_manager.create_standardized_chart(data, chart_type, title, preserve_order=preserve_order,
+                                                   compact_legend=compact_legend)
 
 # Compatible table creation function (for import by other modules)
 def create_table(df: pd.DataFrame, title: Optional[str] = None) -> str:
@@ -596,12 +657,106 @@ def create_metrics(metrics: List[Dict[str, Any]]) -> List[str]:
         ))
     return cards
 
+def _shared_items(items: List[Dict[str, Any]], skip_keys) -> Dict[str, Any]:
+    """Attributes set to the same value on every item"""
+    shared = {k: v for k, v in items[0].items() if k not in skip_keys}
+    for item in items[1:]:
+        shared = {k: v for k, v in shared.items() if k in item and item[k] == v}
+    return shared
+
+
+def _is_numeric_series(values) -> bool:
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+
+
+def compact_figure(fig: "go.Figure") -> "go.Figure":
+    """
+    Shrink the serialized figure without changing what is drawn:
+    - Styling repeated on every legend annotation moves to the template's annotationdefaults
+    - Per-trace names inlined in hovertemplates become %{fullData.name}
+    - Styling repeated on every trace of a type moves to the template's trace defaults
+    - Long numeric series are encoded as typed arrays
+    """
+    if fig is None:
+        return None
+    import numpy as np
+
+    template = fig.layout.template
+    # Legend annotations all repeat the same refs, anchors and arrow settings
+    annotations = [a.to_plotly_json() for a in fig.layout.annotations]
+    if len(annotations) > 1:
+        shared = _shared_items(annotations, ANNOTATION_DATA_KEYS)
+        if shared:
+            template.layout.annotationdefaults.update(shared)
+            fig.layout.annotations = [{k: v for k, v in a.items() if k not in shared} for a in annotations]
+
+    traces_by_type = {}
+    for trace in fig.data:
+        name = trace.name
+        hovertemplate = trace.hovertemplate
+        if name and isinstance(hovertemplate, str) and hovertemplate.count(name) == 1:
+            trace.hovertemplate = hovertemplate.replace(name, '%{fullData.name}')
+        for key in ('x', 'y', 'values'):
+            values = trace[key] if key in trace else None
+            if isinstance(values, (list, tuple)) and len(values) >= TYPED_ARRAY_MIN_LENGTH and _is_numeric_series(values):
+                trace[key] = np.asarray(values)
+        traces_by_type.setdefault(trace.type, []).append(trace)
+
+    for trace_type, traces in traces_by_type.items():
+        if len(traces) < 2:
+            continue
+        shared = _shared_items([t.to_plotly_json() for t in traces], TRACE_DATA_KEYS)
+        if not shared:
+            continue
+        # Trace values override template values, so merging into every cycled default keeps each trace's look
+        defaults = template.data[trace_type]
+        if defaults:
+            for default in defaults:
+                default.update(shared)
+        else:
+            template.data[trace_type] = [shared]
+        for trace in traces:
+            for key in shared:
+                trace[key] = None
+    return fig
+
+
+def figure_payload_bytes(fig: "go.Figure") -> int:
+    """Size of the figure JSON sent to the browser"""
+    import plotly.io as pio
+    return len(pio.to_json(fig, validate=False).encode('utf-8'))
+
+
+@timed(STAGE_EMIT)
+def render_chart(fig: "go.Figure", **kwargs):
+    """
+    st.plotly_chart wrapper recording the payload size of every chart in session state
+    (when RECORD_CHART_PAYLOADS is set), keyed by render order and title
+    """
+    if RECORD_CHART_PAYLOADS:
+        payloads = st.session_state.setdefault(CHART_PAYLOAD_STATE_KEY, {})
+        payloads[f"{len(payloads) + 1}. {fig.layout.title.text or 'chart'}"] = figure_payload_bytes(fig)
+    return st.plotly_chart(fig, **kwargs)
+
+
 # Compatible unified chart creation entry point (for import by other modules)
 # Modify the original create_chart function at the bottom of st_styles.py
-def create_chart(data, chart_type: str = 'bar', title: str = '', **kwargs) -> go.Figure:
+@timed(STAGE_FIGURES)
+def create_chart(data, chart_type: str = 'bar', title: str = '', **kwargs) -> "go.Figure":
     preserve_order = kwargs.get('preserve_order', False)
+    # compact_legend=True/False overrides the style manager's setting for this chart
+    compact_legend = kwargs.get('compact_legend')
+    if compact_legend is None:
+        compact_legend = style_manager.compact_legend
     # Direct traffic to the new smart chart function
-    return style_manager.create_smart_chart(data, chart_type, title, preserve_order=preserve_order)
+    def _build():
+        return compact_figure(style_manager.create_smart_chart(data, chart_type, title, preserve_order=preserve_order,
+                                                               compact_legend=compact_legend))
+    # Dict inputs are cached by content; anything else is built directly
+    if not isinstance(data, dict):
+        return _build()
+    params = [data, chart_type, title, preserve_order, compact_legend]
+    return data_cache.get_figure('chart', params, _build)
 
     # Custom: Fixed-width vertical legend (simulated using annotations)
     def _wrap_legend_text(self, text: str, max_chars: int) -> str:
@@ -620,7 +775,7 @@ def create_chart(data, chart_type: str = 'bar', title: str = '', **kwargs) -> go
             lines.append(current)
         return '<br>'.join(lines)
 
-    def add_fixed_width_vertical_legend(self, fig: go.Figure, labels: List[str], colors: List[str], *,
+    def add_fixed_width_vertical_legend(self, fig: "go.Figure", labels: List[str], colors: List[str], *,
                                         x: float = 1.02, y: float = 1.0, max_chars: int = 24,
                                         font_size: int = 12, row_gap: float = 0.05) -> None:
         """
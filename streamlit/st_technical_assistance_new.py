@@ -4,28 +4,30 @@ This file only handles the Technical Assistance section of the dashboard.
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import os
 import sys
 import base64
 from typing import Dict, Any, List
 
+from data_loader import load_dataset, PART3_KEYS
+
 # Import from main dashboard file
 from st_q6q7q10q11_dashboard import (
     Q6Q7Q10Q11DataProcessor, 
     create_theme_count_chart,
     STANDARD_COLORS,
     create_unified_header,
-    get_base64_image
+    get_base64_image,
+    get_region_index
 )
 
 # Import chart creation function for proper color handling
 try:
-    from st_styles import create_chart
+    from st_styles import create_chart, render_chart
     CHART_FUNCTION_AVAILABLE = True
 except ImportError:
     CHART_FUNCTION_AVAILABLE = False
+    render_chart = st.plotly_chart
 
 def create_layout():
     """Main entry point for the Technical Assistance page"""
@@ -135,21 +137,17 @@ def create_technical_assistance_layout(data_processor=None, filtered_user_ids=No
     # Apply region filtering if needed (similar to original implementation)
     if selected_region != 'All':
         try:
-            # Load the original data to get filtered user IDs
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            data_files = [
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ7.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ10.csv'),
-                os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ11.csv'),
-            ]
-            
+            # Load the original data to get filtered user IDs (parsed once, shared with the data processor)
             filtered_user_ids = None
-            for fp in data_files:
-                if os.path.exists(fp):
+            if data_processor.streaming:
+                # Streaming mode: user IDs from the region index, without loading the files
+                region = get_region_index('All').get(selected_region)
+                if region and region['user_ids'] is not None:
+                    filtered_user_ids = set(region['user_ids'])
+            else:
+                for key in PART3_KEYS:
                     try:
-                        df = pd.read_csv(fp)
+                        df = load_dataset(key)
                         if 'Department/Region' in df.columns:
                             filtered_data = df[df['Department/Region'] == selected_region]
                             if not filtered_data.empty and 'UserId' in filtered_data.columns:
@@ -201,7 +199,7 @@ def create_technical_assistance_layout(data_processor=None, filtered_user_ids=No
     if works_count_data:
         count_fig = create_theme_count_chart(data_processor, current_theme='Q7')
         if count_fig:
-            st.plotly_chart(count_fig, width='stretch')
+            render_chart(count_fig, width='stretch')
     else:
         st.info("No data available for Clusters Of The Implementation Framework")
     
@@ -273,6 +271,7 @@ def create_technical_assistance_layout(data_processor=None, filtered_user_ids=No
                     fig = create_chart(field_data, chart_type, chart_title, preserve_order=preserve_order)
                 else:
                     # Fallback to basic chart creation
+                    import plotly.express as px
                     if chart_type == 'pie':
                         df = pd.DataFrame(list(field_data.items()), columns=['Category', 'Count'])
                         fig = px.pie(
@@ -300,7 +299,7 @@ def create_technical_assistance_layout(data_processor=None, filtered_user_ids=No
                 if fig:
                     fig.update_layout(height=500)
                     # Use the new width='stretch' specification
-                    st.plotly_chart(fig, width='stretch')
+                    render_chart(fig, width='stretch')
     else:
         st.info("No frequency analysis data available for Technical Assistance")
     
@@ -1,16 +1,19 @@
 import streamlit as st
 import sys
 import os
-import pandas as pd
+import importlib
 
 # Add the current directory to Python path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-import st_q6q7q10q11_dashboard
-import st_landing_dashboard
-import st_technical_assistance_new
+from st_navigation import render_top_anchor, request_scroll_to_top, scroll_to_top_on_navigation
+from data_loader import get_year_options, get_default_year, get_region_options, schema_drift, use_source, DEFAULT_SOURCE, SELECTABLE_SOURCES
+from st_labels import soft_wrap_label
+import perf_monitor
+import memory_monitor
+import data_watcher
 
 st.set_page_config(
     page_title="ILO Youth Employment Action Plan (YEAP)",
@@ -19,45 +22,44 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in per-stage timing of this run (YEAP_PERF=1, see perf_monitor)
+perf_monitor.start_run()
 
-def safe_read_csv(file_path):
-    """
-    Safely read CSV file with automatic encoding detection
-    """
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-    
-    for encoding in encodings:
-        try:
-            return pd.read_csv(file_path, encoding=encoding)
-        except UnicodeDecodeError:
-            continue
-    
-    # If all encodings fail, try without specifying encoding
-    try:
-        return pd.read_csv(file_path)
-    except Exception as e:
-        st.error(f"Failed to read {file_path}: {str(e)}")
-        return pd.DataFrame()
+# Data source of this session (YEAP_DATA_SOURCE, switchable in the sidebar when YEAP_DATA_SOURCES lists several);
+# each source has its own cache namespace, so sessions on different sources never share artefacts
+use_source(st.session_state.get('data_source', DEFAULT_SOURCE))
 
 
 # Add custom css style, set title color to light gray
 # Remove old global main title to declutter header area
 
 # Apply global styles as early as possible so sidebar filters also get CSS
+# (injected once per session; later calls from pages and reruns are no-ops)
 try:
-    from st_styles import apply_page_style as _apply_global_style
+    from st_styles import apply_page_style as _apply_global_style, CHART_PAYLOAD_STATE_KEY
     _apply_global_style()
+    # Chart payload sizes are recorded per rerun (see st_styles.render_chart)
+    st.session_state[CHART_PAYLOAD_STATE_KEY] = {}
 except Exception:
     pass
 
+# Page registry: sidebar label -> page module name.
+# Modules are imported only when their page is first selected (see _load_page).
 PAGES = {
-    "🏠 Overview": st_landing_dashboard,
-    "📚 Knowledge Development & Dissemination": st_q6q7q10q11_dashboard,
-    "🔧 Technical Assistance": st_technical_assistance_new,
-    "🎓 Capacity Development": st_q6q7q10q11_dashboard,
-    "🤝 Advocacy & Partnerships": st_q6q7q10q11_dashboard,
+    "🏠 Overview": "st_landing_dashboard",
+    "📚 Knowledge Development & Dissemination": "st_q6q7q10q11_dashboard",
+    "🔧 Technical Assistance": "st_technical_assistance_new",
+    "🎓 Capacity Development": "st_q6q7q10q11_dashboard",
+    "🤝 Advocacy & Partnerships": "st_q6q7q10q11_dashboard",
 }
 
+
+def _load_page(module_name: str):
+    """Import a page module on demand (repeat calls are served from sys.modules)"""
+    return importlib.import_module(module_name)
+
+
+perf_monitor.start_stage(perf_monitor.STAGE_SIDEBAR)
 st.sidebar.title("Navigation")
 
 def _on_page_change():
@@ -65,7 +67,7 @@ def _on_page_change():
     st.session_state['_page_reset_requested'] = True
     
     # Set scroll to top flag - all page switches need to scroll to top
-    st.session_state['_scroll_to_top'] = True
+    request_scroll_to_top()
     
     # For switching between pages using the same module, force clear more states
     current_selection = st.session_state.get('page_selection', '')
@@ -94,7 +96,7 @@ if st.session_state.get('_page_reset_requested', False):
     keys_to_clear = []
     for key in st.session_state.keys():
         # Keep global settings, clear page-specific states
-        if not key.startswith('selected_year') and not key.startswith('selected_region') and not key.startswith('year_options') and not key.startswith('regions_options'):
+        if not key.startswith('selected_year') and not key.startswith('selected_region') and not key.startswith('year_options') and not key.startswith('regions_options') and not key.startswith('_global_css') and not key.startswith('data_source'):
             # For cases requiring a forced full reset, clear more states
             if st.session_state.get('_force_full_reset', False):
                 if key not in ['page_selection', '_page_reset_requested', '_force_full_reset', '_previous_page_selection']:
@@ -108,7 +110,7 @@ if st.session_state.get('_page_reset_requested', False):
         del st.session_state[key]
     
     # Set scroll to top flag
-    st.session_state['_scroll_to_top'] = True
+    request_scroll_to_top()
     
     # Clear reset flag
     st.session_state['_page_reset_requested'] = False
@@ -118,49 +120,39 @@ if st.session_state.get('_page_reset_requested', False):
     # Force rerun
     st.rerun()
 
-page = PAGES[selection]
+# ---------------- Data source ----------------
+if len(SELECTABLE_SOURCES) > 1:
+    def _on_source_change():
+        # Year and unit options differ between sources: reset the unit filter and the page states
+        st.session_state['selected_region'] = 'All'
+        st.session_state['_page_reset_requested'] = True
+
+    st.sidebar.selectbox("Data Source", SELECTABLE_SOURCES, key='data_source', on_change=_on_source_change)
+
+with perf_monitor.stage(perf_monitor.STAGE_PAGE_IMPORT):
+    page = _load_page(PAGES[selection])
 
 # In-page top anchor for robust scrollIntoView behavior
-TOP_ANCHOR_ID = 'yeap-top-anchor'
-st.markdown(f'<div id="{TOP_ANCHOR_ID}" style="position:relative;top:-50px;height:0;"></div>', unsafe_allow_html=True)
+render_top_anchor()
+
+# Updated data files: drop what they superseded and refresh open sessions (see data_watcher)
+data_watcher.render_refresh()
+
+# Data files that no longer fit their schema: their columns were type-inferred (see data_schema)
+try:
+    drifted = {name: issues for name, issues in schema_drift().items() if issues}
+    if drifted:
+        with st.sidebar.expander("⚠️ Data schema drift"):
+            for name, issues in drifted.items():
+                st.markdown(f"**{name}**\n" + "\n".join(f"- {issue}" for issue in issues))
+except Exception:
+    pass
 
 # ---------------- Global Year Filter ----------------
 # Always provide a global year filter
 try:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(current_dir)
-    data_dir = os.path.join(project_root, 'orignaldata')
-
-    year_values = set()
-    if os.path.isdir(data_dir):
-        for fname in os.listdir(data_dir):
-            if fname.lower().endswith('.csv'):
-                fpath = os.path.join(data_dir, fname)
-                try:
-                    df = safe_read_csv(fpath)
-                    # Check for both 'YEAR' and 'year' columns
-                    if 'YEAR' in df.columns:
-                        # Normalize to string and clean up, remove empty values
-                        years = df['YEAR'].dropna().astype(str).str.strip()
-                        years = years[years != ''].unique().tolist()
-                        # Convert float-like strings to int strings (e.g., '2026.0' -> '2026')
-                        years = [str(int(float(y))) if '.' in y and y.replace('.', '').isdigit() else y for y in years]
-                        year_values.update(years)
-                    elif 'year' in df.columns:
-                        # Also check lowercase 'year' column
-                        years = df['year'].dropna().astype(str).str.strip()
-                        years = years[years != ''].unique().tolist()
-                        # Convert float-like strings to int strings (e.g., '2026.0' -> '2026')
-                        years = [str(int(float(y))) if '.' in y and y.replace('.', '').isdigit() else y for y in years]
-                        year_values.update(years)
-                except Exception:
-                    # Skip files that cannot be read
-                    pass
-
-    # Build options: All + sorted years desc (as strings)
-    year_options = ['All'] + sorted(year_values, reverse=True)
-    if len(year_options) == 1:  # Only 'All'
-        year_options = ['All', '2025']  # Fallback default to 2025
+    # Year options are scanned from every CSV in the data directory (cached until a file changes)
+    year_options = get_year_options()
 
     st.sidebar.header("Filters")
     
@@ -169,14 +161,7 @@ try:
     # 1. Initialize a truly safe "behind-the-scenes" global variable
     # (Note: The variable name must start with selected_year to evade the cleanup logic in your _on_page_change)
     if 'selected_year_safe' not in st.session_state:
-        if '2025' in year_options:
-            st.session_state['selected_year_safe'] = '2025'
-        elif '2024' in year_options:
-            st.session_state['selected_year_safe'] = '2024'
-        elif len(year_options) > 1:
-            st.session_state['selected_year_safe'] = year_options[1]
-        else:
-            st.session_state['selected_year_safe'] = 'All'
+        st.session_state['selected_year_safe'] = get_default_year(year_options)
 
     # 2. Fallback protection: Prevent the option from not existing due to switching data files
     if st.session_state['selected_year_safe'] not in year_options:
@@ -220,101 +205,21 @@ specialized_pages = [
 if 'previous_page' not in st.session_state:
     st.session_state['previous_page'] = selection
     # Force scroll to top on first load
-    st.session_state['_scroll_to_top'] = True
+    request_scroll_to_top()
 elif st.session_state['previous_page'] != selection:
     # Page has changed, reset region filter to "All"
     if 'selected_region' in st.session_state:
         st.session_state['selected_region'] = 'All'
-    # Trigger scroll to top when page changes
-    st.session_state['_scroll_to_top'] = True
+    # Trigger scroll to top when page changes (handled once by the navigation hook at the end of the run)
+    request_scroll_to_top()
     st.session_state['previous_page'] = selection
-    # Force immediate scroll to top with stronger JavaScript
-    st.markdown(
-        """
-        <script>
-        (function() {
-          function forceScrollToTop() {
-            try {
-              const doc = window.parent && window.parent.document ? window.parent.document : document;
-              // Collect all possible scroll containers including Streamlit view container
-              const containers = [
-                doc.documentElement,
-                doc.body,
-                doc.querySelector('[data-testid="stAppViewContainer"]'),
-                doc.querySelector('[data-testid="block-container"]'),
-                doc.querySelector('section.main'),
-                doc.querySelector('.main'),
-                doc.querySelector('.block-container')
-              ].filter(Boolean);
-
-              // Force scroll behavior to auto and scroll to top
-              containers.forEach(el => {
-                try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {}
-              });
-
-              // Also attempt to reset any nested containers that match these selectors
-              try {
-                doc.querySelectorAll('[data-testid="stAppViewContainer"], [data-testid="block-container"], section.main, .main, .block-container').forEach(el => {
-                  try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {}
-                });
-              } catch (e) {}
-              
-              // Also try window scroll
-              try { 
-                if (window.parent && window.parent.scrollTo) {
-                  window.parent.scrollTo(0, 0);
-                } else {
-                  window.scrollTo(0, 0);
-                }
-              } catch (e) {}
-            } catch (err) {}
-          }
-          
-          // Execute immediately and also after a short delay
-          forceScrollToTop();
-          setTimeout(forceScrollToTop, 100);
-          setTimeout(forceScrollToTop, 300);
-        })();
-        </script>
-        """,
-        unsafe_allow_html=True
-    )
 
 if selection in specialized_pages:  # Any specialized analysis page needs region filtering
     st.sidebar.header("Filters")
     try:
-        # Build unified regions list from both PART2 and PART3 datasets
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        data_files = [
-            # PART2 (Q3, Q4, Q5)
-            os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ3.csv'),
-            os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ4.csv'),
-            os.path.join(project_root, 'orignaldata', 'PART2_base_dataQ5.csv'),
-            # PART3 (Q6, Q7, Q10, Q11)
-            os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ6.csv'),
-            os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ7.csv'),
-            os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ10.csv'),
-            os.path.join(project_root, 'orignaldata', 'PART3_base_dataQ11.csv'),
-        ]
-        regions_set = set()
-        for fp in data_files:
-            if os.path.exists(fp):
-                try:
-                    df = safe_read_csv(fp)
-                    if 'Department/Region' in df.columns:
-                        regions_set.update(df['Department/Region'].dropna().unique())
-                except Exception:
-                    pass
-        if regions_set:
-            regions_options = ['All'] + sorted(list(regions_set))
-            # Soft-wrapping for long labels in display only
-            def _wrap_label(s: object) -> str:
-                s = str(s)
-                for ch in ['/', '\\', '-', '—', '–', '_', ' ', '（', '）', '(', ')', ':', '：', ',', '·']:
-                    s = s.replace(ch, ch + '\u200B')
-                return s
-            
+        # Build unified regions list from both PART2 and PART3 datasets (cached until a file changes)
+        regions_options = get_region_options()
+        if regions_options:
             # Set default value to "All" if not set or if page changed
             if 'selected_region' not in st.session_state:
                 st.session_state['selected_region'] = 'All'
@@ -323,7 +228,7 @@ if selection in specialized_pages:  # Any specialized analysis page needs region
                 "Select Organizational Unit",
                 regions_options,
                 key="selected_region",
-                format_func=_wrap_label,
+                format_func=soft_wrap_label,  # Soft-wrapping for long labels in display only (memoized)
             )
             # Expose to pages
             st.session_state['regions_options'] = regions_options
@@ -346,123 +251,23 @@ if selection in specialized_pages:
     # Set the selected section in session state
     st.session_state['selected_analysis_section'] = page_to_section[selection]
 # ---------------------------------------------------------------------------
+perf_monitor.end_stage(perf_monitor.STAGE_SIDEBAR)
 
 # Check if the selected page has a create_layout function
 if hasattr(page, 'create_layout'):
-    # Special handling for key pages to ensure scroll to top prior to render
-    if selection in ["🔧 Technical Assistance", "🏠 Overview", "📚 Knowledge Development & Dissemination"]:
-        # Force scroll to top before calling the page
-        st.markdown("""
-        <script>
-        (function() {
-            function forceScrollToTop() {
-                try {
-                    // Multiple scroll methods
-                    try { window.scrollTo({top: 0, behavior: 'instant'}); } catch (e) { try { window.scrollTo(0,0); } catch (e2) {} }
-                    try { document.documentElement.scrollTop = 0; } catch (e) {}
-                    try { document.body.scrollTop = 0; } catch (e) {}
-
-                    // Find and scroll all possible containers
-                    const selectors = [
-                        'main', '.main', '.stApp', 
-                        '[data-testid="stAppViewContainer"]',
-                        '[data-testid="block-container"]',
-                        'section.main', '.css-1d391kg'
-                    ];
-
-                    selectors.forEach(selector => {
-                        try {
-                            const elements = document.querySelectorAll(selector);
-                            elements.forEach(element => {
-                                try { if (element && element.scrollTop !== undefined) { element.style.scrollBehavior = 'auto'; element.scrollTop = 0; } } catch (e) {}
-                            });
-                        } catch (e) {}
-                    });
-                } catch (e) {}
-            }
-
-            // Execute immediately and with delays
-            forceScrollToTop();
-            setTimeout(forceScrollToTop, 10);
-            setTimeout(forceScrollToTop, 50);
-            setTimeout(forceScrollToTop, 100);
-        })();
-        </script>
-        """, unsafe_allow_html=True)
-
-    page.create_layout()
+    with perf_monitor.stage(perf_monitor.STAGE_PAGE):
+        page.create_layout()
 else:
     st.error("The selected page does not have a create_layout function.")
 
-# Re-apply global styles at end so our <style> appears last
-try:
-    _apply_global_style()
-except Exception:
-    pass
-
 # Scroll to top after page rendering completes (handle uniformly for all pages)
-if st.session_state.get('_scroll_to_top', False):
-    import streamlit.components.v1 as components
-    components.html(
-        """
-        <script>
-        (function() {
-          const MAX_FRAMES = 80;
-          let frames = 0;
-          try { if ('scrollRestoration' in window.history) window.history.scrollRestoration = 'manual'; } catch (e) {}
-          function doScroll() {
-            try {
-              const doc = window.parent && window.parent.document ? window.parent.document : document;
-              const anchor = doc.getElementById('%s');
-              if (anchor && typeof anchor.scrollIntoView === 'function') {
-                try { anchor.scrollIntoView({ behavior: 'auto', block: 'start', inline: 'nearest' }); } catch (e) {}
-              }
-              // Collect and reset all common containers, including Streamlit's app view container
-              const containers = [
-                doc.documentElement,
-                doc.body,
-                doc.querySelector('[data-testid="stAppViewContainer"]'),
-                doc.querySelector('[data-testid="block-container"]'),
-                doc.querySelector('section.main'),
-                doc.querySelector('.main'),
-                doc.querySelector('.block-container')
-              ].filter(Boolean);
-              containers.forEach(el => { try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {} });
-              // Also try resetting any additional matches
-              try {
-                doc.querySelectorAll('[data-testid="stAppViewContainer"], [data-testid="block-container"], section.main, .main, .block-container').forEach(el => {
-                  try { el.style.scrollBehavior = 'auto'; el.scrollTop = 0; } catch (e) {}
-                });
-              } catch (e) {}
-              try { (window.parent && window.parent.scrollTo ? window.parent.scrollTo(0, 0) : window.scrollTo(0, 0)); } catch (e) {}
-            } catch (err) {}
-            if (++frames < MAX_FRAMES) requestAnimationFrame(doScroll);
-          }
-          requestAnimationFrame(doScroll);
-        })();
-        </script>
-        """ % TOP_ANCHOR_ID,
-        height=1,
-    )
-    st.session_state['_scroll_to_top'] = False
-
-
-# Fallback: Always ensure page container returns to top after each run (non-intrusive)
-st.markdown(
-    """
-    <script>
-      (function(){
-        try {
-          var doc = window.parent && window.parent.document ? window.parent.document : document;
-          try { if ('scrollRestoration' in window.history) window.history.scrollRestoration = 'manual'; } catch (e) {}
-          var main = doc.querySelector('section.main') || doc.querySelector('.main') || doc.querySelector('.block-container');
-          if (main) { try { main.style.scrollBehavior='auto'; main.scrollTop=0; } catch (e) {} }
-          try { doc.documentElement.scrollTop = 0; } catch(e) {}
-          try { doc.body.scrollTop = 0; } catch(e) {}
-          try { (window.parent && window.parent.scrollTo ? window.parent.scrollTo(0,0) : window.scrollTo(0,0)); } catch(e) {}
-        } catch(e) {}
-      })();
-    </script>
-    """,
-    unsafe_allow_html=True
-)
\ No newline at end of file
+scroll_to_top_on_navigation()
+
+# Stage breakdown of this run: sidebar panel and JSON line (no-op unless YEAP_PERF=1)
+perf_monitor.finish_run(
+    page=selection,
+    year=st.session_state.get('selected_year'),
+    region=st.session_state.get('selected_region', 'All') if selection in specialized_pages else None,
+)
+# Cache and session memory: periodic snapshot and sidebar panel (no-op unless YEAP_PERF=1)
+memory_monitor.report_run()